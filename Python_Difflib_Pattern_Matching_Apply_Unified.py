@@ -0,0 +1,449 @@
+# Python Difflib Pattern Matching
+# difflib - Helpers for computing deltas
+# This module provides classes and functions for comparing sequences.
+# It can be used for example, for comparing files, and can produce difference information in various formats, including HTML and context and unified diffs.
+#
+
+#
+# difflib.unified_diff(a, b, fromfile='', tofile='', fromfiledate='', tofiledate='', n=3, lineterm='\n')
+# Compare a and b (lists of strings); return a delta (a generator generating the delta lines) in unified diff format.
+#
+
+#
+# Applying unified diffs.
+#
+
+#
+# difflib writes unified diffs but has no way to apply one; the usual answer is to run patch(1) once per file. apply_unified() applies the hunks
+# of a unified diff (from unified_diff(), Python_Difflib_Pattern_Matching_CL_Interface.py -u or diff -u) to a stream of lines, the way patch does:
+#
+# * Offset: a hunk whose lines are not at the line number it gives is looked for at most max_offset lines before and after it, nearest first,
+#   and later hunks are shifted by the offset found.
+# * Fuzz: if that fails, up to fuzz leading and trailing context lines of the hunk are ignored, one more at a time.
+# * Only the lines between the previous hunk and max_offset lines past the current one are held in memory; everything else is passed straight
+#   through, so the original can be a file of any size. A hunk that cannot be placed raises PatchError.
+#
+# apply_patch() applies a diff covering several files, one file per task on a pool of threads. Each file is written to a temporary file next to
+# it and only replaces the original once all its hunks applied. The threads overlap file I/O; the hunk matching itself holds the GIL, so on a
+# local disk with a warm cache they gain little over workers=None.
+#
+
+import os
+import re
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+_HUNK = re.compile(r'@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+
+class PatchError(ValueError):
+    pass
+
+class Hunk:
+    """A hunk: the 0-based line its old lines start at, the old and new
+    lines, and how many context lines it starts and ends with."""
+
+    __slots__ = ('start', 'old', 'new', 'leading', 'trailing', 'ops')
+
+    def __init__(self, start):
+        self.start = start
+        self.old = []
+        self.new = []
+        self.ops = []
+
+    def finish(self):
+        ops = self.ops
+        self.leading = next((k for k, tag in enumerate(ops) if tag != ' '), len(ops))
+        self.trailing = next((k for k, tag in enumerate(reversed(ops)) if tag != ' '), len(ops))
+        del self.ops
+
+def _name(header):
+    return header.rstrip('\r\n').split('\t')[0]
+
+def parse_unified(lines):
+    """Yield ('file', (old name, new name)) for each file header and
+    ('hunk', Hunk) for each hunk of a unified diff. Other lines are skipped."""
+    old_name = None
+    hunk = None
+    need_old = need_new = 0
+    for line in lines:
+        if need_old or need_new:
+            tag = line[:1]
+            text = line[1:]
+            if tag == '\\':
+                _no_newline(hunk)
+                continue
+            if line in ('\n', '\r\n'):
+                tag, text = ' ', line
+            if tag == ' ' and need_old and need_new:
+                hunk.old.append(text)
+                hunk.new.append(text)
+                need_old -= 1
+                need_new -= 1
+            elif tag == '-' and need_old:
+                hunk.old.append(text)
+                need_old -= 1
+            elif tag == '+' and need_new:
+                hunk.new.append(text)
+                need_new -= 1
+            else:
+                raise PatchError('malformed hunk at old line %d: %r' % (hunk.start + 1, line))
+            hunk.ops.append(tag)
+            continue
+
+        if hunk is not None:
+            if line.startswith('\\'):
+                _no_newline(hunk)
+                continue
+            hunk.finish()
+            yield 'hunk', hunk
+            hunk = None
+
+        if line.startswith('--- '):
+            old_name = _name(line[4:])
+        elif line.startswith('+++ ') and old_name is not None:
+            yield 'file', (old_name, _name(line[4:]))
+            old_name = None
+        else:
+            m = _HUNK.match(line)
+            if m is not None:
+                start, need_old, _, need_new = (int(g) if g is not None else 1 for g in m.groups())
+                hunk = Hunk(start if need_old == 0 else start - 1)
+
+    if need_old or need_new:
+        raise PatchError('truncated hunk at old line %d' % (hunk.start + 1))
+    if hunk is not None:
+        hunk.finish()
+        yield 'hunk', hunk
+
+def _no_newline(hunk):
+    """Handle '\\ No newline at end of file' after the last hunk line."""
+    tag = hunk.ops[-1]
+    for side, tags in ((hunk.old, ' -'), (hunk.new, ' +')):
+        if tag in tags and side[-1].endswith('\n'):
+            side[-1] = side[-1][:-1]
+
+def apply_hunks(original, hunks, fuzz=2, max_offset=1000, report=None):
+    """Yield the lines of original with hunks (Hunk objects, in order)
+    applied. If report is a list, a (hunk number, offset, fuzz) triple is
+    appended to it for every hunk."""
+    for chunk in _apply(original, hunks, fuzz, max_offset, report):
+        yield from chunk
+
+def _apply(original, hunks, fuzz, max_offset, report):
+    """apply_hunks(), yielding lists of lines."""
+    source = iter(original)
+    buf = []            # lines read and not yet written; buf[0] is line base
+    base = 0
+    shift = 0
+
+    def fill(stop):
+        """Read lines up to line stop (to the end if None); return whether
+        there are that many."""
+        if stop is None:
+            buf.extend(source)
+            return False
+        missing = stop - base - len(buf)
+        if missing > 0:
+            buf.extend(islice(source, missing))
+            return len(buf) >= stop - base
+        return True
+
+    def matches(at, pattern):
+        if not fill(at + len(pattern)):
+            return False
+        k = at - base
+        return buf[k:k + len(pattern)] == pattern
+
+    def nearest(expected, low, high, pre, pattern):
+        """Return where the hunk starts if pattern, its lines after the pre
+        ignored ones, is found between low and high: the nearest place to
+        expected, the later one on ties, like patch trying offsets 0, +1,
+        -1, +2, -2 and so on. The end of the file also limits high."""
+        if expected >= low and matches(expected + pre, pattern):
+            return expected
+        n = len(pattern)
+        fill(None if high is None else high + pre + n)
+        last = base + len(buf) - pre - n
+        if high is not None:
+            last = min(last, high)
+        if not pattern:
+            return min(max(expected, low), last) if low <= last else None
+        best = None
+        k, stop = low + pre - base, last + pre - base + 1
+        while k < stop:
+            try:
+                k = buf.index(pattern[0], k, stop)
+            except ValueError:
+                break
+            if buf[k:k + n] == pattern:
+                at = base + k - pre
+                if best is None or abs(at - expected) <= abs(best - expected):
+                    best = at
+                if at > expected:
+                    break
+            k += 1
+        return best
+
+    for number, hunk in enumerate(hunks, 1):
+        expected = hunk.start + shift
+        low = base if max_offset is None else max(base, expected - max_offset)
+        high = None if max_offset is None else expected + max_offset
+
+        # Nothing before low can be matched: pass it through.
+        if low > base:
+            count = min(low - base, len(buf))
+            yield buf[:count]
+            del buf[:count]
+            base += count
+            while base < low:
+                chunk = list(islice(source, min(low - base, 65536)))
+                if not chunk:
+                    break
+                yield chunk
+                base += len(chunk)
+
+        # As in patch, a hunk with less leading than trailing context must
+        # start the file (if it starts at line 1), and one with less
+        # trailing than leading context must end it, unless enough fuzz is
+        # allowed to make up the difference.
+        context = max(hunk.leading, hunk.trailing)
+        found = None
+        for level in range(min(fuzz, context) + 1):
+            pre = level + hunk.leading - context
+            post = level + hunk.trailing - context
+            pattern = hunk.old[max(pre, 0):len(hunk.old) - max(post, 0)]
+            if post < 0:
+                limit = None if high is None else high + len(hunk.old) + 1
+                candidates = [] if fill(limit) else [base + len(buf) - len(hunk.old)]
+            elif pre < 0 and hunk.start == 0:
+                candidates = [0]
+            else:
+                candidates = None
+            pre, post = max(pre, 0), max(post, 0)
+            if candidates is not None:
+                found = next((at for at in candidates if low <= at and
+                              (high is None or at <= high) and matches(at + pre, pattern)), None)
+            else:
+                found = nearest(expected, low, high, pre, pattern)
+            if found is not None:
+                break
+        if found is None:
+            raise PatchError('hunk #%d (old line %d) does not apply' % (number, hunk.start + 1))
+
+        # Write the lines up to the hunk, its new lines and skip its old ones.
+        keep = found + pre - base
+        yield buf[:keep]
+        yield hunk.new[pre:len(hunk.new) - post]
+        del buf[:keep + len(pattern)]
+        base = found + pre + len(pattern)
+        shift = found - hunk.start
+        if report is not None:
+            report.append((number, found - expected, level))
+
+    yield buf
+    while True:
+        chunk = list(islice(source, 65536))
+        if not chunk:
+            return
+        yield chunk
+
+def apply_unified(original, diff, fuzz=2, max_offset=1000, report=None):
+    """Yield the lines of original with the unified diff of a single file
+    (an iterable of its lines) applied. See apply_hunks()."""
+    def hunks():
+        files = 0
+        for kind, value in parse_unified(diff):
+            if kind == 'file':
+                files += 1
+                if files > 1:
+                    raise PatchError('diff covers more than one file')
+            else:
+                yield value
+    return apply_hunks(original, hunks(), fuzz, max_offset, report)
+
+def _strip(name, strip):
+    """Remove strip leading components from name, like patch -p."""
+    parts = name.split('/')
+    if strip >= len(parts):
+        raise PatchError('cannot strip %d components from %r' % (strip, name))
+    return os.path.join(*parts[strip:])
+
+def _apply_file(root, strip, old, new, hunks, fuzz, max_offset, encoding, mode):
+    create = old == '/dev/null'
+    delete = new == '/dev/null'
+    name = old if not create and (delete or os.path.exists(os.path.join(root, _strip(old, strip))))\
+        else new
+    path = os.path.join(root, _strip(name, strip))
+    report = []
+    directory = os.path.dirname(path) or os.curdir
+    if create:
+        os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path) + '.')
+    try:
+        with os.fdopen(fd, 'w', encoding=encoding, errors='surrogateescape', newline='') as dst:
+            if create:
+                dst.writelines(apply_hunks([], hunks, fuzz, max_offset, report))
+            else:
+                with open(path, encoding=encoding, errors='surrogateescape', newline='') as src:
+                    for chunk in _apply(src, hunks, fuzz, max_offset, report):
+                        dst.write(''.join(chunk))
+        if delete:
+            if os.path.getsize(tmp):
+                raise PatchError('%s is not empty after removing its lines' % path)
+            os.remove(tmp)
+            os.remove(path)
+        else:
+            if not create:
+                shutil.copymode(path, tmp)
+            else:
+                # mkstemp() creates the file 0600; give it the mode open() would.
+                os.chmod(tmp, mode)
+            os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return path, report
+
+def apply_patch(diff, root=os.curdir, strip=0, fuzz=2, max_offset=1000, workers=None,
+                encoding='utf-8'):
+    """Apply a unified diff covering any number of files (an iterable of
+    its lines) to the tree at root, like patch -p<strip>.
+
+    Return one (path, report, error) triple per file, in diff order: report
+    lists the (hunk number, offset, fuzz) of each hunk, and error is the
+    exception that left the file unchanged, or None. With workers=N, N
+    threads patch files.
+    """
+    files = []
+    for kind, value in parse_unified(diff):
+        if kind == 'file':
+            files.append((value, []))
+        elif files:
+            files[-1][1].append(value)
+        else:
+            raise PatchError('hunk before the first file header')
+
+    # The umask can only be read by setting it, so do it once before any thread starts.
+    umask = os.umask(0)
+    os.umask(umask)
+    mode = 0o666 & ~umask
+
+    def run(item):
+        (old, new), hunks = item
+        try:
+            path, report = _apply_file(root, strip, old, new, hunks, fuzz, max_offset, encoding,
+                                       mode)
+            return path, report, None
+        except (PatchError, OSError) as e:
+            return new if old == '/dev/null' else old, [], e
+
+    if not workers:
+        return [run(item) for item in files]
+    with ThreadPoolExecutor(workers) as pool:
+        return list(pool.map(run, files))
+
+#
+# Benchmark: a diff touching 500 files of 2000 lines, applied by running patch once per file, by one patch run over the whole diff, and by
+# apply_patch() without and with threads.
+#
+
+def benchmark(files=500, lines=2000, seed=0):
+    import difflib, random, subprocess, time
+
+    rng = random.Random(seed)
+    top = tempfile.mkdtemp()
+    try:
+        originals = {}
+        diff = []
+        for k in range(files):
+            name = 'src/m%d/f%d.py' % (k % 20, k)
+            a = ['line %d of %s %d\n' % (i, name, rng.randrange(1000)) for i in range(lines)]
+            b = list(a)
+            for i in sorted(rng.sample(range(lines - 10), 5), reverse=True):
+                b[i:i + 2] = ['changed %d\n' % i]
+            originals[name] = (a, b)
+            diff.extend(difflib.unified_diff(a, b, name, name))
+
+        def tree(label):
+            root = os.path.join(top, label)
+            for name, (a, b) in originals.items():
+                path = os.path.join(root, name)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'w') as f:
+                    f.writelines(a)
+            return root
+
+        def check(root):
+            for name, (a, b) in originals.items():
+                with open(os.path.join(root, name)) as f:
+                    assert f.readlines() == b, name
+
+        per_file = os.path.join(top, 'per_file')
+        os.mkdir(per_file)
+        for k, name in enumerate(originals):
+            with open(os.path.join(per_file, '%d.diff' % k), 'w') as f:
+                f.writelines(difflib.unified_diff(*originals[name], name, name))
+        whole = os.path.join(top, 'all.diff')
+        with open(whole, 'w') as f:
+            f.writelines(diff)
+
+        def run_per_file(root):
+            for k in range(files):
+                subprocess.run(['patch', '-s', '-p0', '-d', root, '-i',
+                                os.path.join(per_file, '%d.diff' % k)], check=True)
+
+        def run_once(root):
+            subprocess.run(['patch', '-s', '-p0', '-d', root, '-i', whole], check=True)
+
+        def run_apply(workers):
+            def run(root):
+                with open(whole) as f:
+                    results = apply_patch(f, root, workers=workers)
+                assert all(error is None for path, report, error in results)
+            return run
+
+        for label, run in (('patch per file', run_per_file),
+                           ('patch once', run_once),
+                           ('apply_patch', run_apply(None)),
+                           ('apply_patch x4', run_apply(4))):
+            root = tree(label.replace(' ', '_'))
+            start = time.perf_counter()
+            run(root)
+            elapsed = time.perf_counter() - start
+            check(root)
+            print('%-15s %6.2f s' % (label, elapsed))
+    finally:
+        shutil.rmtree(top)
+
+if __name__ == '__main__':
+    import difflib, sys
+
+    s1 = ['bacon\n', 'eggs\n', 'ham\n', 'guido\n']
+    s2 = ['python\n', 'eggy\n', 'hamster\n', 'guido\n']
+    diff = list(difflib.unified_diff(s1, s2, fromfile='before.py', tofile='after.py'))
+
+    # The same diff applied to a file with two more lines at the top.
+    report = []
+    sys.stdout.writelines(apply_unified(['#!/usr/bin/env python\n', '\n'] + s1, diff, report=report))
+    print(report)
+
+    # OUTPUT:
+    #
+    # #!/usr/bin/env python
+    #
+    # python
+    # eggy
+    # hamster
+    # guido
+    # [(1, 2, 1)]
+    #
+
+    benchmark()
+
+    # OUTPUT: 'patch per file    0.79 s'
+    # OUTPUT: 'patch once        0.34 s'
+    # OUTPUT: 'apply_patch       0.38 s'
+    # OUTPUT: 'apply_patch x4    0.42 s'
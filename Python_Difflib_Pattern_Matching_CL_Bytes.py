@@ -0,0 +1,92 @@
+# Python Difflib Pattern Matching
+# difflib - Helpers for computing deltas
+# This module provides classes and functions for comparing sequences.
+#
+# difflib.diff_bytes(dfunc, a, b, fromfile=b'', tofile=b'', fromfiledate=b'', tofiledate=b'', n=3, lineterm=b'\n')
+# Compare a and b (lists of bytes objects) using dfunc; yield a sequence of delta lines (also bytes) in the format returned by dfunc.
+# dfunc must be a callable, typically either unified_diff() or context_diff().
+#
+
+#
+# Throughput of the CLI's --bytes mode against text mode.
+#
+
+#
+# Python_Difflib_Pattern_Matching_CL_Interface.py normally reads both files with readlines(), decoding every byte and splitting every line
+# before it looks for the first difference. With --bytes it reads each file in one call, finds the common head and tail by comparing the raw
+# contents in 64 KiB blocks, and splits and matches only the lines between them; output lines are memoryview slices decoded as ASCII with
+# surrogateescape, as diff_bytes() does.
+#
+# The benchmark diffs a 500000 line ASCII log (about 30 MB) against two edited copies:
+#
+# * appended: 5 lines changed near the end and 2000 lines appended, the usual shape of a growing log.
+# * scattered: 100 lines changed all over the file, so nearly every line is in the middle and the matcher dominates.
+#
+
+import os
+import random
+import shutil
+import tempfile
+import time
+
+import Python_Difflib_Pattern_Matching_CL_Interface as cl_interface
+
+def make_logs(top, lines=500000, seed=0):
+    """Write the log and its two edited copies to top; return their paths."""
+    rng = random.Random(seed)
+    a = ['%d INFO worker-%d processed request id=%08x in %d ms\n'
+         % (i, rng.randrange(16), rng.getrandbits(32), rng.randrange(1000)) for i in range(lines)]
+
+    appended = list(a)
+    for i in rng.sample(range(lines - 10000, lines), 5):
+        appended[i] = 'X' + appended[i]
+    appended += ['%d INFO appended %d\n' % (lines + i, i) for i in range(2000)]
+
+    scattered = list(a)
+    for i in rng.sample(range(lines), 100):
+        scattered[i] = 'X' + scattered[i]
+
+    paths = []
+    for name, content in (('log', a), ('appended', appended), ('scattered', scattered)):
+        paths.append(os.path.join(top, name))
+        with open(paths[-1], 'w') as f:
+            f.writelines(content)
+    return paths
+
+def throughput(fromfile, tofile, args, runs=3):
+    """Return the best time, in seconds, to produce the diff of two files
+    with the CLI options args, and the size of the diff."""
+    options = cl_interface.parse_fast(args + [fromfile, tofile])
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        size = sum(map(len, cl_interface.diff_files(fromfile, tofile, options)))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, size
+
+def benchmark():
+    top = tempfile.mkdtemp()
+    try:
+        log, appended, scattered = make_logs(top)
+        for name, tofile, algorithm in (('appended', appended, 'ratcliff'),
+                                        ('scattered', scattered, 'myers')):
+            megabytes = (os.path.getsize(log) + os.path.getsize(tofile)) / 1e6
+            for mode in ([], ['--bytes']):
+                seconds, size = throughput(log, tofile, mode + ['-u', '--algorithm', algorithm])
+                print('%-10s %-8s %6.2f s %6.1f MB/s, %d byte diff'
+                      % (name, 'bytes' if mode else 'text', seconds, megabytes / seconds, size))
+    finally:
+        shutil.rmtree(top)
+
+#
+# Example:
+#
+
+if __name__ == '__main__':
+    benchmark()
+
+    # OUTPUT: 'appended   text       0.29 s  213.3 MB/s, 55848 byte diff'
+    # OUTPUT: 'appended   bytes      0.17 s  367.5 MB/s, 55848 byte diff'
+    # OUTPUT: 'scattered  text       1.73 s   35.2 MB/s, 52435 byte diff'
+    # OUTPUT: 'scattered  bytes      1.67 s   36.6 MB/s, 52435 byte diff'
@@ -1,3 +1,4 @@
+# -*- coding: cp1252 -*-
 # Python Difflib Pattern Matching
 # difflib  Helpers for computing deltas
 # This module provides classes and functions for comparing sequences.
@@ -43,18 +44,780 @@
 * unified:  highlights clusters of changes in an inline format.
 * html:     generates side by side comparison with change highlights.
 
+With --mmap both files are memory-mapped instead of read into lists. As
+with --bytes, the common head and tail are found by comparing the mappings
+in large blocks, and only the lines of the changed middle are split and
+interned; lines are compared with their endings translated as in text
+mode, so the output is the same, and only the lines that end up in the
+output hunks are decoded. The mappings are closed once the diff is
+written.
+
+With --bytes the files are compared as bytes, as difflib.diff_bytes()
+does: each is read in one call, lines are split on b'\n' only, and the
+output repeats their bytes unchanged, so files in any mix of encodings can
+be diffed. The common head and tail are found by comparing the contents in
+large blocks and only the lines between them are matched. Output lines are
+memoryview slices of the contents, and only they are decoded.
+
+Before matching, unified and context diffs strip the common head and tail
+of the two files and map the remaining lines to small integer IDs through a
+shared intern table, so near-identical files only pay for the changed
+middle (use --no-trim to match the whole files).
+
+--algorithm selects the line matching engine: SequenceMatcher's
+Ratcliff-Obershelp matcher (the default), Myers, patience or histogram diff.
+
+The HTML page is written row by row as it is produced. Changed characters
+are only highlighted in lines of at most --max-line-length characters, and
+for at most --time-budget seconds in total; other changed lines are shown
+as whole-line changes.
+
+With two directories, or a --manifest listing file pairs, every pair is
+diffed (-u or -c) on a pool of --jobs worker processes and the diffs are
+written one after the other, in sorted path (or manifest) order. Pairs
+with identical contents are skipped before any diffing, and a file present
+in one directory only is compared with an empty file named /dev/null.
+A directory and a file compare the file with the file of the same name in
+the directory, as diff does.
+
+With --cache FILE, the opcodes of every diffed pair are kept in a SQLite
+file keyed by the digests of the two files' contents, the algorithm,
+--no-trim and --bytes; a later diff of files with the same contents rebuilds its
+output from the stored opcodes without running the matcher. The cache
+holds at most --cache-size bytes of opcodes, evicting the least recently
+used, and --cache-stats prints its counters.
+
+In ndiff output, --max-block, --pairing and --time-budget bound the search
+for similar line pairs inside each changed block (see Differ in
+Python_Difflib_Pattern_Matching_Diff_Algorithms.py); blocks past a limit
+are written as plain '-' and '+' lines.
+
+Plain -c, -u and -n diffs of two files are parsed without argparse, and
+modules are imported only by the code that uses them. For many small
+diffs, --serve SOCKET keeps one process with everything imported
+listening on a Unix socket, and --connect SOCKET followed by the usual
+arguments has it run the diff (in a forked child, in the caller's working
+directory) and copies back its output and exit status. Run as
+"python -m Python_Difflib_Pattern_Matching_CL_Interface", the CLI itself
+is loaded from cached bytecode instead of being compiled on every call.
+
 """
 
-import sys, os, difflib, argparse
-from datetime import datetime, timezone
+# Only sys and os are imported up front; every other module is imported by
+# the code that needs it, so a plain -u run does not pay for argparse, the
+# HTML writer, the cache or the process pool.
+import io, sys, os
 
 def file_mtime(path):
+    from datetime import datetime, timezone
+
     t = datetime.fromtimestamp(os.stat(path).st_mtime,
                                timezone.utc)
 
     return t.astimezone().isoformat()
 
-def main():
+class ByteLines:
+    """Read-only sequence of the lines of a file compared as bytes.
+
+    The file is read in one call and split on b'\n' only. lines() returns
+    lines as zero-copy memoryview slices of the contents; indexing returns
+    them decoded as ASCII with surrogateescape, as difflib.diff_bytes()
+    does, so only the lines that reach the output are decoded. Line
+    offsets are found on demand, from the nearest line already located.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb', buffering=0) as f:
+            self.data = f.read()
+        self._view = memoryview(self.data)
+        self._index()
+
+    def _index(self):
+        self._count = self.newlines(0, len(self.data)) + (self.data[-1:] not in (b'', b'\n'))
+        self._known = [0, self._count]
+        self._offsets = {0: 0, self._count: len(self.data)}
+
+    def newlines(self, start, stop):
+        """Return the number of newlines in data[start:stop]."""
+        return self.data.count(b'\n', start, stop)
+
+    def __len__(self):
+        return self._count
+
+    def locate(self, i, offset):
+        """Record that line i starts at byte offset."""
+        if i not in self._offsets:
+            from bisect import insort
+
+            insort(self._known, i)
+            self._offsets[i] = offset
+
+    def offset(self, i):
+        """Return the byte offset at which line i starts."""
+        if i in self._offsets:
+            return self._offsets[i]
+        from bisect import bisect
+
+        known = self._known[bisect(self._known, i) - 1]
+        pos = self._offsets[known]
+        n = i - known
+        # Skip newlines in windows counted by bytes.count(), doubling the
+        # window while it holds fewer than are left and halving it when not.
+        size = 4096
+        while n > 0 and size >= 256:
+            k = self.newlines(pos, pos + size)
+            if k < n:
+                pos += size
+                n -= k
+                size *= 2
+            else:
+                size //= 2
+        for _ in range(n):
+            pos = self.data.find(b'\n', pos) + 1
+        self.locate(i, pos)
+        return pos
+
+    def lines(self, start, stop):
+        """Return lines start to stop as memoryview slices."""
+        pos = self.offset(start)
+        find = self.data.find
+        view = self._view
+        lines = []
+        for _ in range(stop - start):
+            end = find(b'\n', pos) + 1 or len(self.data)
+            lines.append(view[pos:end])
+            pos = end
+        self.locate(stop, pos)
+        return lines
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, _ = i.indices(len(self))
+            return [str(line, 'ascii', 'surrogateescape')
+                    for line in self.lines(start, max(start, stop))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('line index out of range')
+        return str(self.lines(i, i + 1)[0], 'ascii', 'surrogateescape')
+
+def _common_length(a, b, limit, reverse=False, block=1 << 16):
+    """Return the length (at most limit) of the common prefix of the bytes
+    a and b, or of their common suffix if reverse is true. They are
+    compared block bytes at a time, then the differing block is halved."""
+    la, lb = len(a), len(b)
+
+    def equal(i, size):
+        if reverse:
+            return a[max(la - i - size, 0):la - i] == b[max(lb - i - size, 0):lb - i]
+        return a[i:i + size] == b[i:i + size]
+
+    i = 0
+    while i < limit and equal(i, block):
+        i += block
+    while block > 1 and i < limit:
+        block //= 2
+        if equal(i, block):
+            i += block
+    return min(i, limit)
+
+def _line_keys(data, start, stop):
+    """Return the lines of data[start:stop] as matcher keys: one bytes.split()
+    is much cheaper than a memoryview slice per line. The newline is left
+    off, so a last line without one is wrapped in a tuple."""
+    keys = data[start:stop].split(b'\n')
+    if keys[-1]:
+        keys[-1] = (keys[-1],)
+    else:
+        keys.pop()
+    return keys
+
+def _common_lines(a, b):
+    """Return the numbers of leading and trailing lines whose bytes two
+    ByteLines share, found by comparing their contents in large blocks,
+    and locate the lines where the middles start and end."""
+    limit = min(len(a.data), len(b.data))
+    head = a.data.rfind(b'\n', 0, _common_length(a.data, b.data, limit)) + 1
+    suffix = _common_length(a.data, b.data, limit - head, reverse=True)
+    tail_a, tail_b = len(a.data) - suffix, len(b.data) - suffix
+    if not ((tail_a == 0 or a.data[tail_a - 1] == 10) and
+            (tail_b == 0 or b.data[tail_b - 1] == 10)):
+        # The suffix starts inside a line; the tail starts at the next line.
+        k = a.data.find(b'\n', tail_a) + 1 or len(a.data)
+        tail_a, tail_b = k, tail_b + k - tail_a
+
+    lo = a.newlines(0, head)
+    a.locate(lo, head)
+    b.locate(lo, head)
+    tail = len(a) - lo - a.newlines(head, tail_a) if tail_a < len(a.data) else 0
+    a.locate(len(a) - tail, tail_a)
+    b.locate(len(b) - tail, tail_b)
+    return lo, tail
+
+def byte_opcodes(a, b, algorithm='ratcliff', trim=True):
+    """trimmed_opcodes() for two ByteLines.
+
+    The common head and tail are found by comparing the file contents in
+    large blocks, so only the lines of the differing middle are split.
+    """
+    lo, tail = _common_lines(a, b) if trim else (0, 0)
+    return _opcodes_around(lo, tail, len(a), len(b),
+                           _line_keys(a.data, a.offset(lo), a.offset(len(a) - tail)),
+                           _line_keys(b.data, b.offset(lo), b.offset(len(b) - tail)),
+                           algorithm)
+
+class _Mapping:
+    """Read-only mmap of a file whose slices drop the pages they cover from
+    the process's resident set once copied (MADV_DONTNEED where available),
+    so scanning a large file leaves only the pages in use mapped. map is
+    the mmap itself, for reads that release() their range afterwards."""
+
+    def __init__(self, f):
+        import mmap
+
+        self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._page = mmap.PAGESIZE
+        self._advice = getattr(mmap, 'MADV_DONTNEED', None)
+        self.find = self.map.find
+        self.rfind = self.map.rfind
+
+    def __len__(self):
+        return len(self.map)
+
+    def __getitem__(self, i):
+        data = self.map[i]
+        if isinstance(i, slice):
+            start, stop, _ = i.indices(len(self.map))
+            self.release(start, stop)
+        return data
+
+    def release(self, start, stop):
+        """Drop the pages wholly inside map[start:stop] from memory."""
+        first = -(-start // self._page) * self._page
+        last = stop // self._page * self._page
+        if last > first and self._advice is not None:
+            self.map.madvise(self._advice, first, last - first)
+
+    def close(self):
+        self.map.close()
+
+class MappedLines(ByteLines):
+    """Read-only sequence of the lines of a memory-mapped file.
+
+    Lines end at \n, \r\n or a lone \r and are compared and decoded with
+    their endings translated to \n, as in a file opened in text mode, so
+    they are the lines readlines() would return. As in ByteLines, line
+    offsets are found on demand and only indexed lines are decoded; lines()
+    returns bytes copied out of the mapping. Only a file holding a lone \r
+    has the offsets of all its lines found up front.
+    """
+
+    def __init__(self, path, encoding=None):
+        import locale
+
+        self.encoding = encoding or locale.getpreferredencoding(False)
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size:
+                self.data = _Mapping(f)
+            else:
+                self.data = b''
+        self._starts = None
+        self._crs = self._occurrences(b'\r')
+        if self._crs and self._crs != self._occurrences(b'\r\n'):
+            import re
+            from array import array
+
+            self._starts = starts = array('q', [0])
+            starts.extend(m.end() for m in re.finditer(rb'\r\n?|\n', self.data.map))
+            if starts[-1] != len(self.data):
+                starts.append(len(self.data))
+            self.data.release(0, len(self.data))
+            self._count = len(starts) - 1
+        else:
+            self._index()
+
+    def _occurrences(self, sub, start=0, stop=None, block=1 << 20):
+        """Return the number of sub in data[start:stop], counted in blocks."""
+        stop = len(self.data) if stop is None else stop
+        n = 0
+        for pos in range(start, stop, block):
+            n += self.data[pos:min(pos + block + len(sub) - 1, stop)].count(sub)
+        return n
+
+    def newlines(self, start, stop):
+        return self._occurrences(b'\n', start, stop)
+
+    def offset(self, i):
+        if self._starts is None:
+            return super().offset(i)
+        return self._starts[i]
+
+    def lines(self, start, stop):
+        """Return lines start to stop as bytes, with their line endings."""
+        if start >= stop:
+            return []
+        data = self.data.map
+        if self._starts is not None:
+            starts = self._starts
+            lines = [data[starts[k]:starts[k + 1]] for k in range(start, stop)]
+            self.data.release(starts[start], starts[stop])
+            return lines
+        first = pos = self.offset(start)
+        find = data.find
+        lines = []
+        for _ in range(stop - start):
+            end = find(b'\n', pos) + 1 or len(data)
+            lines.append(data[pos:end])
+            pos = end
+        self.locate(stop, pos)
+        self.data.release(first, pos)
+        return lines
+
+    def normalized(self, start, stop):
+        """Return lines start to stop as bytes ending in \n (but the last
+        line of a file without a line ending)."""
+        if not self._crs:
+            return self.lines(start, stop)
+        return [_normalized(line) for line in self.lines(start, stop)]
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, _ = i.indices(len(self))
+            return [line.decode(self.encoding)
+                    for line in self.normalized(start, max(start, stop))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('line index out of range')
+        return self.normalized(i, i + 1)[0].decode(self.encoding)
+
+    def __iter__(self, batch=4096):
+        for start in range(0, len(self), batch):
+            yield from self[start:start + batch]
+
+    def close(self):
+        if not isinstance(self.data, bytes):
+            self.data.close()
+
+def _normalized(line):
+    if line.endswith(b'\r\n'):
+        return line[:-2] + b'\n'
+    if line.endswith(b'\r'):
+        return line[:-1] + b'\n'
+    return line
+
+def _mapped_keys(lines, start, stop, table, batch=4096):
+    """Return lines start to stop of a MappedLines as matcher keys: their
+    normalized bytes, interned in table, a dict shared with the other file,
+    so equal lines of both files are one object. Only the lines between
+    start and stop are split, a batch at a time."""
+    intern = table.setdefault
+    keys = []
+    for k in range(start, stop, batch):
+        keys.extend([intern(line, line) for line in lines.normalized(k, min(k + batch, stop))])
+    return keys
+
+def mapped_opcodes(a, b, algorithm='ratcliff', trim=True):
+    """trimmed_opcodes() for two MappedLines, with the same result as for
+    the lines of the files read in text mode.
+
+    The lines whose bytes the files share at their head and tail are found
+    by comparing the mappings in large blocks; the head and tail then grow
+    over lines equal only once their endings are translated, compared a
+    batch at a time. Only the lines of the differing middle are interned.
+    """
+    import Python_Difflib_Pattern_Matching_Diff_Algorithms as diff_algorithms
+
+    la, lb = len(a), len(b)
+    table = {}
+    if not trim:
+        return diff_algorithms.get_opcodes(_mapped_keys(a, 0, la, table),
+                                           _mapped_keys(b, 0, lb, table), algorithm)
+
+    lo = tail = 0
+    if a._starts is None and b._starts is None:
+        lo, tail = _common_lines(a, b)
+    hi = min(la, lb)
+
+    size = 64
+    while lo < hi:
+        n = min(size, hi - lo)
+        k = 0
+        for x, y in zip(a.normalized(lo, lo + n), b.normalized(lo, lo + n)):
+            if x != y:
+                break
+            k += 1
+        lo += k
+        if k < n:
+            break
+        size = min(2 * size, 1 << 14)
+
+    tail = min(tail, hi - lo)
+    size = 64
+    while tail < hi - lo:
+        n = min(size, hi - lo - tail)
+        k = 0
+        for x, y in zip(reversed(a.normalized(la - tail - n, la - tail)),
+                        reversed(b.normalized(lb - tail - n, lb - tail))):
+            if x != y:
+                break
+            k += 1
+        tail += k
+        if k < n:
+            break
+        size = min(2 * size, 1 << 14)
+
+    return _opcodes_around(lo, tail, la, lb, _mapped_keys(a, lo, la - tail, table),
+                           _mapped_keys(b, lo, lb - tail, table), algorithm)
+
+def intern_lines(a, b):
+    """Map the lines of a and b to compact integer IDs.
+
+    Both sides share one table, so equal lines get equal IDs.
+    """
+    table = {}
+    ids = table.setdefault
+    from array import array
+
+    return (array('l', [ids(line, len(table)) for line in a]),
+            array('l', [ids(line, len(table)) for line in b]))
+
+def trimmed_opcodes(a, b, algorithm='ratcliff'):
+    """SequenceMatcher(None, a, b).get_opcodes() with the common head and
+    tail stripped before matching, computed by the given algorithm.
+
+    Only the differing middle is interned and handed to the matcher; its
+    opcodes are shifted back to line numbers in a and b.
+    """
+    la, lb = len(a), len(b)
+    lo = 0
+    hi = min(la, lb)
+    while lo < hi and a[lo] == b[lo]:
+        lo += 1
+    tail = 0
+    while tail < hi - lo and a[la - tail - 1] == b[lb - tail - 1]:
+        tail += 1
+    return _opcodes_around(lo, tail, la, lb, a[lo:la - tail], b[lo:lb - tail], algorithm)
+
+def _opcodes_around(lo, tail, la, lb, mid_a, mid_b, algorithm):
+    """Return the opcodes of two sequences of la and lb lines which share
+    their first lo and last tail lines, given their differing middles."""
+    import Python_Difflib_Pattern_Matching_Diff_Algorithms as diff_algorithms
+
+    codes = []
+    if lo:
+        codes.append(('equal', 0, lo, 0, lo))
+    if la - tail > lo or lb - tail > lo:
+        mid_a, mid_b = intern_lines(mid_a, mid_b)
+        for tag, i1, i2, j1, j2 in diff_algorithms.get_opcodes(
+                mid_a, mid_b, algorithm):
+            codes.append((tag, i1 + lo, i2 + lo, j1 + lo, j2 + lo))
+    if tail:
+        if codes and codes[-1][0] == 'equal':
+            _, i1, _, j1, _ = codes.pop()
+        else:
+            i1, j1 = la - tail, lb - tail
+        codes.append(('equal', i1, la, j1, lb))
+    return codes
+
+def group_opcodes(codes, n=3):
+    """SequenceMatcher.get_grouped_opcodes() applied to a list of opcodes."""
+    codes = list(codes)
+    if not codes:
+        codes = [("equal", 0, 1, 0, 1)]
+    if codes[0][0] == 'equal':
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = tag, max(i1, i2-n), i2, max(j1, j2-n), j2
+    if codes[-1][0] == 'equal':
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = tag, i1, min(i2, i1+n), j1, min(j2, j1+n)
+
+    nn = n + n
+    group = []
+    for tag, i1, i2, j1, j2 in codes:
+        if tag == 'equal' and i2-i1 > nn:
+            group.append((tag, i1, min(i2, i1+n), j1, min(j2, j1+n)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2-n), max(j1, j2-n)
+        group.append((tag, i1, i2, j1 ,j2))
+    if group and not (len(group)==1 and group[0][0] == 'equal'):
+        yield group
+
+def _format_range_unified(start, stop):
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return '{}'.format(beginning)
+    if not length:
+        beginning -= 1
+    return '{},{}'.format(beginning, length)
+
+def _format_range_context(start, stop):
+    beginning = start + 1
+    length = stop - start
+    if not length:
+        beginning -= 1
+    if length <= 1:
+        return '{}'.format(beginning)
+    return '{},{}'.format(beginning, beginning + length - 1)
+
+def unified_diff_from_opcodes(a, b, groups, fromfile='', tofile='',
+                              fromfiledate='', tofiledate='', lineterm='\n'):
+    """difflib.unified_diff() driven by precomputed grouped opcodes.
+
+    a and b only need to support slicing, so lines outside the hunks are
+    never touched.
+    """
+    started = False
+    for group in groups:
+        if not started:
+            started = True
+            fromdate = '\t{}'.format(fromfiledate) if fromfiledate else ''
+            todate = '\t{}'.format(tofiledate) if tofiledate else ''
+            yield '--- {}{}{}'.format(fromfile, fromdate, lineterm)
+            yield '+++ {}{}{}'.format(tofile, todate, lineterm)
+
+        first, last = group[0], group[-1]
+        file1_range = _format_range_unified(first[1], last[2])
+        file2_range = _format_range_unified(first[3], last[4])
+        yield '@@ -{} +{} @@{}'.format(file1_range, file2_range, lineterm)
+
+        for tag, i1, i2, j1, j2 in group:
+            if tag == 'equal':
+                for line in a[i1:i2]:
+                    yield ' ' + line
+                continue
+            if tag in {'replace', 'delete'}:
+                for line in a[i1:i2]:
+                    yield '-' + line
+            if tag in {'replace', 'insert'}:
+                for line in b[j1:j2]:
+                    yield '+' + line
+
+def context_diff_from_opcodes(a, b, groups, fromfile='', tofile='',
+                              fromfiledate='', tofiledate='', lineterm='\n'):
+    """difflib.context_diff() driven by precomputed grouped opcodes."""
+    prefix = dict(insert='+ ', delete='- ', replace='! ', equal='  ')
+    started = False
+    for group in groups:
+        if not started:
+            started = True
+            fromdate = '\t{}'.format(fromfiledate) if fromfiledate else ''
+            todate = '\t{}'.format(tofiledate) if tofiledate else ''
+            yield '*** {}{}{}'.format(fromfile, fromdate, lineterm)
+            yield '--- {}{}{}'.format(tofile, todate, lineterm)
+
+        first, last = group[0], group[-1]
+        yield '***************' + lineterm
+
+        file1_range = _format_range_context(first[1], last[2])
+        yield '*** {} ****{}'.format(file1_range, lineterm)
+
+        if any(tag in {'replace', 'delete'} for tag, _, _, _, _ in group):
+            for tag, i1, i2, _, _ in group:
+                if tag != 'insert':
+                    for line in a[i1:i2]:
+                        yield prefix[tag] + line
+
+        file2_range = _format_range_context(first[3], last[4])
+        yield '--- {} ----{}'.format(file2_range, lineterm)
+
+        if any(tag in {'replace', 'insert'} for tag, _, _, _, _ in group):
+            for tag, _, _, j1, j2 in group:
+                if tag != 'delete':
+                    for line in b[j1:j2]:
+                        yield prefix[tag] + line
+
+_cache = None
+
+def open_cache(options):
+    """Return the opcode cache named by --cache, opened once per process."""
+    global _cache
+    if _cache is None:
+        from Python_Difflib_Pattern_Matching_Opcode_Cache import OpcodeCache
+
+        _cache = OpcodeCache(options.cache, options.cache_size)
+    return _cache
+
+def cache_options(options):
+    """Return the options string of the cache key: whatever besides the
+    file contents and the algorithm changes the opcodes. Text and --mmap
+    runs split and compare lines the same way, so they share entries;
+    --bytes splits on b'\n' only and gets its own."""
+    return ('bytes ' if options.bytes else '') + ('trim' if options.trim else 'no-trim')
+
+def output_format(options):
+    """Return the diff format selected by options: 'u', 'n', 'm' or 'c'.
+    When several are given, -u wins over -n, -n over -m, and -m over the
+    default context format (-c with -m selects HTML context mode)."""
+    for name in 'unm':
+        if getattr(options, name):
+            return name
+    return 'c'
+
+def diff_files(fromfile, tofile, options):
+    """Yield the diff of two files in the format selected by options (the
+    parsed command line). A file named os.devnull is read as empty."""
+    import Python_Difflib_Pattern_Matching_Diff_Algorithms as diff_algorithms
+
+    n = options.lines
+    fmt = output_format(options)
+
+    fromdate = file_mtime(fromfile) if fromfile != os.devnull else ''
+    todate = file_mtime(tofile) if tofile != os.devnull else ''
+
+    if options.bytes:
+        fromlines = ByteLines(fromfile)
+        tolines = ByteLines(tofile)
+
+    elif options.mmap:
+        fromlines = MappedLines(fromfile)
+        tolines = MappedLines(tofile)
+
+    else:
+        with open(fromfile) as ff:
+            fromlines = ff.readlines()
+
+        with open(tofile) as tf:
+            tolines = tf.readlines()
+
+    if fmt != 'n':
+        def compute():
+            if options.bytes:
+                return byte_opcodes(fromlines, tolines, options.algorithm, options.trim)
+
+            if options.mmap:
+                return mapped_opcodes(fromlines, tolines, options.algorithm, options.trim)
+
+            if options.trim:
+                return trimmed_opcodes(fromlines, tolines, options.algorithm)
+
+            return diff_algorithms.get_opcodes(fromlines, tolines, options.algorithm)
+
+        if options.cache:
+            codes = open_cache(options).opcodes(fromfile, tofile, compute, options.algorithm,
+                                                cache_options(options))
+
+        else:
+            codes = compute()
+
+        groups = group_opcodes(codes, n)
+
+        if fmt == 'm':
+            import Python_Difflib_Pattern_Matching_Html_Diff as html_diff
+
+            writer = html_diff.HtmlDiffWriter(max_line_length=options.max_line_length,
+                                              time_budget=options.time_budget)
+            diff = writer.iter_file(fromlines, tolines, fromfile, tofile, context=options.c,
+                                    numlines=n, opcodes=codes)
+
+        else:
+            fromname, toname = fromfile, tofile
+
+            if options.bytes:
+                fromname = os.fsencode(fromfile).decode('ascii', 'surrogateescape')
+                toname = os.fsencode(tofile).decode('ascii', 'surrogateescape')
+
+            if fmt == 'u':
+                diff = unified_diff_from_opcodes(fromlines, tolines, groups, fromname, toname, fromdate, todate)
+
+            else:
+                diff = context_diff_from_opcodes(fromlines, tolines, groups, fromname, toname, fromdate, todate)
+
+            if options.bytes:
+                diff = (line.encode('ascii', 'surrogateescape') for line in diff)
+
+    else:
+        diff = diff_algorithms.ndiff(fromlines, tolines, options.algorithm,
+                                     max_block=options.max_block, pairing=options.pairing,
+                                     time_budget=options.time_budget)
+
+    if options.mmap:
+        diff = _closing(diff, fromlines, tolines)
+
+    return diff
+
+def _closing(diff, *files):
+    """Yield the lines of diff, then close files."""
+    try:
+        yield from diff
+    finally:
+        for f in files:
+            f.close()
+
+def directory_pairs(fromdir, todir):
+    """Return the (fromfile, tofile) pairs of two directory trees, sorted by
+    relative path. A file present on one side only is paired with
+    os.devnull."""
+    def files(top):
+        found = set()
+        for dirpath, dirnames, filenames in os.walk(top):
+            rel = os.path.relpath(dirpath, top)
+            for name in filenames:
+                found.add(os.path.normpath(os.path.join(rel, name)))
+        return found
+
+    old, new = files(fromdir), files(todir)
+    return [(os.path.join(fromdir, rel) if rel in old else os.devnull,
+             os.path.join(todir, rel) if rel in new else os.devnull)
+            for rel in sorted(old | new)]
+
+def read_manifest(path):
+    """Return the (fromfile, tofile) pairs listed in a manifest file, one
+    tab separated pair per line. Blank lines and lines starting with '#'
+    are skipped."""
+    pairs = []
+    with open(path) as f:
+        for line in f:
+            line = line.rstrip('\r\n')
+            if not line.strip() or line.lstrip().startswith('#'):
+                continue
+            fromfile, sep, tofile = line.partition('\t')
+            if not sep:
+                raise ValueError('%s: expected "fromfile<TAB>tofile": %r' % (path, line))
+            pairs.append((fromfile, tofile))
+    return pairs
+
+_comparator = None
+
+def _diff_pair(task):
+    """Return the diff of one pair as a string, '' for identical files."""
+    global _comparator
+    fromfile, tofile, options = task
+    if fromfile != os.devnull and tofile != os.devnull:
+        if _comparator is None:
+            from Python_Filecmp_Tiered_Compare import TieredComparator
+
+            _comparator = TieredComparator()
+        if _comparator(fromfile, tofile):
+            return ''
+    diff = diff_files(fromfile, tofile, options)
+    return b''.join(diff) if options.bytes else ''.join(diff)
+
+def batch_diff(pairs, options):
+    """Yield the diff of each (fromfile, tofile) pair, in order, diffing
+    options.jobs pairs at a time in worker processes. Pairs of identical
+    files are skipped."""
+    tasks = [(fromfile, tofile, options) for fromfile, tofile in pairs]
+    if options.jobs is None or options.jobs <= 1:
+        results = map(_diff_pair, tasks)
+        for text in results:
+            if text:
+                yield text
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(options.jobs) as pool:
+        chunksize = max(1, min(64, len(tasks) // (8 * options.jobs)))
+        for text in pool.map(_diff_pair, tasks, chunksize=chunksize):
+            if text:
+                yield text
+
+def build_parser():
+    import argparse
+    import Python_Difflib_Pattern_Matching_Diff_Algorithms as diff_algorithms
 
     parser = argparse.ArgumentParser()
 
@@ -74,39 +837,336 @@ def main():
     parser.add_argument('-l', '--lines', type=int, default=3,
                         help='Set number of context lines (default 3)')
 
-    parser.add_argument('fromfile')
+    parser.add_argument('--mmap', action='store_true', default=False,
+                        help='Memory-map the inputs and decode only the '
+                             'lines that appear in the output')
 
-    parser.add_argument('tofile')
+    parser.add_argument('--bytes', action='store_true', default=False,
+                        help='Compare the files as bytes split on \\n and '
+                             'write their lines unchanged (-c and -u only)')
 
-    options = parser.parse_args()
+    parser.add_argument('--no-trim', dest='trim', action='store_false',
+                        help='Match the whole files instead of only the '
+                             'part between their common head and tail')
 
-    n = options.lines
-    fromfile = options.fromfile
+    parser.add_argument('--algorithm', choices=diff_algorithms.ALGORITHMS,
+                        default='ratcliff',
+                        help='Line matching algorithm (default ratcliff)')
+
+    parser.add_argument('--max-line-length', type=int, default=1000,
+                        help='Longest line whose changed characters are '
+                             'highlighted in HTML output (default 1000)')
+
+    parser.add_argument('--time-budget', type=float, default=None,
+                        help='Seconds to spend highlighting changed '
+                             'characters before showing whole-line changes')
+
+    parser.add_argument('--max-block', type=int, default=None,
+                        help='Largest changed block, in lines, searched for '
+                             'similar lines in ndiff output')
+
+    parser.add_argument('--pairing', choices=('all', 'ngram'), default='all',
+                        help='Compare all line pairs of a changed block, or '
+                             'only those sharing character n-grams, in ndiff '
+                             'output (default all)')
+
+    parser.add_argument('--manifest', metavar='FILE',
+                        help='Diff the file pairs listed in FILE, one '
+                             '"fromfile<TAB>tofile" pair per line')
+
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                        help='Worker processes for directory and manifest '
+                             'diffs (default: one per CPU)')
+
+    parser.add_argument('--cache', metavar='FILE',
+                        help='Keep the opcodes of diffed file pairs in this '
+                             'SQLite file and reuse them for files with the '
+                             'same contents')
+
+    parser.add_argument('--cache-size', type=int, default=64*1024*1024,
+                        help='Maximum size of the cached opcodes in bytes '
+                             '(default 64 MiB)')
 
-    tofile = options.tofile
+    parser.add_argument('--cache-stats', action='store_true', default=False,
+                        help='Print the cache statistics to stderr when done')
 
-    fromdate = file_mtime(fromfile)
-    todate = file_mtime(tofile)
+    parser.add_argument('--serve', metavar='SOCKET',
+                        help='Stay running and serve diff requests sent by '
+                             '--connect SOCKET on this Unix socket')
 
-    with open(fromfile) as ff:
-        fromlines = ff.readlines()
+    parser.add_argument('--connect', metavar='SOCKET',
+                        help='Have the --serve process on this Unix socket run '
+                             'the rest of the command line (must come first)')
 
-    with open(tofile) as tf:
-        tolines = tf.readlines()
+    parser.add_argument('fromfile', nargs='?')
 
-    if options.u:
-        diff = difflib.unified_diff(fromlines, tolines, fromfile, tofile, fromdate, todate, n=n)
+    parser.add_argument('tofile', nargs='?')
 
-    elif options.n:
-        diff = difflib.ndiff(fromlines, tolines)
+    return parser
 
-    elif options.m:
-        diff = difflib.HtmlDiff().make_file(fromlines,tolines,fromfile,tofile,context=options.c,numlines=n)
+# The options parse_fast() understands and their build_parser() defaults.
+_FAST_DEFAULTS = dict(c=False, u=False, m=False, n=False, lines=3, mmap=False, bytes=False, trim=True,
+                      algorithm='ratcliff', max_line_length=1000, time_budget=None,
+                      max_block=None, pairing='all', manifest=None, jobs=os.cpu_count(),
+                      cache=None, cache_size=64*1024*1024, cache_stats=False, serve=None,
+                      connect=None)
+
+def parse_fast(args):
+    """Parse the common command lines, [-c | -u | -n] [-l N] [--algorithm
+    NAME] [--bytes] [--no-trim] fromfile tofile, without importing argparse.
+    Return None for anything else, to be handled by build_parser()."""
+    import Python_Difflib_Pattern_Matching_Diff_Algorithms as diff_algorithms
+
+    options = dict(_FAST_DEFAULTS)
+    files = []
+    args = iter(args)
+    for arg in args:
+        if files and arg.startswith('-') and arg != '-':
+            return None
+        elif arg in ('-c', '-u', '-n'):
+            options[arg[1]] = True
+        elif arg == '--no-trim':
+            options['trim'] = False
+        elif arg == '--bytes':
+            options['bytes'] = True
+        elif arg in ('-l', '--lines', '--algorithm') or \
+             arg.startswith(('--lines=', '--algorithm=')) or \
+             arg.startswith('-l') and arg[2:].isdecimal():
+            if arg.startswith('--'):
+                name, equals, value = arg[2:].partition('=')
+                if not equals:
+                    value = next(args, None)
+            else:
+                name, value = 'lines', arg[2:] or next(args, None)
+            if name == 'lines':
+                if value is None or not value.isdecimal():
+                    return None
+                options['lines'] = int(value)
+            elif value in diff_algorithms.ALGORITHMS:
+                options['algorithm'] = value
+            else:
+                return None
+        elif arg == '--':
+            files.extend(args)
+        elif arg.startswith('-') and arg != '-':
+            return None
+        else:
+            files.append(arg)
+    if len(files) != 2:
+        return None
+    options['fromfile'], options['tofile'] = files
+
+    from types import SimpleNamespace
+
+    return SimpleNamespace(**options)
+
+def main(args=None, served=False):
+    """Run the CLI on args (default sys.argv[1:]). served is true in the
+    child running a --connect request, which may not start another server
+    or connect to one."""
+    if args is None:
+        args = sys.argv[1:]
+
+    if args[:1] == ['--connect'] and len(args) > 1 or args[:1] and args[0].startswith('--connect='):
+        if served:
+            build_parser().error('--connect cannot be sent to a --serve process')
+
+        path, rest = (args[1], args[2:]) if args[0] == '--connect' else (args[0][10:], args[1:])
+
+        if not path:
+            build_parser().error('--connect needs the path of the --serve socket')
+
+        sys.exit(connect(path, rest))
+
+    options = parse_fast(args)
+
+    if options is None:
+        parser = build_parser()
+        options = parser.parse_args(args)
+        error = parser.error
+
+        if options.serve:
+            if served:
+                error('--serve cannot be sent to a --serve process')
+
+            serve(options.serve)
+            return
+
+        if options.connect is not None:
+            if served:
+                error('--connect cannot be sent to a --serve process')
+
+            error('--connect SOCKET must come before the other arguments')
 
     else:
-        diff = difflib.context_diff(fromlines, tolines, fromfile, tofile, fromdate, todate, n=n)
+        error = lambda message: build_parser().error(message)
+
+    if options.manifest:
+        if options.fromfile or options.tofile:
+            error('--manifest takes no fromfile or tofile')
+
+    elif options.fromfile is None or options.tofile is None:
+        error('fromfile and tofile are required')
+
+    if options.bytes and (output_format(options) in 'nm' or options.mmap):
+        error('--bytes supports only -c and -u output')
+
+    out = sys.stdout
+
+    if options.bytes:
+        sys.stdout.flush()
+        out = sys.stdout.buffer
+
+    if options.manifest or os.path.isdir(options.fromfile) and os.path.isdir(options.tofile):
+        if output_format(options) in 'nm':
+            error('directory and manifest diffs support only -c and -u output')
+
+        if options.manifest:
+            try:
+                pairs = read_manifest(options.manifest)
+            except ValueError as e:
+                error(str(e))
+
+        else:
+            pairs = directory_pairs(options.fromfile, options.tofile)
+
+        for text in batch_diff(pairs, options):
+            out.write(text)
+
+    else:
+        fromfile, tofile = options.fromfile, options.tofile
+
+        if os.path.isdir(fromfile):
+            fromfile = os.path.join(fromfile, os.path.basename(tofile))
+
+        elif os.path.isdir(tofile):
+            tofile = os.path.join(tofile, os.path.basename(fromfile))
+
+        out.writelines(diff_files(fromfile, tofile, options))
+
+    if options.cache_stats and options.cache:
+        print('cache: %(hits)d hits, %(misses)d misses, %(evictions)d evictions, '
+              '%(entries)d entries, %(bytes)d of %(max_bytes)d bytes' % open_cache(options).stats(),
+              file=sys.stderr)
+
+#
+# --serve SOCKET keeps one process with everything imported listening on a Unix socket; --connect SOCKET, given as the first arguments, sends
+# the rest of the command line and the working directory to it instead of diffing in the calling process. The server forks a child per
+# request, which runs main() with stdout and stderr sent back as frames: one channel byte (1 stdout, 2 stderr, 0 exit status) and a four byte
+# big-endian length, then the data.
+#
+
+class _Channel(io.RawIOBase):
+    """Binary file sending every write as a frame on one channel."""
+
+    def __init__(self, conn, channel):
+        self.conn = conn
+        self.channel = channel
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.conn.sendall(bytes([self.channel]) + len(data).to_bytes(4, 'big') + bytes(data))
+        return len(data)
+
+def _serve_request(conn):
+    import signal, traceback
+
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    chunks = []
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    cwd, *args = [os.fsdecode(arg) for arg in b''.join(chunks).split(b'\0')]
+
+    encoding = sys.stdout.encoding
+    sys.stdout = io.TextIOWrapper(io.BufferedWriter(_Channel(conn, 1), 65536), encoding)
+    sys.stderr = io.TextIOWrapper(_Channel(conn, 2), encoding, write_through=True)
+    status = 0
+    try:
+        os.chdir(cwd)
+        main(args, served=True)
+    except SystemExit as e:
+        if isinstance(e.code, int):
+            status = e.code
+        elif e.code is not None:
+            print(e.code, file=sys.stderr)
+            status = 1
+    except BaseException:
+        traceback.print_exc()
+        status = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    _Channel(conn, 0).write(str(status).encode())
+
+def serve(path):
+    """Serve --connect requests on the Unix socket path until killed."""
+    import signal, socket, stat
+    import array, datetime, locale, mmap, types
+    import Python_Difflib_Pattern_Matching_Html_Diff
+    import Python_Difflib_Pattern_Matching_Opcode_Cache
+    import Python_Filecmp_Tiered_Compare
+    import concurrent.futures.process
+
+    build_parser()
+    try:
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+    except FileNotFoundError:
+        pass
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(path)
+        server.listen(128)
+        while True:
+            conn, _ = server.accept()
+            if os.fork() == 0:
+                server.close()
+                try:
+                    _serve_request(conn)
+                finally:
+                    os._exit(0)
+            conn.close()
+
+def connect(path, args):
+    """Run the command line args in the --serve process listening on path
+    and copy its output; return its exit status."""
+    import _socket        # socket.py would cost more to import than the diff
 
-    sys.stdout.writelines(diff)
+    s = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+    try:
+        try:
+            s.connect(path)
+        except OSError as e:
+            print('%s: %s' % (path, e.strerror), file=sys.stderr)
+            return 2
+        s.sendall(b'\0'.join(os.fsencode(arg) for arg in [os.getcwd()] + args))
+        s.shutdown(_socket.SHUT_WR)
+        outputs = {1: sys.stdout.buffer, 2: sys.stderr.buffer}
+        data = b''
+        while True:
+            chunk = s.recv(65536)
+            if not chunk:
+                print('%s: connection closed' % path, file=sys.stderr)
+                return 1
+            data += chunk
+            while len(data) >= 5:
+                end = 5 + int.from_bytes(data[1:5], 'big')
+                if len(data) < end:
+                    break
+                channel, payload, data = data[0], data[5:end], data[end:]
+                if channel == 0:
+                    return int(payload)
+                outputs[channel].write(payload)
+                if channel == 2:
+                    sys.stdout.flush()
+                    sys.stderr.flush()
+    finally:
+        s.close()
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,118 @@
+# Python Difflib Pattern Matching
+# difflib - Helpers for computing deltas
+# This module provides classes and functions for comparing sequences.
+#
+
+#
+# Startup cost of Python_Difflib_Pattern_Matching_CL_Interface.py.
+#
+
+#
+# A diff run from a git hook compares two small files, so nearly all of its time goes to starting the interpreter and importing modules. This
+# script measures both:
+#
+# * import_times() runs the CLI under "python -X importtime" and adds up, per top-level module, the cumulative import times it reports
+#   (in milliseconds).
+# * startup_times() times whole runs of the CLI on a small pair of files: run as a script, run with "python -m" (which loads the CLI from
+#   cached bytecode instead of compiling it), through --connect to a --serve process, and "python -c pass" for the interpreter alone.
+#
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CLI = os.path.join(HERE, 'Python_Difflib_Pattern_Matching_CL_Interface.py')
+MODULE = [sys.executable, '-m', 'Python_Difflib_Pattern_Matching_CL_Interface']
+
+def import_times(args):
+    """Return a Counter of cumulative import milliseconds per top-level
+    module for one CLI run with args."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', CLI] + args,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    times = Counter()
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or line.endswith('imported package'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not name.startswith('  '):          # nested imports are indented by two spaces per level
+            times[name.strip()] += int(cumulative) / 1000
+    return times
+
+def wall_time(command, runs=20):
+    """Return the median wall time of command in milliseconds."""
+    elapsed = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, check=True, cwd=HERE)
+        elapsed.append((time.perf_counter() - start) * 1000)
+    return sorted(elapsed)[runs // 2]
+
+def startup_times(fromfile, tofile, runs=20):
+    top = tempfile.mkdtemp()
+    socket_path = os.path.join(top, 'diff.sock')
+    server = subprocess.Popen([sys.executable, CLI, '--serve', socket_path])
+    try:
+        while not os.path.exists(socket_path):
+            time.sleep(0.01)
+        return {
+            'python -c pass': wall_time([sys.executable, '-c', 'pass'], runs),
+            'script -u': wall_time([sys.executable, CLI, '-u', fromfile, tofile], runs),
+            '-m -u': wall_time(MODULE + ['-u', fromfile, tofile], runs),
+            '-m --connect -u': wall_time(MODULE + ['--connect', socket_path, '-u', fromfile,
+                                                   tofile], runs),
+        }
+    finally:
+        server.terminate()
+        server.wait()
+        os.unlink(socket_path)
+        os.rmdir(top)
+
+#
+# Example:
+#
+
+if __name__ == '__main__':
+    top = tempfile.mkdtemp()
+    fromfile, tofile = os.path.join(top, 'a'), os.path.join(top, 'b')
+    with open(fromfile, 'w') as f:
+        f.write('one\ntwo\nthree\nfour\n')
+    with open(tofile, 'w') as f:
+        f.write('one\ntree\nthree\nfive\n')
+
+    for args in (['-u', fromfile, tofile], ['-m', fromfile, tofile]):
+        times = import_times(args)
+        print('cli', args[0], '%.1f ms in imports' % sum(times.values()))
+        for name, ms in times.most_common(5):
+            print('    %-50s %5.1f ms' % (name, ms))
+
+    for name, ms in startup_times(fromfile, tofile).items():
+        print('%-18s %5.1f ms' % (name, ms))
+
+    os.unlink(fromfile)
+    os.unlink(tofile)
+    os.rmdir(top)
+
+    # OUTPUT:
+    #
+    # cli -u 25.8 ms in imports
+    #     Python_Difflib_Pattern_Matching_Diff_Algorithms     11.6 ms
+    #     site                                                 5.7 ms
+    #     datetime                                             2.8 ms
+    #     encodings                                            2.1 ms
+    #     _frozen_importlib_external                           1.4 ms
+    # cli -m 28.3 ms in imports
+    #     Python_Difflib_Pattern_Matching_Diff_Algorithms     10.2 ms
+    #     site                                                 3.9 ms
+    #     shutil                                               2.7 ms
+    #     argparse                                             2.7 ms
+    #     datetime                                             2.3 ms
+    # python -c pass      17.4 ms
+    # script -u           48.1 ms
+    # -m -u               40.8 ms
+    # -m --connect -u     33.8 ms
+    #
@@ -0,0 +1,191 @@
+# Python Difflib Pattern Matching
+# difflib - Helpers for computing deltas
+# This module provides classes and functions for comparing sequences.
+# It can be used for example, for comparing files, and can produce difference information in various formats, including HTML and context and unified diffs.
+#
+
+#
+# difflib.get_close_matches(word, possibilities, n=3, cutoff=0.6):
+# Return a list of the best "good enough" matches. word is a sequence for which close matches are desired (typically a string), and possibilities is a list
+# of sequences against which to match word (typically a list of strings).
+#
+# get_close_matches() builds a SequenceMatcher for every possibility on every call, so a query costs time linear in the size of the vocabulary.
+#
+
+#
+# An indexed get_close_matches().
+#
+
+#
+# CloseMatchIndex is built once from the possibilities and answers get_close_matches() queries without building a SequenceMatcher for each of them:
+#
+# * Length filter: real_quick_ratio() only depends on the two lengths, so whole length buckets are skipped when their bound is below the cutoff.
+# * Count filter: quick_ratio() counts the elements the two sequences have in common (as multisets). The index maps each (length, element,
+#   occurrence number) triple to the possibilities containing it, so counting how often each possibility shows up in the posting lists of the word's
+#   elements gives its quick_ratio() without looking at it. A bucket is skipped outright when none of the rarest len(word) - t + 1 posting lists
+#   is populated, t being the number of common elements the cutoff requires.
+# * Only the survivors go through real_quick_ratio(), quick_ratio() and ratio() exactly as in get_close_matches(), and only the posting lists
+#   of the word's own elements are ever read.
+#
+# The filters are built on single elements (1-grams) because longer n-grams give no exact bound on the Ratcliff-Obershelp score: 'ab' and 'ba' share
+# no bigram but have a ratio of 0.5. Results are therefore identical to get_close_matches(word, possibilities, n, cutoff), including the order of ties.
+#
+# A query still counts the posting lists of all of the word's elements in every length bucket in range, and a single element is shared by a large
+# part of a bucket, so its cost stays linear in the size of the vocabulary: the index is a constant factor faster than the scan (the counting runs
+# in C over integer arrays instead of a SequenceMatcher per possibility), not sublinear. Reading only the rarest posting lists and verifying their
+# entries directly does not help: on the benchmark below their union alone still holds about a third of the buckets in range.
+#
+
+from array import array
+from collections import Counter
+from itertools import chain
+from difflib import SequenceMatcher
+from heapq import nlargest as _nlargest
+
+def _ratio(matches, length):
+    if length:
+        return 2.0 * matches / length
+    return 1.0
+
+def _needed_matches(length, cutoff):
+    """Return the fewest matches that give a ratio of at least cutoff."""
+    matches = int(cutoff * length / 2.0)
+    while matches > 0 and _ratio(matches - 1, length) >= cutoff:
+        matches -= 1
+    while _ratio(matches, length) < cutoff:
+        matches += 1
+    return matches
+
+def _elements(seq):
+    """Yield (element, occurrence number) pairs, e.g. 'aba' gives
+    ('a', 1), ('b', 1), ('a', 2)."""
+    seen = {}
+    for elt in seq:
+        k = seen[elt] = seen.get(elt, 0) + 1
+        yield elt, k
+
+class CloseMatchIndex:
+    """Reusable index over a list of possibilities for get_close_matches().
+
+    >>> index = CloseMatchIndex(['ape', 'apple', 'peach', 'puppy'])
+    >>> index.get_close_matches('appel')
+    ['apple', 'ape']
+    """
+
+    def __init__(self, possibilities):
+        self.possibilities = list(possibilities)
+        self._by_length = {}
+        self._postings = {}
+        for i, x in enumerate(self.possibilities):
+            length = len(x)
+            self._by_length.setdefault(length, array('l')).append(i)
+            for elt, k in _elements(x):
+                key = length, elt, k
+                postings = self._postings.get(key)
+                if postings is None:
+                    postings = self._postings[key] = array('l')
+                postings.append(i)
+
+    def __len__(self):
+        return len(self.possibilities)
+
+    def candidates(self, word, cutoff=0.6):
+        """Return the indices of the possibilities whose real_quick_ratio()
+        and quick_ratio() against word are at least cutoff."""
+        lw = len(word)
+        keys = list(_elements(word))
+        found = []
+        for length in self._by_length:
+            if _ratio(min(length, lw), length + lw) < cutoff:
+                continue
+            needed = _needed_matches(length + lw, cutoff)
+            if needed <= 0:
+                found.extend(self._by_length[length])
+                continue
+
+            postings = [self._postings.get((length, elt, k), ())
+                        for elt, k in keys]
+            postings.sort(key=len)
+            # Prefix filter: an entry sharing `needed` elements with word
+            # appears in at least one of the shortest lw - needed + 1 lists.
+            if not any(postings[:lw - needed + 1]):
+                continue
+            hits = Counter(chain.from_iterable(postings))
+            found.extend(i for i, count in hits.items() if count >= needed)
+        return found
+
+    def get_close_matches(self, word, n=3, cutoff=0.6):
+        """Same result as difflib.get_close_matches(word, possibilities, n,
+        cutoff) for the possibilities the index was built from."""
+        if not n >  0:
+            raise ValueError("n must be > 0: %r" % (n,))
+        if not 0.0 <= cutoff <= 1.0:
+            raise ValueError("cutoff must be in [0.0, 1.0]: %r" % (cutoff,))
+        result = []
+        s = SequenceMatcher()
+        s.set_seq2(word)
+        for i in self.candidates(word, cutoff):
+            x = self.possibilities[i]
+            s.set_seq1(x)
+            if s.real_quick_ratio() >= cutoff and \
+               s.quick_ratio() >= cutoff and \
+               s.ratio() >= cutoff:
+                result.append((s.ratio(), x))
+
+        result = _nlargest(n, result)
+        return [x for score, x in result]
+
+#
+# Benchmark against the linear scan on a synthetic vocabulary of identifiers.
+#
+
+def benchmark(size=200000, queries=200, seed=0):
+    import difflib, random, string, time
+
+    rng = random.Random(seed)
+    letters = string.ascii_lowercase + '_'
+    vocabulary = [''.join(rng.choice(letters) for _ in range(rng.randrange(4, 16)))
+                  for _ in range(size)]
+
+    start = time.perf_counter()
+    index = CloseMatchIndex(vocabulary)
+    built = time.perf_counter() - start
+
+    words = []
+    for _ in range(queries):
+        word = list(rng.choice(vocabulary))
+        word[rng.randrange(len(word))] = rng.choice(letters)
+        words.append(''.join(word))
+
+    start = time.perf_counter()
+    indexed = [index.get_close_matches(word, 3, 0.8) for word in words]
+    fast = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scanned = [difflib.get_close_matches(word, vocabulary, 3, 0.8) for word in words[:20]]
+    slow = (time.perf_counter() - start) * queries / 20
+
+    assert indexed[:20] == scanned
+    print('%d entries: index built in %.2fs, %.2f ms/query indexed, %.2f ms/query scanned'
+          % (size, built, 1000 * fast / queries, 1000 * slow / queries))
+
+if __name__ == '__main__':
+    import keyword
+
+    index = CloseMatchIndex(keyword.kwlist)
+
+    print(index.get_close_matches('wheel'))
+
+    # OUTPUT: '['while']'
+
+    print(index.get_close_matches('pineapple'))
+
+    # OUTPUT: '[]'
+
+    print(index.get_close_matches('accept'))
+
+    # OUTPUT: '['except']'
+
+    benchmark()
+
+    # OUTPUT: '200000 entries: index built in 1.26s, 40.36 ms/query indexed, 471.97 ms/query scanned'
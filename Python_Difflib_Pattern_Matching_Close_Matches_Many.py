@@ -0,0 +1,144 @@
+# Python Difflib Pattern Matching
+# difflib - Helpers for computing deltas
+# This module provides classes and functions for comparing sequences.
+# It can be used for example, for comparing files, and can produce difference information in various formats, including HTML and context and unified diffs.
+#
+
+#
+# difflib.get_close_matches(word, possibilities, n=3, cutoff=0.6):
+# Return a list of the best "good enough" matches. word is a sequence for which close matches are desired (typically a string), and possibilities is a list
+# of sequences against which to match word (typically a list of strings).
+#
+
+#
+# Bulk get_close_matches() on a process pool.
+#
+
+#
+# get_close_matches_many() answers get_close_matches(word, possibilities, n, cutoff) for every word of a (possibly very long) iterable of words:
+#
+# * The possibilities are pickled once into a multiprocessing.shared_memory block; every worker loads them from there when it starts, instead of
+#   receiving a copy with every task.
+# * Words are read lazily and sent to the workers in batches, with only a bounded number of batches in flight at a time.
+# * Results come back as one list per word, in the order of the words.
+#
+# With indexed=True each worker builds a CloseMatchIndex (see Python_Difflib_Pattern_Matching_Close_Match_Index.py) over the possibilities first,
+# which costs memory per worker but makes every query much cheaper. The results are the same either way.
+#
+
+import os
+import pickle
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from difflib import get_close_matches
+from itertools import islice
+from multiprocessing import shared_memory
+
+_possibilities = None
+_index = None
+
+def _init_worker(name, size, indexed):
+    global _possibilities, _index
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        _possibilities = pickle.loads(shm.buf[:size])
+    finally:
+        shm.close()
+    if indexed:
+        from Python_Difflib_Pattern_Matching_Close_Match_Index import CloseMatchIndex
+        _index = CloseMatchIndex(_possibilities)
+
+def _match_batch(words, n, cutoff):
+    if _index is not None:
+        return [_index.get_close_matches(word, n, cutoff) for word in words]
+    return [get_close_matches(word, _possibilities, n, cutoff) for word in words]
+
+def get_close_matches_many(words, possibilities, n=3, cutoff=0.6, workers=None,
+                           batch_size=256, indexed=False):
+    """Yield get_close_matches(word, possibilities, n, cutoff) for each word.
+
+    words may be any iterable and is consumed lazily; results are yielded in
+    the same order. workers defaults to os.cpu_count().
+    """
+    if not n >  0:
+        raise ValueError("n must be > 0: %r" % (n,))
+    if not 0.0 <= cutoff <= 1.0:
+        raise ValueError("cutoff must be in [0.0, 1.0]: %r" % (cutoff,))
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    words = iter(words)
+    if workers <= 1:
+        if indexed:
+            from Python_Difflib_Pattern_Matching_Close_Match_Index import CloseMatchIndex
+            index = CloseMatchIndex(possibilities)
+            for word in words:
+                yield index.get_close_matches(word, n, cutoff)
+        else:
+            possibilities = list(possibilities)
+            for word in words:
+                yield get_close_matches(word, possibilities, n, cutoff)
+        return
+
+    data = pickle.dumps(list(possibilities), pickle.HIGHEST_PROTOCOL)
+    shm = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+    try:
+        shm.buf[:len(data)] = data
+        del data
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(shm.name, shm.size, indexed)) as pool:
+            pending = deque()
+            while True:
+                while len(pending) < 2 * workers:
+                    batch = list(islice(words, batch_size))
+                    if not batch:
+                        break
+                    pending.append(pool.submit(_match_batch, batch, n, cutoff))
+                if not pending:
+                    break
+                yield from pending.popleft().result()
+    finally:
+        shm.close()
+        shm.unlink()
+
+#
+# Benchmark: throughput for 1, 2, 4, ... workers.
+#
+
+def benchmark(size=20000, queries=400, seed=0):
+    import random, string, time
+
+    rng = random.Random(seed)
+    letters = string.ascii_lowercase
+    vocabulary = [''.join(rng.choice(letters) for _ in range(rng.randrange(4, 12)))
+                  for _ in range(size)]
+    words = [''.join(rng.sample(word, len(word))) for word in rng.sample(vocabulary, queries)]
+
+    expected = None
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        start = time.perf_counter()
+        result = list(get_close_matches_many(words, vocabulary, workers=workers))
+        elapsed = time.perf_counter() - start
+        if expected is None:
+            expected = result
+        assert result == expected
+        print('%2d workers: %7.0f words/s' % (workers, queries / elapsed))
+        workers *= 2
+
+if __name__ == '__main__':
+    import keyword
+
+    words = ['wheel', 'pineapple', 'accept']
+
+    for word, matches in zip(words, get_close_matches_many(words, keyword.kwlist, workers=2)):
+        print(word, matches)
+
+    # OUTPUT:
+    #
+    # wheel ['while']
+    # pineapple []
+    # accept ['except']
+    #
+
+    benchmark()
@@ -0,0 +1,595 @@
+# Python Difflib Pattern Matching
+# difflib - Helpers for computing deltas
+# This module provides classes and functions for comparing sequences.
+# It can be used for example, for comparing files, and can produce difference information in various formats, including HTML and context and unified diffs.
+#
+# Timing: The basic Ratcliff-Obershelp algorithm is cubic time in the worst case and quadratic time in the expected case.
+# SequenceMatcher is quadratic time for the worst case and has expected-case behavior dependent in a complicated way on how many elements the sequences have
+# in common; best case time is linear.
+#
+
+#
+# Alternative diff engines.
+#
+
+#
+# This example implements three other well known line diff algorithms next to SequenceMatcher's Ratcliff-Obershelp matcher:
+#
+# * myers:      Myers' O((N+M)D) shortest edit script, using the linear space "middle snake" refinement.
+# * patience:   anchors on lines that occur exactly once in both sequences, then diffs the gaps.
+# * histogram:  anchors on the least frequent common lines (as in git), then diffs the gaps.
+#
+# Every engine produces the same matching blocks and opcode tuples as SequenceMatcher.get_matching_blocks() and get_opcodes(), so the unified, context,
+# ndiff and HTML writers can consume them unchanged.
+#
+
+import bisect
+import difflib
+import time
+from collections import Counter
+
+ALGORITHMS = ('ratcliff', 'myers', 'patience', 'histogram')
+
+# The histogram engine ignores lines that occur more often than this in the
+# region being split, like git's MAX_CHAIN_LENGTH.
+HISTOGRAM_MAX_CHAIN = 64
+
+def _trim(a, alo, ahi, b, blo, bhi, blocks):
+    """Record the common head and tail of a region and return what is left."""
+    start = alo
+    while alo < ahi and blo < bhi and a[alo] == b[blo]:
+        alo += 1
+        blo += 1
+    if alo > start:
+        blocks.append((start, blo - (alo - start), alo - start))
+
+    end = ahi
+    while ahi > alo and bhi > blo and a[ahi - 1] == b[bhi - 1]:
+        ahi -= 1
+        bhi -= 1
+    if end > ahi:
+        blocks.append((ahi, bhi, end - ahi))
+
+    return alo, ahi, blo, bhi
+
+def _middle_snake(a, alo, ahi, b, blo, bhi):
+    """Return the middle snake (x, y, u, v) of an optimal edit path.
+
+    The region must not be empty on either side and must not start or end
+    with a common element, so the split is always strictly inside it.
+    """
+    n = ahi - alo
+    m = bhi - blo
+    delta = n - m
+    odd = delta & 1
+    size = n + m + 2
+    # vf[k] is the furthest x reached on diagonal k walking forward from
+    # (alo, blo), vb[k] the furthest distance walked back from (ahi, bhi).
+    vf = [0] * (2 * size + 1)
+    vb = [0] * (2 * size + 1)
+
+    for d in range((n + m + 1) // 2 + 1):
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and vf[k - 1] < vf[k + 1]):
+                x = vf[k + 1]
+            else:
+                x = vf[k - 1] + 1
+            y = x - k
+            x0, y0 = x, y
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            vf[k] = x
+            if odd and delta - (d - 1) <= k <= delta + (d - 1):
+                if x + vb[delta - k] >= n:
+                    return alo + x0, blo + y0, alo + x, blo + y
+
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and vb[k - 1] < vb[k + 1]):
+                x = vb[k + 1]
+            else:
+                x = vb[k - 1] + 1
+            y = x - k
+            x0, y0 = x, y
+            while x < n and y < m and a[ahi - 1 - x] == b[bhi - 1 - y]:
+                x += 1
+                y += 1
+            vb[k] = x
+            if not odd and -d <= delta - k <= d:
+                if x + vf[delta - k] >= n:
+                    return ahi - x, bhi - y, ahi - x0, bhi - y0
+
+    raise AssertionError('no middle snake found')
+
+def _myers(a, alo, ahi, b, blo, bhi, blocks):
+    """Append the matches of a shortest edit script for a region to blocks."""
+    stack = [(alo, ahi, blo, bhi)]
+    while stack:
+        alo, ahi, blo, bhi = stack.pop()
+        alo, ahi, blo, bhi = _trim(a, alo, ahi, b, blo, bhi, blocks)
+        if alo == ahi or blo == bhi:
+            continue
+        x, y, u, v = _middle_snake(a, alo, ahi, b, blo, bhi)
+        if u > x:
+            blocks.append((x, y, u - x))
+        stack.append((alo, x, blo, y))
+        stack.append((u, ahi, v, bhi))
+
+def _unique_anchors(a, alo, ahi, b, blo, bhi):
+    """Return the longest increasing run of lines unique to both regions."""
+    seen = {}
+    for i in range(alo, ahi):
+        line = a[i]
+        seen[line] = -1 if line in seen else i
+    inb = {}
+    for j in range(blo, bhi):
+        line = b[j]
+        if seen.get(line, -1) >= 0:
+            inb[line] = -1 if line in inb else j
+    pairs = [(seen[line], j) for line, j in inb.items() if j >= 0]
+    pairs.sort()
+
+    # Patience sorting: piles hold the smallest b index ending an increasing
+    # run of each length, backlinks rebuild the longest run.
+    tops = []
+    links = []
+    for i, j in pairs:
+        lo, hi = 0, len(tops)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if pairs[tops[mid]][1] < j:
+                lo = mid + 1
+            else:
+                hi = mid
+        links.append(tops[lo - 1] if lo else -1)
+        if lo == len(tops):
+            tops.append(len(links) - 1)
+        else:
+            tops[lo] = len(links) - 1
+
+    anchors = []
+    k = tops[-1] if tops else -1
+    while k >= 0:
+        anchors.append(pairs[k])
+        k = links[k]
+    anchors.reverse()
+    return anchors
+
+def _patience(a, alo, ahi, b, blo, bhi, blocks):
+    """Append the matches of a patience diff for a region to blocks."""
+    stack = [(alo, ahi, blo, bhi)]
+    while stack:
+        alo, ahi, blo, bhi = stack.pop()
+        alo, ahi, blo, bhi = _trim(a, alo, ahi, b, blo, bhi, blocks)
+        if alo == ahi or blo == bhi:
+            continue
+        anchors = _unique_anchors(a, alo, ahi, b, blo, bhi)
+        if not anchors:
+            _myers(a, alo, ahi, b, blo, bhi, blocks)
+            continue
+        i0, j0 = alo, blo
+        for i, j in anchors:
+            stack.append((i0, i, j0, j))
+            blocks.append((i, j, 1))
+            i0, j0 = i + 1, j + 1
+        stack.append((i0, ahi, j0, bhi))
+
+def _histogram_split(a, alo, ahi, b, blo, bhi):
+    """Return the longest common run around the rarest common line, or None."""
+    occurrences = {}
+    for i in range(alo, ahi):
+        occurrences.setdefault(a[i], []).append(i)
+
+    best = None
+    best_count = HISTOGRAM_MAX_CHAIN + 1
+    j = blo
+    while j < bhi:
+        positions = occurrences.get(b[j])
+        if positions is None or len(positions) > best_count:
+            j += 1
+            continue
+        count = len(positions)
+        next_j = j + 1
+        for i in positions:
+            s, t = i, j
+            while s > alo and t > blo and a[s - 1] == b[t - 1]:
+                s -= 1
+                t -= 1
+            e, f = i + 1, j + 1
+            while e < ahi and f < bhi and a[e] == b[f]:
+                e += 1
+                f += 1
+            if (best is None or count < best_count
+                    or (count == best_count and e - s > best[2])):
+                best = (s, t, e - s)
+                best_count = count
+            next_j = max(next_j, f)
+        j = next_j
+    return best
+
+def _histogram(a, alo, ahi, b, blo, bhi, blocks):
+    """Append the matches of a histogram diff for a region to blocks."""
+    stack = [(alo, ahi, blo, bhi)]
+    while stack:
+        alo, ahi, blo, bhi = stack.pop()
+        alo, ahi, blo, bhi = _trim(a, alo, ahi, b, blo, bhi, blocks)
+        if alo == ahi or blo == bhi:
+            continue
+        split = _histogram_split(a, alo, ahi, b, blo, bhi)
+        if split is None:
+            _myers(a, alo, ahi, b, blo, bhi, blocks)
+            continue
+        i, j, size = split
+        blocks.append(split)
+        stack.append((alo, i, blo, j))
+        stack.append((i + size, ahi, j + size, bhi))
+
+_ENGINES = {
+    'myers': _myers,
+    'patience': _patience,
+    'histogram': _histogram,
+}
+
+def get_matching_blocks(a, b, algorithm='ratcliff'):
+    """Return SequenceMatcher(None, a, b).get_matching_blocks() computed by
+    the given algorithm.
+
+    Adjacent blocks are merged and the list ends with the (len(a), len(b), 0)
+    sentinel, exactly like SequenceMatcher's.
+    """
+    if algorithm == 'ratcliff':
+        return difflib.SequenceMatcher(None, a, b).get_matching_blocks()
+    try:
+        engine = _ENGINES[algorithm]
+    except KeyError:
+        raise ValueError('unknown diff algorithm %r' % (algorithm,)) from None
+
+    blocks = []
+    engine(a, 0, len(a), b, 0, len(b), blocks)
+    blocks.sort()
+
+    i1 = j1 = k1 = 0
+    non_adjacent = []
+    for i2, j2, k2 in blocks:
+        if i1 + k1 == i2 and j1 + k1 == j2:
+            k1 += k2
+        else:
+            if k1:
+                non_adjacent.append((i1, j1, k1))
+            i1, j1, k1 = i2, j2, k2
+    if k1:
+        non_adjacent.append((i1, j1, k1))
+
+    non_adjacent.append((len(a), len(b), 0))
+    return list(map(difflib.Match._make, non_adjacent))
+
+def get_opcodes(a, b, algorithm='ratcliff'):
+    """Return SequenceMatcher(None, a, b).get_opcodes() computed by the given
+    algorithm."""
+    i = j = 0
+    answer = []
+    for ai, bj, size in get_matching_blocks(a, b, algorithm):
+        tag = ''
+        if i < ai and j < bj:
+            tag = 'replace'
+        elif i < ai:
+            tag = 'delete'
+        elif j < bj:
+            tag = 'insert'
+        if tag:
+            answer.append((tag, i, ai, j, bj))
+        i, j = ai + size, bj + size
+        if size:
+            answer.append(('equal', ai, i, bj, j))
+    return answer
+
+#
+# Intraline cost controls.
+#
+# Inside every replace block, Differ looks for the most similar pair of lines by comparing all pairs, then recurses on both sides of that pair,
+# which is quadratic (or worse) in the size of the block. Differ below can bound that work:
+#
+# * max_block:    replace blocks with more lines than this on either side are written as plain '-' and '+' lines.
+# * pairing:      'all' searches all pairs, like difflib. 'ngram' only compares each line with the candidates sharing the most character n-grams
+#                 with it, then syncs on the longest in-order run of similar pairs, so a block costs a bounded number of comparisons per line.
+# * time_budget:  seconds per compare() call; once used up, the remaining replace blocks are written as plain '-' and '+' lines.
+#
+# stats counts the replace blocks handled each way ('fancy', 'ngram', 'max_block', 'time_budget'), and events lists every fallback as
+# (reason, alo, ahi, blo, bhi).
+#
+
+class Differ(difflib.Differ):
+    """difflib.Differ whose line level matching uses a selectable algorithm
+    and whose intraline marking can be bounded (see above)."""
+
+    def __init__(self, algorithm='ratcliff', linejunk=None, charjunk=None, max_block=None,
+                 pairing='all', time_budget=None, ngram=3, candidates=8):
+        super().__init__(linejunk, charjunk)
+        if pairing not in ('all', 'ngram'):
+            raise ValueError('unknown pairing %r' % (pairing,))
+        self.algorithm = algorithm
+        self.max_block = max_block
+        self.pairing = pairing
+        self.time_budget = time_budget
+        self.ngram = ngram
+        self.candidates = candidates
+        self.stats = Counter()
+        self.events = []
+        self._deadline = None
+
+    def compare(self, a, b):
+        if self.time_budget is not None:
+            self._deadline = time.perf_counter() + self.time_budget
+
+        if self.algorithm == 'ratcliff':
+            yield from super().compare(a, b)
+            return
+
+        for tag, alo, ahi, blo, bhi in get_opcodes(a, b, self.algorithm):
+            if tag == 'replace':
+                g = self._fancy_replace(a, alo, ahi, b, blo, bhi)
+            elif tag == 'delete':
+                g = self._dump('-', a, alo, ahi)
+            elif tag == 'insert':
+                g = self._dump('+', b, blo, bhi)
+            else:
+                g = self._dump(' ', a, alo, ahi)
+            yield from g
+
+    def _expired(self):
+        return self._deadline is not None and time.perf_counter() > self._deadline
+
+    def _fallback(self, reason, a, alo, ahi, b, blo, bhi):
+        self.stats[reason] += 1
+        self.events.append((reason, alo, ahi, blo, bhi))
+        return self._plain_replace(a, alo, ahi, b, blo, bhi)
+
+    def _fancy_replace(self, a, alo, ahi, b, blo, bhi):
+        if self.max_block is not None and max(ahi - alo, bhi - blo) > self.max_block:
+            yield from self._fallback('max_block', a, alo, ahi, b, blo, bhi)
+            return
+        if self._expired():
+            yield from self._fallback('time_budget', a, alo, ahi, b, blo, bhi)
+            return
+        if self.pairing == 'ngram':
+            yield from self._ngram_replace(a, alo, ahi, b, blo, bhi)
+            return
+
+        # difflib.Differ._fancy_replace(), checking the deadline as it goes.
+        best_ratio, cutoff = 0.74, 0.75
+        cruncher = difflib.SequenceMatcher(self.charjunk)
+        eqi, eqj = None, None
+        checks = 0
+        for j in range(blo, bhi):
+            bj = b[j]
+            cruncher.set_seq2(bj)
+            for i in range(alo, ahi):
+                ai = a[i]
+                if ai == bj:
+                    if eqi is None:
+                        eqi, eqj = i, j
+                    continue
+                cruncher.set_seq1(ai)
+                if cruncher.real_quick_ratio() > best_ratio and \
+                      cruncher.quick_ratio() > best_ratio and \
+                      cruncher.ratio() > best_ratio:
+                    best_ratio, best_i, best_j = cruncher.ratio(), i, j
+            checks += ahi - alo
+            if checks >= 256:
+                checks = 0
+                if self._expired():
+                    yield from self._fallback('time_budget', a, alo, ahi, b, blo, bhi)
+                    return
+        if best_ratio < cutoff:
+            if eqi is None:
+                yield from self._plain_replace(a, alo, ahi, b, blo, bhi)
+                return
+            best_i, best_j = eqi, eqj
+        else:
+            eqi = None
+        self.stats['fancy'] += 1
+
+        yield from self._fancy_helper(a, alo, best_i, b, blo, best_j)
+        if eqi is None:
+            yield from self._intraline(a[best_i], b[best_j])
+        else:
+            yield '  ' + a[best_i]
+        yield from self._fancy_helper(a, best_i+1, ahi, b, best_j+1, bhi)
+
+    def _intraline(self, aelt, belt):
+        """Yield the '-', '?', '+', '?' lines of a similar pair."""
+        atags = btags = ""
+        cruncher = difflib.SequenceMatcher(self.charjunk, aelt, belt)
+        for tag, ai1, ai2, bj1, bj2 in cruncher.get_opcodes():
+            la, lb = ai2 - ai1, bj2 - bj1
+            if tag == 'replace':
+                atags += '^' * la
+                btags += '^' * lb
+            elif tag == 'delete':
+                atags += '-' * la
+            elif tag == 'insert':
+                btags += '+' * lb
+            else:
+                atags += ' ' * la
+                btags += ' ' * lb
+        yield from self._qformat(aelt, belt, atags, btags)
+
+    def _ngram_pairs(self, a, alo, ahi, b, blo, bhi):
+        """Return the best similar b line for each a line, as (i, j) pairs
+        with i and j increasing, or None if the time budget ran out."""
+        n = self.ngram
+        postings = {}
+        same = {}
+        for j in range(blo, bhi):
+            line = b[j]
+            same.setdefault(line, j)
+            for gram in {line[k:k+n] for k in range(len(line) - n + 1)}:
+                postings.setdefault(gram, []).append(j)
+        popular = max(16, (bhi - blo) // 4)
+        cruncher = difflib.SequenceMatcher(self.charjunk)
+        cutoff = 0.75
+
+        pairs = []
+        for i in range(alo, ahi):
+            if (i - alo) % 64 == 63 and self._expired():
+                return None
+            line = a[i]
+            best = same.get(line)
+            if best is None:
+                counts = Counter()
+                for gram in {line[k:k+n] for k in range(len(line) - n + 1)}:
+                    js = postings.get(gram)
+                    if js is not None and len(js) <= popular:
+                        counts.update(js)
+                best_ratio = cutoff
+                cruncher.set_seq1(line)
+                for j, shared in counts.most_common(self.candidates):
+                    cruncher.set_seq2(b[j])
+                    if cruncher.real_quick_ratio() > best_ratio and \
+                          cruncher.quick_ratio() > best_ratio and \
+                          cruncher.ratio() > best_ratio:
+                        best_ratio, best = cruncher.ratio(), j
+            if best is not None:
+                pairs.append((i, best))
+
+        # Longest run of pairs with increasing j (patience sorting).
+        tails = []
+        tail_js = []
+        links = []
+        for k, (i, j) in enumerate(pairs):
+            pos = bisect.bisect_left(tail_js, j)
+            links.append(tails[pos - 1] if pos else None)
+            if pos == len(tails):
+                tails.append(k)
+                tail_js.append(j)
+            else:
+                tails[pos] = k
+                tail_js[pos] = j
+        run = []
+        k = tails[-1] if tails else None
+        while k is not None:
+            run.append(pairs[k])
+            k = links[k]
+        run.reverse()
+        return run
+
+    def _ngram_replace(self, a, alo, ahi, b, blo, bhi):
+        run = self._ngram_pairs(a, alo, ahi, b, blo, bhi)
+        if run is None:
+            yield from self._fallback('time_budget', a, alo, ahi, b, blo, bhi)
+            return
+        self.stats['ngram'] += 1
+        i0, j0 = alo, blo
+        for i, j in run + [(ahi, bhi)]:
+            if i0 < i and j0 < j:
+                yield from self._plain_replace(a, i0, i, b, j0, j)
+            elif i0 < i:
+                yield from self._dump('-', a, i0, i)
+            elif j0 < j:
+                yield from self._dump('+', b, j0, j)
+            if i < ahi:
+                if a[i] == b[j]:
+                    yield '  ' + a[i]
+                else:
+                    yield from self._intraline(a[i], b[j])
+            i0, j0 = i + 1, j + 1
+
+def ndiff(a, b, algorithm='ratcliff', linejunk=None,
+          charjunk=difflib.IS_CHARACTER_JUNK, **limits):
+    """difflib.ndiff() with a selectable line matching algorithm; limits are
+    Differ's max_block, pairing and time_budget arguments."""
+    return Differ(algorithm, linejunk, charjunk, **limits).compare(a, b)
+
+#
+# Benchmark: inputs where Ratcliff-Obershelp becomes unusable.
+#
+# * near:    two long sequences over a three line alphabet that differ in ~2% of their elements. Every line occurs many times, so each
+#            find_longest_match() call walks long b2j chains, while Myers only pays for the few edits.
+# * shifted: two periodic sequences with different periods. The longest matches are short, the recursion makes many calls, and each call is
+#            quadratic, so SequenceMatcher's time grows roughly cubically.
+#
+# autojunk is turned off for SequenceMatcher, otherwise every line would simply be discarded as "popular" junk.
+#
+
+def _near(rng, size):
+    a = [rng.randrange(3) for _ in range(size)]
+    return a, [x if rng.random() > 0.02 else 3 for x in a]
+
+def _shifted(rng, size):
+    return [i // 2 % 50 for i in range(size)], [i // 3 % 50 for i in range(size)]
+
+def benchmark(sizes=(1000, 2000, 4000), seed=0):
+    import random, time
+
+    rng = random.Random(seed)
+    for name, make in (('near', _near), ('shifted', _shifted)):
+        for size in sizes:
+            a, b = make(rng, size)
+            timings = []
+            for algorithm in ALGORITHMS:
+                start = time.perf_counter()
+                if algorithm == 'ratcliff':
+                    difflib.SequenceMatcher(None, a, b, autojunk=False).get_opcodes()
+                else:
+                    get_opcodes(a, b, algorithm)
+                timings.append('%s %.3fs' % (algorithm, time.perf_counter() - start))
+            print('%-8s %5d: %s' % (name, size, ', '.join(timings)))
+
+#
+# Benchmark: one replace block of 600 rewritten lines (every line edited in a place or two, one in five replaced outright), written by ndiff()
+# with and without limits.
+#
+
+def benchmark_intraline(lines=600, seed=0):
+    import random
+
+    rng = random.Random(seed)
+    words = ['alpha', 'beta', 'gamma', 'delta', 'return', 'self', 'value', 'index', 'if', 'for']
+    def line():
+        return ' '.join(rng.choice(words) for _ in range(10)) + ' %d\n' % rng.randrange(10**6)
+    a = [line() for _ in range(lines)]
+    b = [line() if rng.random() < 0.2 else x.replace(' ', '_', 2) for x in a]
+
+    for label, limits in (('difflib', None),
+                          ('all', {}),
+                          ('ngram', {'pairing': 'ngram'}),
+                          ('max_block=500', {'max_block': 500}),
+                          ('time_budget=0.5', {'time_budget': 0.5})):
+        start = time.perf_counter()
+        if limits is None:
+            out = list(difflib.ndiff(a, b))
+            stats = {}
+        else:
+            differ = Differ(charjunk=difflib.IS_CHARACTER_JUNK, **limits)
+            out = list(differ.compare(a, b))
+            stats = dict(differ.stats)
+        print('%-16s %6.2fs %5d lines %s' % (label, time.perf_counter() - start, len(out), stats))
+
+if __name__ == '__main__':
+    a = 'one\ntwo\nthree\nfour\nfive\n'.splitlines(keepends=True)
+    b = 'zero\none\ntree\nfour\nfive\nsix\n'.splitlines(keepends=True)
+
+    for algorithm in ALGORITHMS:
+        print(algorithm, get_opcodes(a, b, algorithm))
+
+    print(''.join(ndiff(a, b, 'myers')), end="")
+
+    benchmark()
+    benchmark_intraline()
+
+#
+# OUTPUT:
+#
+# near      1000: ratcliff 0.107s, myers 0.001s, patience 0.001s, histogram 0.001s
+# near      2000: ratcliff 0.397s, myers 0.004s, patience 0.004s, histogram 0.007s
+# near      4000: ratcliff 2.263s, myers 0.014s, patience 0.014s, histogram 0.014s
+# shifted   1000: ratcliff 0.370s, myers 0.092s, patience 0.092s, histogram 0.010s
+# shifted   2000: ratcliff 2.274s, myers 0.281s, patience 0.242s, histogram 0.018s
+# shifted   4000: ratcliff 16.248s, myers 1.416s, patience 1.453s, histogram 1.455s
+#
+# difflib            8.08s  2160 lines {}
+# all                7.85s  2160 lines {'fancy': 480}
+# ngram              0.51s  2160 lines {'ngram': 1}
+# max_block=500      0.00s  1200 lines {'max_block': 1}
+# time_budget=0.5    0.50s  1200 lines {'time_budget': 1}
+#
@@ -0,0 +1,605 @@
+# Python Difflib Pattern Matching
+# difflib - Helpers for computing deltas
+# This module provides classes and functions for comparing sequences.
+# It can be used for example, for comparing files, and can produce difference information in various formats, including HTML and context and unified diffs.
+#
+
+#
+# An asyncio server for diff and fuzzy matching jobs.
+#
+
+#
+# SequenceMatcher.get_opcodes(), ndiff(), unified_diff() and get_close_matches() are CPU bound, so calling them from a coroutine stalls the whole
+# event loop. DiffServer runs them in worker processes behind a small HTTP/1.1 server on a Unix socket or a TCP port:
+#
+# * POST /get_opcodes, /ndiff, /unified_diff or /get_close_matches with a JSON object of arguments as the body (see JOBS below). The result
+#   is streamed back as NDJSON, one opcode, diff line or list of matches per line, followed by {"done": true, "count": N}. A job that fails
+#   after its first results ends with {"error": "..."} instead.
+# * ?time_budget=SECONDS bounds the whole request, from admission to the last line (default_budget if omitted, at most max_budget). A job still
+#   running at its deadline is stopped: 504 if nothing was sent yet, an error line otherwise.
+# * A worker that dies during a job is replaced, and its request ends the same way with 500 or an error line.
+# * A client that disconnects cancels its job.
+# * Backpressure: at most max_pending requests are admitted at a time, the rest get 503 with Retry-After; a worker's output is only read
+#   once the client has taken the previous part, so a slow reader pauses its worker instead of filling the server's memory.
+# * GET /stats returns the server's counters.
+#
+# The workers are plain child processes fed through pipes rather than a ProcessPoolExecutor: a pool task can neither stream partial results
+# nor be stopped once it runs, while a worker on a pipe sends its results in frames as it produces them and is simply killed (and replaced) when
+# its request times out or is cancelled. Each connection carries one request.
+#
+# load_test() replays a list of requests against a running server from concurrent clients and reports throughput and latency percentiles.
+#
+
+import asyncio
+import difflib
+import json
+import os
+import sys
+import time
+from collections import Counter
+from urllib.parse import parse_qs
+
+def _lines(value, name):
+    if not isinstance(value, list) or not all(isinstance(line, str) for line in value):
+        raise ValueError('%s must be a list of strings' % name)
+    return value
+
+def _get_opcodes(a, b, algorithm='ratcliff'):
+    import Python_Difflib_Pattern_Matching_Diff_Algorithms as diff_algorithms
+
+    for code in diff_algorithms.get_opcodes(_lines(a, 'a'), _lines(b, 'b'), algorithm):
+        yield list(code)
+
+def _ndiff(a, b, algorithm='ratcliff', max_block=None, pairing='all'):
+    import Python_Difflib_Pattern_Matching_Diff_Algorithms as diff_algorithms
+
+    return diff_algorithms.ndiff(_lines(a, 'a'), _lines(b, 'b'), algorithm,
+                                 max_block=max_block, pairing=pairing)
+
+def _unified_diff(a, b, fromfile='', tofile='', fromfiledate='', tofiledate='', n=3,
+                  lineterm='\n', algorithm='ratcliff'):
+    import Python_Difflib_Pattern_Matching_Diff_Algorithms as diff_algorithms
+    import Python_Difflib_Pattern_Matching_CL_Interface as cl_interface
+
+    a, b = _lines(a, 'a'), _lines(b, 'b')
+    groups = cl_interface.group_opcodes(diff_algorithms.get_opcodes(a, b, algorithm), n)
+    return cl_interface.unified_diff_from_opcodes(a, b, groups, fromfile, tofile, fromfiledate,
+                                                  tofiledate, lineterm)
+
+def _get_close_matches(possibilities, word=None, words=None, n=3, cutoff=0.6):
+    if (word is None) == (words is None):
+        raise ValueError('give either word or words')
+    possibilities = _lines(possibilities, 'possibilities')
+    for word in [word] if words is None else _lines(words, 'words'):
+        yield difflib.get_close_matches(word, possibilities, n, cutoff)
+
+# Request path -> generator of results, called with the request's JSON object as keyword arguments.
+JOBS = {
+    'get_opcodes': _get_opcodes,
+    'ndiff': _ndiff,
+    'unified_diff': _unified_diff,
+    'get_close_matches': _get_close_matches,
+}
+
+#
+# Worker side. Requests arrive on stdin as a four byte big-endian length followed by "job\nbody". Each reply is a series of frames on stdout:
+# one kind byte, a four byte big-endian length and the data. 'D' frames hold NDJSON results, the final 'F' frame the closing done line, and an
+# 'E' frame a JSON error with the HTTP status to use.
+#
+
+_FLUSH_BYTES = 64 * 1024
+_FLUSH_SECONDS = 0.05
+
+def _run_job(job, body, send):
+    count = 0
+    try:
+        params = json.loads(body) if body.strip() else {}
+        if not isinstance(params, dict):
+            raise ValueError('the request body must be a JSON object')
+        chunk = []
+        size = 0
+        last = time.perf_counter()
+        for item in JOBS[job](**params):
+            line = json.dumps(item) + '\n'
+            chunk.append(line)
+            size += len(line)
+            count += 1
+            if size >= _FLUSH_BYTES or time.perf_counter() - last >= _FLUSH_SECONDS:
+                send(b'D', ''.join(chunk).encode())
+                chunk = []
+                size = 0
+                last = time.perf_counter()
+        if chunk:
+            send(b'D', ''.join(chunk).encode())
+    except Exception as e:
+        status = 400 if count == 0 and isinstance(e, (TypeError, ValueError)) else 500
+        send(b'E', json.dumps({'status': status, 'error': '%s: %s' % (type(e).__name__, e)}).encode())
+        return
+    send(b'F', json.dumps({'done': True, 'count': count}).encode() + b'\n')
+
+def worker_main():
+    stdin, stdout = sys.stdin.buffer, sys.stdout.buffer
+
+    def send(kind, data):
+        stdout.write(kind + len(data).to_bytes(4, 'big') + data)
+        stdout.flush()
+
+    while True:
+        header = stdin.read(4)
+        if len(header) < 4:
+            return
+        job, _, body = stdin.read(int.from_bytes(header, 'big')).partition(b'\n')
+        _run_job(job.decode(), body, send)
+
+#
+# Server side.
+#
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            408: 'Request Timeout', 411: 'Length Required', 413: 'Payload Too Large',
+            500: 'Internal Server Error', 503: 'Service Unavailable', 504: 'Gateway Timeout'}
+
+class _HTTPError(Exception):
+
+    def __init__(self, status, message, headers=()):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers
+
+class _ClientGone(Exception):
+    pass
+
+class _WorkerDied(Exception):
+    pass
+
+class _Worker:
+    """A worker process and the pipes to it."""
+
+    def __init__(self, proc):
+        self.proc = proc
+
+    async def send(self, job, body):
+        frame = job.encode() + b'\n' + body
+        try:
+            self.proc.stdin.write(len(frame).to_bytes(4, 'big') + frame)
+            await self.proc.stdin.drain()
+        except ConnectionError:
+            raise _WorkerDied from None
+
+    async def read_frame(self):
+        try:
+            header = await self.proc.stdout.readexactly(5)
+            return header[:1], await self.proc.stdout.readexactly(int.from_bytes(header[1:], 'big'))
+        except asyncio.IncompleteReadError:
+            raise _WorkerDied from None
+
+    def kill(self):
+        try:
+            self.proc.kill()
+        except ProcessLookupError:
+            pass
+
+class DiffServer:
+    """HTTP server running JOBS in a pool of worker processes (see above)."""
+
+    def __init__(self, workers=None, max_pending=None, max_body=64*1024*1024,
+                 default_budget=10.0, max_budget=60.0, header_timeout=10.0):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 4 * self.workers
+        self.max_body = max_body
+        self.default_budget = default_budget
+        self.max_budget = max_budget
+        self.header_timeout = header_timeout
+        self.stats = Counter()
+        self._pending = 0
+        self._idle = asyncio.Queue()
+        self._procs = set()
+        self._tasks = set()
+        self._server = None
+        self._closing = False
+
+    async def start(self, address):
+        """Start the workers and listen on address, a Unix socket path or a
+        (host, port) pair."""
+        for worker in await asyncio.gather(*[self._spawn() for _ in range(self.workers)]):
+            self._idle.put_nowait(worker)
+        if isinstance(address, str):
+            self._server = await asyncio.start_unix_server(self._handle, address, backlog=1024)
+        else:
+            self._server = await asyncio.start_server(self._handle, *address, backlog=1024)
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        self._closing = True
+        self._server.close()
+        await self._server.wait_closed()
+        for proc in list(self._procs):
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+            await proc.wait()
+
+    async def _spawn(self):
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, os.path.abspath(__file__), '--worker',
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE)
+        self._procs.add(proc)
+        return _Worker(proc)
+
+    async def _respawn(self, worker):
+        await worker.proc.wait()
+        self._procs.discard(worker.proc)
+        if not self._closing:
+            self._idle.put_nowait(await self._spawn())
+
+    def _replace(self, worker):
+        """Kill a worker whose job was abandoned and start another."""
+        worker.kill()
+        task = asyncio.ensure_future(self._respawn(worker))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _handle(self, reader, writer):
+        self.stats['connections'] += 1
+        try:
+            await self._respond(reader, writer)
+        except _HTTPError as e:
+            self.stats[e.status] += 1
+            self._send_error(writer, e.status, str(e), e.headers)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            pass
+        finally:
+            writer.close()
+
+    def _send_error(self, writer, status, message, headers=()):
+        body = json.dumps({'error': message}).encode()
+        head = ['HTTP/1.1 %d %s' % (status, _REASONS[status]), 'Content-Type: application/json',
+                'Content-Length: %d' % len(body), 'Connection: close']
+        head.extend('%s: %s' % header for header in headers)
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode() + body)
+
+    async def _read_head(self, reader):
+        """Return the method, path, query and headers of a request."""
+        try:
+            line = await asyncio.wait_for(reader.readline(), self.header_timeout)
+            method, target, _ = line.decode('latin-1').split()
+            headers = {}
+            while True:
+                line = await asyncio.wait_for(reader.readline(), self.header_timeout)
+                if line in (b'\r\n', b'\n'):
+                    break
+                if not line or len(headers) >= 100:
+                    raise ValueError('bad headers')
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+        except asyncio.TimeoutError:
+            raise _HTTPError(408, 'request timeout') from None
+        except ValueError:
+            raise _HTTPError(400, 'malformed request') from None
+        path, _, query = target.partition('?')
+        return method, path, parse_qs(query), headers
+
+    async def _respond(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        method, path, query, headers = await self._read_head(reader)
+
+        if path == '/stats':
+            stats = {str(key): value for key, value in self.stats.items()}
+            stats.update(pending=self._pending, idle_workers=self._idle.qsize())
+            body = json.dumps(stats).encode()
+            writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+                         b'Content-Length: %d\r\nConnection: close\r\n\r\n' % len(body) + body)
+            return
+        job = path[1:]
+        if job not in JOBS:
+            raise _HTTPError(404, 'unknown job %r' % job)
+        if method != 'POST':
+            raise _HTTPError(405, 'use POST', [('Allow', 'POST')])
+        try:
+            length = int(headers['content-length'])
+        except KeyError:
+            raise _HTTPError(411, 'Content-Length required') from None
+        except ValueError:
+            raise _HTTPError(400, 'bad Content-Length') from None
+        if length > self.max_body:
+            raise _HTTPError(413, 'request body over %d bytes' % self.max_body)
+        try:
+            budget = float(query.get('time_budget', [self.default_budget])[0])
+        except ValueError:
+            raise _HTTPError(400, 'bad time_budget') from None
+        if not budget > 0:
+            raise _HTTPError(400, 'time_budget must be positive')
+        if self._pending >= self.max_pending:
+            raise _HTTPError(503, 'server busy', [('Retry-After', '1')])
+
+        self.stats['requests'] += 1
+        self._pending += 1
+        try:
+            deadline = start + min(budget, self.max_budget)
+            try:
+                body = await asyncio.wait_for(reader.readexactly(length), deadline - loop.time())
+            except asyncio.TimeoutError:
+                raise _HTTPError(408, 'request body not received in time') from None
+            await self._stream(job, body, deadline, reader, writer)
+        finally:
+            self._pending -= 1
+
+    async def _stream(self, job, body, deadline, reader, writer):
+        """Run job on a worker and stream its results to the client."""
+        loop = asyncio.get_running_loop()
+        try:
+            worker = await asyncio.wait_for(self._idle.get(), deadline - loop.time())
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            raise _HTTPError(504, 'time budget used up waiting for a worker') from None
+
+        finished = started = False
+        # The request has been read in full, so reading again only returns
+        # when the client closes the connection.
+        watcher = asyncio.ensure_future(reader.read(1))
+        try:
+            await asyncio.wait_for(worker.send(job, body), deadline - loop.time())
+            while not finished:
+                read = asyncio.ensure_future(worker.read_frame())
+                done, _ = await asyncio.wait({read, watcher}, timeout=deadline - loop.time(),
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if read not in done:
+                    read.cancel()
+                    if watcher in done:
+                        raise _ClientGone
+                    raise asyncio.TimeoutError
+                kind, data = read.result()
+
+                if kind == b'E':
+                    finished = True
+                    error = json.loads(data)
+                    self.stats['failed'] += 1
+                    if not started:
+                        raise _HTTPError(error['status'], error['error'])
+                    writer.write(json.dumps({'error': error['error']}).encode() + b'\n')
+                    break
+                if not started:
+                    started = True
+                    writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n'
+                                 b'Connection: close\r\n\r\n')
+                writer.write(data)
+                if kind == b'F':
+                    finished = True
+                    self.stats['completed'] += 1
+                await asyncio.wait_for(writer.drain(), deadline - loop.time())
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            if not started:
+                raise _HTTPError(504, 'time budget exceeded') from None
+            writer.write(b'{"error": "time budget exceeded"}\n')
+        except _WorkerDied:
+            self.stats['failed'] += 1
+            if not started:
+                raise _HTTPError(500, 'worker process died') from None
+            writer.write(b'{"error": "worker process died"}\n')
+        except (_ClientGone, ConnectionError):
+            self.stats['cancelled'] += 1
+        finally:
+            watcher.cancel()
+            if finished:
+                self._idle.put_nowait(worker)
+            else:
+                self._replace(worker)
+
+async def serve(address, **options):
+    """Run a DiffServer on address until cancelled."""
+    server = DiffServer(**options)
+    await server.start(address)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+#
+# Client side and load test.
+#
+
+async def _open(address):
+    if isinstance(address, str):
+        return await asyncio.open_unix_connection(address)
+    return await asyncio.open_connection(*address)
+
+async def _post(address, job, body, time_budget=None):
+    """Send one request; return the status and the raw response body."""
+    reader, writer = await _open(address)
+    try:
+        target = '/' + job + ('' if time_budget is None else '?time_budget=%g' % time_budget)
+        writer.write(b'POST %s HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n'
+                     b'Content-Length: %d\r\nConnection: close\r\n\r\n'
+                     % (target.encode(), len(body)) + body)
+        response = await reader.read()
+    finally:
+        writer.close()
+    head, _, payload = response.partition(b'\r\n\r\n')
+    return int(head.split(None, 2)[1]), payload
+
+async def get_stats(address):
+    reader, writer = await _open(address)
+    try:
+        writer.write(b'GET /stats HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n')
+        response = await reader.read()
+    finally:
+        writer.close()
+    return json.loads(response.partition(b'\r\n\r\n')[2])
+
+async def request(address, job, params, time_budget=None):
+    """Run one job on the server at address; return the HTTP status and the
+    decoded response (the list of NDJSON items, or the error object)."""
+    status, payload = await _post(address, job, json.dumps(params).encode(), time_budget)
+    if status != 200:
+        return status, json.loads(payload)
+    return status, [json.loads(line) for line in payload.splitlines()]
+
+def _percentile(sorted_values, p):
+    if not sorted_values:
+        return float('nan')
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100 * len(sorted_values)))]
+
+async def load_test(address, requests, concurrency=32):
+    """Send requests, a list of (job, params, time_budget) tuples, with
+    concurrency clients at a time. Return a dict with the wall time, the
+    throughput in requests per second, a Counter of statuses (with
+    'incomplete' for 200 responses not ending in a done line and 'reset'
+    for connections closed before a response) and the p50 and p99
+    latencies of the 200 responses in milliseconds, overall and per job."""
+    queue = asyncio.Queue()
+    for job, params, time_budget in requests:
+        queue.put_nowait((job, json.dumps(params).encode(), time_budget))
+    statuses = Counter()
+    latencies = {}
+
+    async def client():
+        while not queue.empty():
+            job, body, time_budget = queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                status, payload = await _post(address, job, body, time_budget)
+            except (ConnectionError, OSError, IndexError):
+                statuses['reset'] += 1
+                continue
+            elapsed = (time.perf_counter() - start) * 1000
+            if status == 200 and not payload.rstrip().rpartition(b'\n')[2].startswith(b'{"done"'):
+                status = 'incomplete'
+            statuses[status] += 1
+            if status == 200:
+                latencies.setdefault(job, []).append(elapsed)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    wall = time.perf_counter() - start
+
+    report = {'wall': wall, 'throughput': len(requests) / wall, 'statuses': statuses}
+    for job, values in sorted(latencies.items()) + [('all', sum(latencies.values(), []))]:
+        values.sort()
+        report[job] = {'count': len(values), 'p50': _percentile(values, 50),
+                       'p99': _percentile(values, 99)}
+    return report
+
+#
+# Example: a server with 4 workers on a Unix socket, a few requests, then a load test with a mix of the four jobs.
+#
+
+def _workload(count, seed=0):
+    import random, string
+
+    rng = random.Random(seed)
+    letters = string.ascii_lowercase
+
+    def text(lines):
+        return ['%s %d\n' % (''.join(rng.choice(letters) for _ in range(20)), i) for i in range(lines)]
+
+    def edited(a, changes):
+        b = list(a)
+        for i in rng.sample(range(len(a)), changes):
+            b[i] = b[i][:5] + 'x' + b[i][6:]
+        return b
+
+    vocabulary = [''.join(rng.choice(letters) for _ in range(rng.randrange(4, 12))) for _ in range(2000)]
+    requests = []
+    for k in range(count):
+        job = ('get_opcodes', 'ndiff', 'unified_diff', 'get_close_matches')[k % 4]
+        if job == 'get_close_matches':
+            words = [''.join(rng.sample(word, len(word))) for word in rng.sample(vocabulary, 5)]
+            params = {'words': words, 'possibilities': vocabulary}
+        else:
+            a = text(2000 if job == 'get_opcodes' else 200)
+            params = {'a': a, 'b': edited(a, len(a) // 50)}
+        requests.append((job, params, 5.0))
+    return requests
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--worker']:
+        worker_main()
+        sys.exit()
+
+    if sys.argv[1:2] == ['--serve']:
+        address = sys.argv[2]
+        host, _, port = address.rpartition(':')
+        if port.isdigit():
+            address = (host or 'localhost', int(port))
+        workers = int(sys.argv[3]) if len(sys.argv) > 3 else None
+        try:
+            asyncio.run(serve(address, workers=workers))
+        except KeyboardInterrupt:
+            pass
+        sys.exit()
+
+    import subprocess, tempfile
+
+    top = tempfile.mkdtemp()
+    address = os.path.join(top, 'diff.sock')
+    server = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve', address, '4'])
+    try:
+        while not os.path.exists(address):
+            time.sleep(0.01)
+
+        async def demo():
+            print(await request(address, 'unified_diff',
+                                {'a': ['one\n', 'two\n', 'three\n'], 'b': ['one\n', 'tree\n', 'three\n'],
+                                 'fromfile': 'before', 'tofile': 'after'}))
+
+            print(await request(address, 'get_close_matches',
+                                {'word': 'appel', 'possibilities': ['ape', 'apple', 'peach', 'puppy']}))
+
+            print(await request(address, 'ndiff', {'a': 'one'}))
+
+            # A job that cannot finish within its budget is stopped, and its worker replaced.
+            a = ['line %d of the old text\n' % i for i in range(3000)]
+            b = ['line %d of the new text\n' % i for i in range(3000)]
+            start = time.perf_counter()
+            status, result = await request(address, 'ndiff', {'a': a, 'b': b}, time_budget=0.5)
+            print(status, result, '%.1f s' % (time.perf_counter() - start))
+
+            # So is a job whose client goes away.
+            reader, writer = await _open(address)
+            body = json.dumps({'a': a, 'b': b}).encode()
+            writer.write(b'POST /ndiff HTTP/1.1\r\nContent-Length: %d\r\n\r\n' % len(body) + body)
+            await asyncio.sleep(0.2)
+            writer.close()
+            await asyncio.sleep(0.1)
+
+            # Load test with as many clients as the server admits (4 workers, max_pending 16).
+            report = await load_test(address, _workload(2000), concurrency=16)
+            print('%d requests in %.2f s, %.0f requests/s, statuses %s'
+                  % (sum(report['statuses'].values()), report['wall'], report['throughput'],
+                     dict(report['statuses'])))
+            for job in ('get_opcodes', 'ndiff', 'unified_diff', 'get_close_matches', 'all'):
+                print('%-18s p50 %6.1f ms  p99 %6.1f ms' % (job, report[job]['p50'], report[job]['p99']))
+
+            # 200 requests at once against max_pending = 16: the excess is turned away with 503.
+            report = await load_test(address, _workload(200), concurrency=200)
+            print('burst statuses %s' % dict(report['statuses']))
+
+            print(await get_stats(address))
+
+        asyncio.run(demo())
+    finally:
+        server.terminate()
+        server.wait()
+        os.unlink(address)
+        os.rmdir(top)
+
+    # OUTPUT:
+    #
+    # (200, ['--- before\n', '+++ after\n', '@@ -1,3 +1,3 @@\n', ' one\n', '-two\n', '+tree\n', ' three\n', {'done': True, 'count': 7}])
+    # (200, [['apple', 'ape'], {'done': True, 'count': 1}])
+    # (400, {'error': "TypeError: _ndiff() missing 1 required positional argument: 'b'"})
+    # 504 {'error': 'time budget exceeded'} 0.5 s
+    # 2000 requests in 27.57 s, 73 requests/s, statuses {200: 2000}
+    # get_opcodes        p50  210.6 ms  p99  370.5 ms
+    # ndiff              p50  175.6 ms  p99  220.9 ms
+    # unified_diff       p50  175.4 ms  p99  214.2 ms
+    # get_close_matches  p50  335.6 ms  p99  379.1 ms
+    # all                p50  194.6 ms  p99  367.4 ms
+    # burst statuses {503: 184, 200: 16}
+    # {'connections': 2206, 'requests': 2021, 'completed': 2018, 'failed': 1, '400': 1, 'timeouts': 1, '504': 1, 'cancelled': 1, '503': 184, 'pending': 0, 'idle_workers': 4}
+    #
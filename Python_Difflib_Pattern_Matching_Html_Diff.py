@@ -0,0 +1,274 @@
+# Python Difflib
+# difflib - Helpers for computing deltas.
+# This module provides classes and functions for comparing sequences.
+#
+# class difflib.HtmlDiff
+# This class can be used to create an HTML table (or a complete HTML file containing the table) showing a side by side, line by line comparison of text
+# with inter-line and intra-line change highlights. The table can be generated in either full or contextual difference mode.
+#
+
+#
+# A streaming HTML side by side diff.
+#
+
+#
+# HtmlDiff.make_file() runs ndiff over the whole input, marks up every changed character and returns the page as one string, so large inputs with long
+# lines take a long time and a lot of memory before the first byte is written. HtmlDiffWriter produces the same page (same table layout, styles,
+# legend and "next change" links) as a stream of rows:
+#
+# * The rows are driven by line opcodes, which can be passed in (for example from trimmed_opcodes() in
+#   Python_Difflib_Pattern_Matching_CL_Interface.py, or another --algorithm) or are computed with SequenceMatcher.
+# * Changed lines are paired up in order inside each replace block; the characters of a pair are compared only when both lines are at most
+#   max_line_length characters long and the time_budget (seconds for the whole file) is not used up. Otherwise the pair is shown as a whole-line
+#   change. stats counts which way each pair went.
+# * With context=True, unchanged regions longer than twice numlines are collapsed, as HtmlDiff does.
+# * The "next" column is placed as HtmlDiff._convert_flags() places it: each change's anchor goes numlines rows before its first row, counting
+#   the separators of collapsed regions, so only numlines rows are held back before they are written.
+#
+# The output equals make_table() / make_file() except for the rows of replace blocks: ndiff pairs their lines at its own sync points and
+# highlights characters only for pairs more than 74% similar, so the pairing and the highlighting of such rows can differ.
+#
+
+import difflib
+import time
+from collections import Counter, deque
+
+class HtmlDiffWriter:
+    """Streaming counterpart of difflib.HtmlDiff.make_file() / make_table()."""
+
+    _default_prefix = 0
+
+    def __init__(self, tabsize=8, max_line_length=1000, time_budget=None, cutoff=0.5,
+                 charset='utf-8'):
+        self.tabsize = tabsize
+        self.max_line_length = max_line_length
+        self.time_budget = time_budget
+        self.cutoff = cutoff
+        self.charset = charset
+        self.stats = Counter()
+        self._spent = 0.0
+
+    def iter_file(self, fromlines, tolines, fromdesc='', todesc='', context=False,
+                  numlines=5, opcodes=None):
+        """Yield the HTML page comparing fromlines and tolines, piece by piece."""
+        head, tail = difflib.HtmlDiff._file_template.split('%(table)s')
+        yield head % dict(styles=difflib.HtmlDiff._styles, charset=self.charset)
+        yield from self.iter_table(fromlines, tolines, fromdesc, todesc, context, numlines,
+                                   opcodes)
+        yield tail % dict(legend=difflib.HtmlDiff._legend)
+
+    def iter_table(self, fromlines, tolines, fromdesc='', todesc='', context=False,
+                   numlines=5, opcodes=None):
+        """Yield the HTML table comparing fromlines and tolines, row by row."""
+        prefix = HtmlDiffWriter._default_prefix
+        HtmlDiffWriter._default_prefix += 1
+        self._ids = ('from%d_' % prefix, 'to%d_' % prefix)
+        toprefix = self._ids[1]
+
+        if opcodes is None:
+            opcodes = difflib.SequenceMatcher(None, fromlines, tolines).get_opcodes()
+        codes = [code for code in opcodes if code[1] < code[2] or code[3] < code[4]]
+        changes = sum(tag != 'equal' for tag, _, _, _, _ in codes)
+
+        if fromdesc or todesc:
+            header_row = '<thead><tr>%s%s%s%s</tr></thead>' % (
+                '<th class="diff_next"><br /></th>',
+                '<th colspan="2" class="diff_header">%s</th>' % fromdesc,
+                '<th class="diff_next"><br /></th>',
+                '<th colspan="2" class="diff_header">%s</th>' % todesc)
+        else:
+            header_row = ''
+        top, bottom = difflib.HtmlDiff._table_template.split('%(data_rows)s')
+        yield top % dict(prefix=toprefix, header_row=header_row)
+
+        if not changes and (context or not codes):
+            text = 'No Differences Found' if context else 'Empty File'
+            cell = '<td></td><td>&nbsp;%s&nbsp;</td>' % text
+            yield self._row('', '<a href="#difflib_chg_%s_top">t</a>' % toprefix, cell, cell)
+            yield bottom
+            return
+
+        entries = self._entries(fromlines, tolines, codes, context, numlines)
+        yield from self._rows(entries, changes, numlines)
+        yield bottom
+
+    def _entries(self, fromlines, tolines, codes, context, numlines):
+        """Yield the rows HtmlDiff builds its table from, as (changed,
+        from_cell, to_cell), and None where unchanged lines are collapsed."""
+        for k, (tag, i1, i2, j1, j2) in enumerate(codes):
+            if tag == 'equal':
+                before = k > 0
+                after = k + 1 < len(codes)
+                if context and i2 - i1 > (before + after) * numlines:
+                    if before:
+                        yield from self._equal(fromlines, i1, i1 + numlines, j1)
+                    if after:
+                        # Also before the first change: HtmlDiff counts that separator as a row.
+                        yield None
+                        yield from self._equal(fromlines, i2 - numlines, i2, j2 - numlines)
+                else:
+                    yield from self._equal(fromlines, i1, i2, j1)
+            else:
+                yield from self._changed(fromlines, tolines, i1, i2, j1, j2)
+
+    def _rows(self, entries, changes, numlines):
+        """Yield the table rows of entries with the "next" column of
+        HtmlDiff._convert_flags(): the anchor of each change numlines entries
+        before its first row (separators included), the link to the next
+        change on that first row. Only numlines + 1 rows are held back."""
+        toprefix = self._ids[1]
+        pending = deque()
+        change = 0
+        in_change = False
+        for index, entry in enumerate(entries):
+            row = [entry, '', '']
+            pending.append(row)
+            if entry is not None and entry[0]:
+                if not in_change:
+                    in_change = True
+                    anchor = max(0, index - numlines) - (index + 1 - len(pending))
+                    pending[anchor][1] = ' id="difflib_chg_%s_%d"' % (toprefix, change)
+                    change += 1
+                    row[2] = ('<a href="#difflib_chg_%s_%d">n</a>' % (toprefix, change)
+                              if change < changes else
+                              '<a href="#difflib_chg_%s_top">t</a>' % toprefix)
+            else:
+                in_change = False
+                if index == 0:
+                    row[2] = ('<a href="#difflib_chg_%s_0">f</a>' % toprefix if changes else
+                              '<a href="#difflib_chg_%s_top">t</a>' % toprefix)
+            while len(pending) > numlines + 1:
+                yield self._render(pending.popleft(), index - numlines - 1)
+        for offset, row in enumerate(pending):
+            yield self._render(row, index + 1 - len(pending) + offset)
+
+    def _render(self, row, index):
+        entry, next_id, next_href = row
+        if entry is None:
+            # The separator HtmlDiff drops before a first change is not shown.
+            return '        </tbody>        \n        <tbody>\n' if index else ''
+        return self._row(next_id, next_href, entry[1], entry[2])
+
+    def _row(self, next_id, next_href, from_cell, to_cell):
+        return ('            <tr><td class="diff_next"%s>%s</td>%s'
+                '<td class="diff_next">%s</td>%s</tr>\n'
+                % (next_id, next_href, from_cell, next_href, to_cell))
+
+    def _cell(self, side, lineno, markup):
+        if lineno is None:
+            return '<td class="diff_header"></td><td nowrap="nowrap"></td>'
+        return '<td class="diff_header" id="%s%d">%d</td><td nowrap="nowrap">%s</td>' % (
+            self._ids[side], lineno, lineno, markup)
+
+    def _text(self, line):
+        line = line.rstrip('\r\n').expandtabs(self.tabsize)
+        return line.replace('&', '&amp;').replace('>', '&gt;').replace('<', '&lt;') \
+                   .replace(' ', '&nbsp;')
+
+    def _span(self, kind, text):
+        return '<span class="diff_%s">%s</span>' % (kind, self._text(text)) if text else ''
+
+    def _equal(self, lines, i1, i2, j1):
+        for k in range(i2 - i1):
+            text = self._text(lines[i1 + k])
+            yield False, self._cell(0, i1 + k + 1, text), self._cell(1, j1 + k + 1, text)
+
+    def _changed(self, fromlines, tolines, i1, i2, j1, j2):
+        for k in range(max(i2 - i1, j2 - j1)):
+            a = fromlines[i1 + k].rstrip('\r\n').expandtabs(self.tabsize) if i1 + k < i2 else None
+            b = tolines[j1 + k].rstrip('\r\n').expandtabs(self.tabsize) if j1 + k < j2 else None
+            if a is not None and b is not None:
+                from_markup, to_markup = self._intraline(a, b)
+            else:
+                from_markup = self._span('sub', a) if a is not None else ''
+                to_markup = self._span('add', b) if b is not None else ''
+            yield (True, self._cell(0, i1 + k + 1 if a is not None else None, from_markup),
+                   self._cell(1, j1 + k + 1 if b is not None else None, to_markup))
+
+    def _intraline(self, a, b):
+        """Return the markup of a changed line pair, with the changed
+        characters highlighted when the limits allow it."""
+        whole = self._span('sub', a), self._span('add', b)
+        if len(a) > self.max_line_length or len(b) > self.max_line_length:
+            self.stats['too_long'] += 1
+            return whole
+        if self.time_budget is not None and self._spent >= self.time_budget:
+            self.stats['over_budget'] += 1
+            return whole
+
+        start = time.perf_counter()
+        matcher = difflib.SequenceMatcher(None, a, b, autojunk=False)
+        if matcher.real_quick_ratio() < self.cutoff or matcher.quick_ratio() < self.cutoff:
+            codes = None
+        else:
+            codes = matcher.get_opcodes()
+            if sum(i2 - i1 for tag, i1, i2, _, _ in codes if tag == 'equal') * 2.0 \
+               < self.cutoff * (len(a) + len(b)):
+                codes = None
+        self._spent += time.perf_counter() - start
+        if codes is None:
+            self.stats['dissimilar'] += 1
+            return whole
+
+        self.stats['intraline'] += 1
+        from_parts = []
+        to_parts = []
+        for tag, i1, i2, j1, j2 in codes:
+            if tag == 'equal':
+                from_parts.append(self._text(a[i1:i2]))
+                to_parts.append(self._text(b[j1:j2]))
+            elif tag == 'replace':
+                from_parts.append(self._span('chg', a[i1:i2]))
+                to_parts.append(self._span('chg', b[j1:j2]))
+            elif tag == 'delete':
+                from_parts.append(self._span('sub', a[i1:i2]))
+            else:
+                to_parts.append(self._span('add', b[j1:j2]))
+        return ''.join(from_parts), ''.join(to_parts)
+
+#
+# Benchmark: two 2000 line files with 800 character lines, one line in ten changed, rendered by HtmlDiff.make_file() and by HtmlDiffWriter.
+#
+
+def benchmark(lines=2000, width=800, seed=0):
+    import io, random, tracemalloc
+
+    rng = random.Random(seed)
+    alphabet = 'abcdefghijklmnopqrstuvwxyz     '
+    a = [''.join(rng.choice(alphabet) for _ in range(width)) + '\n' for _ in range(lines)]
+    b = list(a)
+    for i in rng.sample(range(lines), lines // 10):
+        chars = list(b[i])
+        for _ in range(5):
+            chars[rng.randrange(width)] = rng.choice(alphabet)
+        b[i] = ''.join(chars)
+
+    writer = HtmlDiffWriter(time_budget=0.5)
+    for name, make in (('HtmlDiffWriter', lambda: writer.iter_file(a, b, 'a', 'b', context=True)),
+                       ('HtmlDiff', lambda: [difflib.HtmlDiff().make_file(a, b, 'a', 'b', context=True)])):
+        out = io.StringIO()
+        tracemalloc.start()
+        start = time.perf_counter()
+        for piece in make():
+            out.write(piece)
+            out.seek(0)
+            out.truncate()
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print('%-14s %.2f s, peak %.1f MB' % (name, elapsed, peak / 1e6))
+    print(dict(writer.stats))
+
+if __name__ == '__main__':
+    import sys
+
+    fromlines = ['one\n', 'two\n', 'three\n', 'four\n']
+    tolines = ['one\n', 'tree\n', 'emu\n', 'four\n']
+
+    sys.stdout.writelines(HtmlDiffWriter().iter_table(fromlines, tolines, 'before', 'after'))
+
+    benchmark()
+
+    # OUTPUT: 'HtmlDiffWriter 0.73 s, peak 0.4 MB'
+    # OUTPUT: 'HtmlDiff       12.74 s, peak 24.7 MB'
+    # OUTPUT: '{'intraline': 7, 'over_budget': 193}'
@@ -0,0 +1,268 @@
+# Python Difflib Pattern Matching
+# difflib - Helpers for computing deltas
+# This module provides classes and functions for comparing sequences.
+# It can be used for example, for comparing files, and can produce difference information in various formats, including HTML and context and unified diffs.
+#
+
+#
+# difflib.restore(sequence, which):
+# Return one of the two sequences that generated a delta.
+#
+# Given a sequence produced by Differ.compare() or ndiff(), extract lines originating from file 1 or 2 (parameter which), stripping off line prefixes.
+# Getting lines 5000 to 5100 of one side this way reads every line of the delta before them.
+#
+
+#
+# Random access into stored ndiff deltas.
+#
+
+#
+# write_delta() stores a delta on disk together with a sidecar index, and restore_range() reads a line range of either side back by seeking into it:
+#
+# * The delta file holds one record per delta line: the one character tag ('-', '+', ' ' or '?') followed by the line, UTF-8 encoded. A line
+#   without a trailing newline is followed by a '\' record, as in unified diffs. The format is the ndiff text with one prefix character less
+#   per line.
+# * The index file (delta path + '.idx') holds, for every stride-th line of each side, the byte offset of the record it comes from, plus the
+#   line counts of both sides and the size of the delta file it was built for.
+# * restore_range(delta, which, start, stop) seeks to the nearest indexed line at or before start and reads at most stride - 1 records
+#   besides the ones it returns.
+# * restore(delta, which) streams one side of a stored delta, or of any iterable of delta lines, without materializing it.
+#
+# DeltaFile keeps the delta and its index open for repeated range queries. Its generators each keep their own position in the file, so they
+# can be interleaved, e.g. zip(d.restore(1), d.restore(2)).
+#
+
+import os
+import struct
+from io import BytesIO
+from array import array
+
+STRIDE = 256
+
+_MAGIC = b'NDIX'
+_HEADER = struct.Struct('<4sIQQQ')      # magic, stride, lines of side 1, lines of side 2, delta size
+_NO_NEWLINE = b'\\\n'
+
+def write_delta(diff, path, stride=STRIDE, encoding='utf-8', errors='surrogateescape'):
+    """Write the delta lines in diff (from ndiff() or Differ.compare()) to
+    path, and its index to path + '.idx'. Return the line counts of the two
+    sides."""
+    offsets = (array('Q'), array('Q'))
+    counts = [0, 0]
+    offset = 0
+    with open(path, 'wb') as f:
+        for line in diff:
+            tag = line[:1]
+            record = (tag + line[2:]).encode(encoding, errors)
+            if not record.endswith(b'\n'):
+                record += b'\n' + _NO_NEWLINE
+            if tag != '?':
+                for side in (0, 1):
+                    if tag == ' ' or tag == '-+'[side]:
+                        if counts[side] % stride == 0:
+                            offsets[side].append(offset)
+                        counts[side] += 1
+            f.write(record)
+            offset += len(record)
+
+    with open(path + '.idx', 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, stride, counts[0], counts[1], offset))
+        offsets[0].tofile(f)
+        offsets[1].tofile(f)
+    return tuple(counts)
+
+def _read_lines(f, offset, block=8*1024):
+    """Yield the lines of the binary file f from offset on. Each read seeks
+    to the generator's own offset first, so interleaved generators over the
+    same file do not disturb each other."""
+    rest = b''
+    while True:
+        f.seek(offset)
+        chunk = f.read(block)
+        if not chunk:
+            break
+        offset += len(chunk)
+        lines = BytesIO(rest + chunk).readlines()
+        rest = lines.pop() if not lines[-1].endswith(b'\n') else b''
+        yield from lines
+    if rest:
+        yield rest
+
+def _records(lines, encoding, errors):
+    """Yield the (tag, line) pairs of the records in lines."""
+    previous = None
+    for record in lines:
+        if record == _NO_NEWLINE and previous is not None:
+            previous = previous[0], previous[1][:-1]
+            continue
+        if previous is not None:
+            yield previous[0], previous[1].decode(encoding, errors)
+        previous = chr(record[0]), record[1:]
+    if previous is not None:
+        yield previous[0], previous[1].decode(encoding, errors)
+
+class DeltaFile:
+    """A delta written by write_delta(), opened together with its index."""
+
+    def __init__(self, path, encoding='utf-8', errors='surrogateescape'):
+        self.path = path
+        self.encoding = encoding
+        self.errors = errors
+        with open(path + '.idx', 'rb') as f:
+            magic, self.stride, count1, count2, size = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC:
+                raise ValueError('%s.idx is not a delta index' % path)
+            self.counts = (count1, count2)
+            self._offsets = []
+            for count in self.counts:
+                offsets = array('Q')
+                offsets.fromfile(f, -(-count // self.stride))
+                self._offsets.append(offsets)
+        self._file = open(path, 'rb')
+        if os.fstat(self._file.fileno()).st_size != size:
+            self._file.close()
+            raise ValueError('%s.idx does not match %s' % (path, path))
+
+    def __len__(self):
+        return sum(self.counts)
+
+    def restore(self, which):
+        """Yield every line of side which (1 or 2)."""
+        return self.restore_range(which, 0, None)
+
+    def restore_range(self, which, start, stop=None):
+        """Yield lines start to stop (0-based, stop excluded) of side which."""
+        try:
+            which, tags = int(which), {1: ' -', 2: ' +'}[int(which)]
+        except (KeyError, ValueError):
+            raise ValueError('unknown delta choice (must be 1 or 2): %r' % (which,)) from None
+        count = self.counts[which - 1]
+        start, stop, _ = slice(start, stop).indices(count)
+        if start >= stop:
+            return
+
+        k = start // self.stride
+        lineno = k * self.stride
+        records = _read_lines(self._file, self._offsets[which - 1][k])
+        for tag, line in _records(records, self.encoding, self.errors):
+            if tag in tags:
+                if lineno >= start:
+                    yield line
+                lineno += 1
+                if lineno >= stop:
+                    return
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def restore_range(delta, which, start, stop=None):
+    """Return lines start to stop of side which (1 or 2) of a delta written
+    by write_delta(); delta is its path or an open DeltaFile."""
+    if isinstance(delta, DeltaFile):
+        return list(delta.restore_range(which, start, stop))
+    with DeltaFile(delta) as d:
+        return list(d.restore_range(which, start, stop))
+
+def restore(delta, which):
+    """Yield side which (1 or 2) of a delta, like difflib.restore(), without
+    materializing it. delta is the path of a delta written by write_delta(),
+    an open DeltaFile, or any iterable of delta lines."""
+    if isinstance(delta, DeltaFile):
+        yield from delta.restore(which)
+    elif isinstance(delta, (str, os.PathLike)):
+        with DeltaFile(delta) as d:
+            yield from d.restore(which)
+    else:
+        try:
+            tag = {1: "- ", 2: "+ "}[int(which)]
+        except (KeyError, ValueError):
+            raise ValueError('unknown delta choice (must be 1 or 2): %r' % (which,)) from None
+        prefixes = ("  ", tag)
+        for line in delta:
+            if line[:2] in prefixes:
+                yield line[2:]
+
+#
+# Benchmark: a 200000 line document and an edited copy, their delta stored with write_delta(), and 100 lines from the middle of the new side read
+# back with restore_range() and with difflib.restore() over the stored ndiff text.
+#
+
+def benchmark(lines=200000, seed=0):
+    import difflib, random, shutil, tempfile, time, tracemalloc
+    import Python_Difflib_Pattern_Matching_Diff_Algorithms as diff_algorithms
+
+    rng = random.Random(seed)
+    a = ['line %d %08x\n' % (i, rng.getrandbits(32)) for i in range(lines)]
+    b = list(a)
+    for i in rng.sample(range(lines), lines // 100):
+        b[i] = b[i].replace(' ', '  ', 1)
+    diff = list(diff_algorithms.ndiff(a, b, 'histogram'))
+
+    top = tempfile.mkdtemp()
+    try:
+        text = os.path.join(top, 'delta.txt')
+        with open(text, 'w') as f:
+            f.writelines(diff)
+        path = os.path.join(top, 'delta')
+        write_delta(diff, path)
+        print('ndiff text %.1f MB, delta %.1f MB, index %.1f KB'
+              % (os.path.getsize(text) / 1e6, os.path.getsize(path) / 1e6,
+                 os.path.getsize(path + '.idx') / 1e3))
+
+        start, stop = lines // 2, lines // 2 + 100
+        def scan():
+            with open(text) as f:
+                return list(difflib.restore(f.readlines(), 2))[start:stop]
+        for name, function in (('restore_range', lambda: restore_range(path, 2, start, stop)),
+                               ('difflib.restore', scan)):
+            begin = time.perf_counter()
+            result = function()
+            elapsed = time.perf_counter() - begin
+            tracemalloc.start()
+            function()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            assert result == b[start:stop]
+            print('%-16s %8.2f ms, peak %.2f MB' % (name, elapsed * 1000, peak / 1e6))
+    finally:
+        shutil.rmtree(top)
+
+#
+# Example:
+#
+
+if __name__ == '__main__':
+    import difflib, tempfile
+
+    diff = difflib.ndiff('one\ntwo\nthree\n'.splitlines(keepends=True),
+                         'ore\ntree\nemu\n'.splitlines(keepends=True))
+
+    path = os.path.join(tempfile.mkdtemp(), 'delta')
+    print(write_delta(diff, path))
+
+    # OUTPUT: '(3, 3)'
+
+    print(''.join(restore(path, 1)), end="")
+
+    # OUTPUT:
+    #
+    # one
+    # two
+    # three
+    #
+
+    print(restore_range(path, 2, 1, 3))
+
+    # OUTPUT: '['tree\n', 'emu\n']'
+
+    benchmark()
+
+    # OUTPUT: 'ndiff text 4.6 MB, delta 4.3 MB, index 12.5 KB'
+    # OUTPUT: 'restore_range        0.29 ms, peak 0.06 MB'
+    # OUTPUT: 'difflib.restore    108.01 ms, peak 31.90 MB'
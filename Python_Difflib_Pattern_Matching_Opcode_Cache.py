@@ -0,0 +1,190 @@
+# Python Difflib Pattern Matching
+# difflib - Helpers for computing deltas
+# This module provides classes and functions for comparing sequences.
+# It can be used for example, for comparing files, and can produce difference information in various formats, including HTML and context and unified diffs.
+#
+# SequenceMatcher.get_opcodes()
+# Return list of 5-tuples describing how to turn a into b. Each tuple is of the form (tag, i1, i2, j1, j2).
+#
+
+#
+# A persistent opcode cache keyed by file contents.
+#
+
+#
+# Diffing the same pair of files again runs the matcher again, although only the opcodes matter: the unified, context and HTML writers rebuild
+# their output from the opcodes and the lines. OpcodeCache keeps the opcodes of file pairs in a SQLite table keyed by
+# (digest of the from file, digest of the to file, algorithm, options), so a repeated diff only costs reading and hashing the two files.
+#
+# * The digests are BLAKE2b digests of the file contents (file_digest() of Python_Filecmp_Digest_Cache.py), so renamed or copied files still hit.
+# * options is a string naming whatever else changes the opcodes, such as the CLI's --no-trim.
+# * The table holds at most max_bytes of encoded opcodes; the least recently used rows are evicted first.
+# * hits, misses and evictions are counted in the database itself, so several processes (the CLI's batch workers) can share one cache and
+#   stats() reports their combined totals.
+#
+
+import os
+import sqlite3
+import threading
+import time
+from array import array
+
+from Python_Filecmp_Digest_Cache import file_digest
+
+_TAGS = ('equal', 'replace', 'delete', 'insert')
+_TAG_CODES = {tag: k for k, tag in enumerate(_TAGS)}
+
+def encode_opcodes(codes):
+    """Pack opcodes into bytes, five 64-bit integers per opcode."""
+    packed = array('q')
+    for tag, i1, i2, j1, j2 in codes:
+        packed.extend((_TAG_CODES[tag], i1, i2, j1, j2))
+    return packed.tobytes()
+
+def decode_opcodes(data):
+    packed = array('q')
+    packed.frombytes(data)
+    return [(_TAGS[packed[k]],) + tuple(packed[k + 1:k + 5]) for k in range(0, len(packed), 5)]
+
+class OpcodeCache:
+    """On-disk LRU cache of opcodes keyed by the digests of the two files."""
+
+    def __init__(self, path, max_bytes=64*1024*1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        with self._db:
+            self._db.executescript('''
+                CREATE TABLE IF NOT EXISTS opcodes (
+                    from_digest BLOB, to_digest BLOB, algorithm TEXT, options TEXT,
+                    codes BLOB, size INTEGER, used INTEGER,
+                    PRIMARY KEY (from_digest, to_digest, algorithm, options));
+                CREATE INDEX IF NOT EXISTS opcodes_used ON opcodes (used);
+                CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER);
+                INSERT OR IGNORE INTO counters VALUES
+                    ('hits', 0), ('misses', 0), ('evictions', 0), ('bytes', 0);
+            ''')
+
+    def _count(self, name, n=1):
+        self._db.execute('UPDATE counters SET value = value + ? WHERE name = ?', (n, name))
+
+    def get(self, key):
+        """Return the opcodes stored for key, a (from digest, to digest,
+        algorithm, options) tuple, or None."""
+        with self._lock, self._db:
+            self._db.execute('BEGIN IMMEDIATE')
+            row = self._db.execute(
+                'SELECT codes FROM opcodes WHERE from_digest = ? AND to_digest = ? '
+                'AND algorithm = ? AND options = ?', key).fetchone()
+            if row is None:
+                self._count('misses')
+                return None
+            self._count('hits')
+            self._db.execute(
+                'UPDATE opcodes SET used = ? WHERE from_digest = ? AND to_digest = ? '
+                'AND algorithm = ? AND options = ?', (time.time_ns(),) + key)
+        return decode_opcodes(row[0])
+
+    def put(self, key, codes):
+        data = encode_opcodes(codes)
+        with self._lock, self._db:
+            self._db.execute('BEGIN IMMEDIATE')
+            old = self._db.execute(
+                'SELECT size FROM opcodes WHERE from_digest = ? AND to_digest = ? '
+                'AND algorithm = ? AND options = ?', key).fetchone()
+            self._db.execute('INSERT OR REPLACE INTO opcodes VALUES (?, ?, ?, ?, ?, ?, ?)',
+                             key + (data, len(data), time.time_ns()))
+            self._count('bytes', len(data) - (old[0] if old else 0))
+            self._evict()
+
+    def _evict(self):
+        total = self._db.execute("SELECT value FROM counters WHERE name = 'bytes'").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        freed = 0
+        doomed = []
+        rows = self._db.execute('SELECT rowid, size FROM opcodes ORDER BY used')
+        for rowid, size in rows:
+            if total - freed <= self.max_bytes:
+                break
+            doomed.append((rowid,))
+            freed += size
+        rows.close()
+        self._db.executemany('DELETE FROM opcodes WHERE rowid = ?', doomed)
+        self._count('bytes', -freed)
+        self._count('evictions', len(doomed))
+
+    def opcodes(self, fromfile, tofile, compute, algorithm='ratcliff', options=''):
+        """Return the opcodes of two files from the cache, or from compute()
+        on a miss, storing them."""
+        key = (file_digest(fromfile), file_digest(tofile), algorithm, options)
+        codes = self.get(key)
+        if codes is None:
+            codes = list(compute())
+            self.put(key, codes)
+        return codes
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._db.execute('SELECT name, value FROM counters'))
+            stats['entries'] = self._db.execute('SELECT COUNT(*) FROM opcodes').fetchone()[0]
+        stats['max_bytes'] = self.max_bytes
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+#
+# Benchmark: the unified diff of two 20000 line files with 1% of the lines changed, computed from scratch and through a warm cache.
+#
+
+def benchmark(lines=20000, seed=0):
+    import difflib, random, shutil, tempfile
+
+    rng = random.Random(seed)
+    a = ['%d %d\n' % (rng.randrange(50), rng.randrange(50)) for _ in range(lines)]
+    b = list(a)
+    for i in rng.sample(range(lines), lines // 100):
+        b[i] = 'changed\n'
+
+    top = tempfile.mkdtemp()
+    try:
+        paths = os.path.join(top, 'a'), os.path.join(top, 'b')
+        for path, content in zip(paths, (a, b)):
+            with open(path, 'w') as f:
+                f.writelines(content)
+
+        def diff(cache):
+            with open(paths[0]) as f:
+                fromlines = f.readlines()
+            with open(paths[1]) as f:
+                tolines = f.readlines()
+            compute = lambda: difflib.SequenceMatcher(None, fromlines, tolines).get_opcodes()
+            codes = cache.opcodes(*paths, compute) if cache else compute()
+            return codes
+
+        with OpcodeCache(os.path.join(top, 'cache.sqlite')) as cache:
+            for label, c in (('no cache', None), ('cold cache', cache), ('warm cache', cache)):
+                start = time.perf_counter()
+                codes = diff(c)
+                print('%-10s %7.1f ms, %d opcodes' % (label, (time.perf_counter() - start) * 1000,
+                                                      len(codes)))
+            print(cache.stats())
+    finally:
+        shutil.rmtree(top)
+
+if __name__ == '__main__':
+    benchmark()
+
+    # OUTPUT: 'no cache     262.2 ms, 397 opcodes'
+    # OUTPUT: 'cold cache   278.2 ms, 397 opcodes'
+    # OUTPUT: 'warm cache     5.5 ms, 397 opcodes'
+    # OUTPUT: '{'hits': 1, 'misses': 1, 'evictions': 0, 'bytes': 15880, 'entries': 1, 'max_bytes': 67108864}'
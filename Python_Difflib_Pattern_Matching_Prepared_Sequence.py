@@ -0,0 +1,353 @@
+# Python Difflib Pattern Matching
+# difflib - Helpers for computing deltas
+# This module provides classes and functions for comparing sequences.
+# It can be used for example, for comparing files, and can produce difference information in various formats, including HTML and context and unified diffs.
+#
+# SequenceMatcher computes and caches detailed information about the second sequence, so if you want to compare one sequence against many sequences,
+# use set_seq2() to set the commonly used sequence once and call set_seq1() repeatedly, once for each of the other sequences.
+#
+
+#
+# Prepared sequences: one b-side index shared by many matchers.
+#
+
+#
+# set_seq2() builds the b2j index (every element of b mapped to the positions where it occurs), the junk and popular sets, and later the full element
+# count used by quick_ratio(). A PreparedSequence holds all of that, built once:
+#
+# * It is immutable: b is stored as a tuple (or str/bytes), b2j maps elements to tuples of positions, bjunk and bpopular are frozensets, and b2j
+#   and fullbcount are read-only views (types.MappingProxyType) of their dicts, so the matchers sharing them cannot change them.
+# * It is picklable, so one prepared reference can be shipped to a process pool. The isjunk function is not kept, only its result.
+# * matcher(a) returns a SequenceMatcher that uses the prepared index as is, without running set_seq2().
+# * memory_usage() reports what the index costs, in bytes, per component.
+#
+# With compact=True the b2j index is stored in CSR layout instead of as a dict of lists: the positions of all elements live in one contiguous
+# array('l'), and each element only maps to a slot whose start and end are kept in a second array. CompactSequenceMatcher is a SequenceMatcher that
+# builds this index in set_seq2() and walks it in find_longest_match(); it gives the same results with several times less memory per element of b.
+#
+
+import sys
+from array import array
+from types import MappingProxyType
+from bisect import bisect_left
+from difflib import SequenceMatcher, Match
+
+class CompactB2J:
+    """SequenceMatcher's b2j index in CSR layout.
+
+    The positions of the element in slot k are
+    positions[offsets[k]:offsets[k + 1]], in increasing order.
+    """
+
+    __slots__ = ('slots', 'offsets', 'positions')
+
+    def __init__(self, slots, offsets, positions):
+        self.slots = slots
+        self.offsets = offsets
+        self.positions = positions
+
+    @classmethod
+    def from_sequence(cls, b, isjunk=None, autojunk=True):
+        """Return (b2j, bjunk, bpopular, fullbcount) for b, as set_seq2()
+        would compute them, with b2j built directly in CSR layout."""
+        fullbcount = {}
+        for elt in b:
+            fullbcount[elt] = fullbcount.get(elt, 0) + 1
+
+        junk = set()
+        if isjunk:
+            junk.update(elt for elt in fullbcount if isjunk(elt))
+
+        popular = set()
+        n = len(b)
+        if autojunk and n >= 200:
+            ntest = n // 100 + 1
+            popular.update(elt for elt, count in fullbcount.items()
+                           if count > ntest and elt not in junk)
+
+        slots = {}
+        offsets = array('l', [0])
+        for elt, count in fullbcount.items():
+            if elt not in junk and elt not in popular:
+                slots[elt] = len(slots)
+                offsets.append(offsets[-1] + count)
+
+        positions = array('l', [0]) * offsets[-1]
+        fill = offsets[:-1]
+        for j, elt in enumerate(b):
+            k = slots.get(elt)
+            if k is not None:
+                positions[fill[k]] = j
+                fill[k] += 1
+
+        return cls(slots, offsets, positions), junk, popular, fullbcount
+
+    def span(self, elt):
+        """Return the (start, stop) range of elt's positions."""
+        k = self.slots.get(elt)
+        if k is None:
+            return 0, 0
+        return self.offsets[k], self.offsets[k + 1]
+
+    def get(self, elt, default=None):
+        k = self.slots.get(elt)
+        if k is None:
+            return default
+        return self.positions[self.offsets[k]:self.offsets[k + 1]]
+
+    def __getitem__(self, elt):
+        result = self.get(elt)
+        if result is None:
+            raise KeyError(elt)
+        return result
+
+    def __contains__(self, elt):
+        return elt in self.slots
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __iter__(self):
+        return iter(self.slots)
+
+    def keys(self):
+        return self.slots.keys()
+
+    def items(self):
+        return ((elt, self[elt]) for elt in self.slots)
+
+    def memory_usage(self):
+        getsizeof = sys.getsizeof
+        return (getsizeof(self.slots) + getsizeof(self.offsets)
+                + getsizeof(self.positions))
+
+class PreparedSequence:
+    """The b-side of SequenceMatcher(isjunk, a, b, autojunk), built once."""
+
+    __slots__ = ('b', 'autojunk', 'b2j', 'bjunk', 'bpopular', 'fullbcount')
+
+    def __init__(self, b, isjunk=None, autojunk=True, compact=False):
+        if not isinstance(b, (str, bytes, tuple)):
+            b = tuple(b)
+
+        if compact:
+            b2j, bjunk, bpopular, fullbcount = CompactB2J.from_sequence(b, isjunk, autojunk)
+
+        else:
+            s = SequenceMatcher(isjunk, '', b, autojunk)
+            b2j = {elt: tuple(indices) for elt, indices in s.b2j.items()}
+            bjunk, bpopular = s.bjunk, s.bpopular
+            fullbcount = {}
+            for elt in b:
+                fullbcount[elt] = fullbcount.get(elt, 0) + 1
+
+        setattr_ = object.__setattr__
+        setattr_(self, 'b', b)
+        setattr_(self, 'autojunk', autojunk)
+        setattr_(self, 'b2j', b2j if compact else MappingProxyType(b2j))
+        setattr_(self, 'bjunk', frozenset(bjunk))
+        setattr_(self, 'bpopular', frozenset(bpopular))
+        setattr_(self, 'fullbcount', MappingProxyType(fullbcount))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('PreparedSequence is immutable')
+
+    __delattr__ = __setattr__
+
+    def __getstate__(self):
+        # Mapping proxies cannot be pickled; their dicts are sent instead.
+        return {name: dict(value) if isinstance(value, MappingProxyType) else value
+                for name, value in ((name, getattr(self, name)) for name in self.__slots__)}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            if isinstance(value, dict):
+                value = MappingProxyType(value)
+            object.__setattr__(self, name, value)
+
+    def __len__(self):
+        return len(self.b)
+
+    @property
+    def compact(self):
+        return isinstance(self.b2j, CompactB2J)
+
+    def matcher(self, a=''):
+        """Return a SequenceMatcher comparing a against the prepared b."""
+        return PreparedSequenceMatcher(self, a)
+
+    def memory_usage(self):
+        """Return the approximate size in bytes of each part of the index.
+
+        Elements of b are counted once, under 'b'; the other entries only
+        count the containers that reference them.
+        """
+        getsizeof = sys.getsizeof
+        usage = {
+            'b': getsizeof(self.b),
+            'b2j': (self.b2j.memory_usage() if self.compact else
+                    getsizeof(dict(self.b2j)) + sum(map(getsizeof, self.b2j.values()))),
+            'bjunk': getsizeof(self.bjunk),
+            'bpopular': getsizeof(self.bpopular),
+            'fullbcount': getsizeof(dict(self.fullbcount)),
+        }
+        if isinstance(self.b, tuple):
+            usage['b'] += sum(getsizeof(elt) for elt in self.fullbcount)
+        usage['total'] = sum(usage.values())
+        return usage
+
+class CompactSequenceMatcher(SequenceMatcher):
+    """SequenceMatcher that keeps its b2j index in CSR layout.
+
+    Results are the same as SequenceMatcher's; only the index differs.
+    """
+
+    def set_seq2(self, b):
+        if b is self.b:
+            return
+        self.b = b
+        self.matching_blocks = self.opcodes = None
+        self.b2j, self.bjunk, self.bpopular, self.fullbcount = \
+            CompactB2J.from_sequence(b, self.isjunk, self.autojunk)
+
+    def find_longest_match(self, alo=0, ahi=None, blo=0, bhi=None):
+        """Same as SequenceMatcher.find_longest_match(), walking the CSR
+        index: each element's positions are entered by bisection at blo
+        and left at bhi."""
+        a, b, b2j, isbjunk = self.a, self.b, self.b2j, self.bjunk.__contains__
+        if not isinstance(b2j, CompactB2J):
+            return super().find_longest_match(alo, ahi, blo, bhi)
+        if ahi is None:
+            ahi = len(a)
+        if bhi is None:
+            bhi = len(b)
+        slots, offsets, positions = b2j.slots, b2j.offsets, b2j.positions
+        walk = memoryview(positions)
+        besti, bestj, bestsize = alo, blo, 0
+        j2len = {}
+        for i in range(alo, ahi):
+            k = slots.get(a[i])
+            if k is None:
+                j2len = {}
+                continue
+            start = bisect_left(positions, blo, offsets[k], offsets[k + 1])
+            j2lenget = j2len.get
+            newj2len = {}
+            for j in walk[start:offsets[k + 1]]:
+                if j >= bhi:
+                    break
+                k2 = newj2len[j] = j2lenget(j-1, 0) + 1
+                if k2 > bestsize:
+                    besti, bestj, bestsize = i-k2+1, j-k2+1, k2
+            j2len = newj2len
+
+        while besti > alo and bestj > blo and \
+              not isbjunk(b[bestj-1]) and \
+              a[besti-1] == b[bestj-1]:
+            besti, bestj, bestsize = besti-1, bestj-1, bestsize+1
+        while besti+bestsize < ahi and bestj+bestsize < bhi and \
+              not isbjunk(b[bestj+bestsize]) and \
+              a[besti+bestsize] == b[bestj+bestsize]:
+            bestsize += 1
+
+        while besti > alo and bestj > blo and \
+              isbjunk(b[bestj-1]) and \
+              a[besti-1] == b[bestj-1]:
+            besti, bestj, bestsize = besti-1, bestj-1, bestsize+1
+        while besti+bestsize < ahi and bestj+bestsize < bhi and \
+              isbjunk(b[bestj+bestsize]) and \
+              a[besti+bestsize] == b[bestj+bestsize]:
+            bestsize = bestsize + 1
+
+        return Match(besti, bestj, bestsize)
+
+class PreparedSequenceMatcher(CompactSequenceMatcher):
+    """SequenceMatcher whose second sequence is a PreparedSequence.
+
+    Any number of these can share one PreparedSequence; set_seq1() works as
+    usual, set_seq2() is not supported. Compact prepared sequences are walked
+    as in CompactSequenceMatcher.
+    """
+
+    def __init__(self, prepared, a=''):
+        self.isjunk = None
+        self.autojunk = prepared.autojunk
+        self.prepared = prepared
+        self.b = prepared.b
+        self.b2j = prepared.b2j
+        self.bjunk = prepared.bjunk
+        self.bpopular = prepared.bpopular
+        self.fullbcount = prepared.fullbcount
+        self.a = None
+        self.set_seq1(a)
+
+    def set_seq2(self, b):
+        if b is not self.b:
+            raise TypeError('the second sequence of a PreparedSequenceMatcher '
+                            'is fixed; make a new PreparedSequence instead')
+
+#
+# Benchmark: memory of the b2j index for a long token sequence, dict of lists against CSR layout.
+#
+
+def benchmark(size=2000000, vocabulary=50000, seed=0):
+    import random, time, tracemalloc
+
+    rng = random.Random(seed)
+    b = [rng.randrange(vocabulary) for _ in range(size)]
+    a = b[size // 2:size // 2 + 2000]
+    a[1000] = -1
+
+    for name, cls in (('dict of lists', SequenceMatcher), ('CSR', CompactSequenceMatcher)):
+        start = time.perf_counter()
+        s = cls(None, a, b, autojunk=False)
+        built = time.perf_counter() - start
+        start = time.perf_counter()
+        blocks = s.get_matching_blocks()
+        matched = time.perf_counter() - start
+        del s
+
+        tracemalloc.start()
+        s = cls(None, a, b, autojunk=False)
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del s
+        print('%-13s index %6.1f MB, built in %.2fs, matched in %.2fs, %s'
+              % (name, size / 1e6, built, matched, blocks[:2]))
+
+if __name__ == '__main__':
+    import pickle
+
+    reference = PreparedSequence("private volatile Thread currentThread;", lambda x: x == " ")
+
+    for candidate in ["private Thread currentThread;",
+                      "public volatile Thread thread;",
+                      "volatile int counter;"]:
+        s = reference.matcher(candidate)
+        print(round(s.ratio(), 3), s.get_opcodes() == SequenceMatcher(lambda x: x == " ", candidate,
+              "private volatile Thread currentThread;").get_opcodes())
+
+    # OUTPUT:
+    #
+    # 0.866 True
+    # 0.765 True
+    # 0.441 True
+    #
+
+    copy = pickle.loads(pickle.dumps(reference))
+    print(copy.matcher("private Thread currentThread;").get_matching_blocks())
+
+    # OUTPUT: '[Match(a=0, b=0, size=8), Match(a=8, b=17, size=21), Match(a=29, b=38, size=0)]'
+
+    print(reference.memory_usage())
+
+    # OUTPUT: '{'b': 87, 'b2j': 1384, 'bjunk': 216, 'bpopular': 216, 'fullbcount': 464, 'total': 2367}'
+
+    benchmark()
+
+    #
+    # OUTPUT:
+    #
+    # dict of lists index   79.4 MB, built in 1.17s, matched in 0.04s, [Match(a=0, b=1000000, size=1000), Match(a=1001, b=1001001, size=999)]
+    # CSR           index   23.1 MB, built in 2.00s, matched in 0.03s, [Match(a=0, b=1000000, size=1000), Match(a=1001, b=1001001, size=999)]
+    #
@@ -0,0 +1,238 @@
+# Python Difflib Pattern Matching
+# difflib - Helpers for computing deltas
+# This module provides classes and functions for comparing sequences.
+# It can be used for example, for comparing files, and can produce difference information in various formats, including HTML and context and unified diffs.
+#
+
+#
+# ratio( ):
+# Return a measure of the sequences' similarity as a float in the range [0, 1].
+# Where T is the total number of elements in both sequences, and M is the number of matches, this is 2.0*M / T.
+#
+# quick_ratio( ):
+# Return an upper bound on ratio() relatively quickly.
+#
+# real_quick_ratio( ):
+# Return an upper bound on ratio() very quickly.
+#
+
+#
+# All-pairs similarity of many short strings.
+#
+
+#
+# similarity_matrix(strings, kind, threshold) scores every pair of strings and returns only the pairs scoring at least threshold, as a sparse
+# {(i, j): score} dict with i < j:
+#
+# * real_quick_ratio() only depends on the two lengths. The strings are sorted by length, so for each string the partners that can reach the
+#   threshold form one contiguous run of the sorted order.
+# * quick_ratio() is 2 * sum(min(count_i[c], count_j[c])) / (len_i + len_j) over the characters c, computed with NumPy for a block of rows at a time.
+#   min(x, y) is the number of levels t >= 1 with x >= t and y >= t, so with one 0/1 column per (character, level) the sums for a whole block are a
+#   single matrix product. Levels above a cap (only reached by characters repeated many times) are summed with np.minimum instead, a chunk at a
+#   time. The blocks and chunks are sized so that their temporaries stay within about budget bytes.
+# * Only the pairs whose quick_ratio() reaches the threshold get a full SequenceMatcher(None, strings[i], strings[j]).ratio().
+#
+# kind='real_quick' and kind='quick' return those bounds themselves; kind='full' returns ratio(). The scores are bit-for-bit the ones SequenceMatcher
+# computes. Without NumPy the same bounds are computed pair by pair in pure Python.
+#
+
+from collections import Counter
+from difflib import SequenceMatcher
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+KINDS = ('real_quick', 'quick', 'full')
+
+def _ratio(matches, length):
+    if length:
+        return 2.0 * matches / length
+    return 1.0
+
+def _length_runs(lengths, threshold):
+    """For strings sorted by length, yield (i, stop): the partners j of i with
+    i < j < stop are exactly those whose real_quick_ratio() reaches threshold."""
+    stop = 0
+    n = len(lengths)
+    for i, li in enumerate(lengths):
+        stop = max(stop, i + 1)
+        while stop < n and _ratio(li, li + lengths[stop]) >= threshold:
+            stop += 1
+        yield i, stop
+
+def _candidates_python(strings, order, lengths, kind, threshold):
+    counts = [Counter(strings[k]) for k in order]
+    for i, stop in _length_runs(lengths, threshold):
+        ci, li = counts[i], lengths[i]
+        for j in range(i + 1, stop):
+            total = li + lengths[j]
+            if kind == 'real_quick':
+                yield i, j, _ratio(li, total)
+                continue
+            matches = sum((ci & counts[j]).values())
+            score = _ratio(matches, total)
+            if score >= threshold:
+                yield i, j, score
+
+def _levels(hist, budget):
+    """Split character counts for _candidates_numpy(): return a float32
+    matrix with a 0/1 column [count >= t] for every character and level t up
+    to a cap, and the counts above the cap (of the characters reaching it)."""
+    top = hist.max(axis=0, initial=0)
+    cap = 1
+    while cap < top.max() and 4 * len(hist) * np.minimum(top, cap + 1).sum() <= budget:
+        cap += 1
+    levels = np.concatenate([hist[:, top >= t] >= t for t in range(1, cap + 1)], axis=1)
+    over = top > cap
+    # float32 products are exact integer sums as long as no string has 2**24 characters.
+    exact = np.float32 if len(hist) == 0 or hist.sum(axis=1).max() < 1 << 24 else np.float64
+    return levels.astype(exact), np.maximum(hist[:, over] - cap, 0)
+
+def _add_min_sums(out, x, y, budget):
+    """Add sum(min(x[r], y[c])) to out[r, c], a chunk of columns and of
+    characters at a time."""
+    rows, width = out.shape
+    step = max(1, min(x.shape[1], budget // (4 * rows)))
+    cols = max(1, budget // (4 * rows * step))
+    for c in range(0, width, cols):
+        for k in range(0, x.shape[1], step):
+            out[:, c:c + cols] += np.minimum(x[:, None, k:k + step],
+                                             y[None, c:c + cols, k:k + step]).sum(axis=2)
+
+def _candidates_numpy(strings, order, lengths, kind, threshold, block, budget):
+    alphabet = {}
+    for s in strings:
+        for c in s:
+            alphabet.setdefault(c, len(alphabet))
+    hist = np.zeros((len(order), max(len(alphabet), 1)), dtype=np.int32)
+    for row, k in enumerate(order):
+        for c, count in Counter(strings[k]).items():
+            hist[row, alphabet[c]] = count
+    sizes = np.asarray(lengths, dtype=np.float64)
+    if kind != 'real_quick':
+        levels, over = _levels(hist, budget)
+        del hist
+
+    runs = list(_length_runs(lengths, threshold))
+    if block is None:
+        # About five float64 temporaries of (rows, run width) per block.
+        widest = max((stop - i for i, stop in runs), default=1)
+        block = max(1, budget // (40 * widest))
+    for first in range(0, len(runs), block):
+        rows = runs[first:first + block]
+        lo = rows[0][0] + 1
+        hi = max(stop for _, stop in rows)
+        if hi <= lo:
+            continue
+        totals = sizes[first:first + len(rows), None] + sizes[None, lo:hi]
+        if kind == 'real_quick':
+            matches = np.minimum(sizes[first:first + len(rows), None], sizes[None, lo:hi])
+        else:
+            matches = (levels[first:first + len(rows)] @ levels[lo:hi].T).astype(np.float64)
+            if over.shape[1]:
+                _add_min_sums(matches, over[first:first + len(rows)], over[lo:hi], budget)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scores = np.where(totals > 0, 2.0 * matches / totals, 1.0)
+        for r, (i, stop) in enumerate(rows):
+            # Columns of row i that are past i and inside its length run.
+            cols = np.nonzero(scores[r, i + 1 - lo:stop - lo] >= threshold)[0]
+            for c in cols.tolist():
+                yield i, i + 1 + c, float(scores[r, i + 1 - lo + c])
+
+def similarity_matrix(strings, kind='quick', threshold=0.6, block=None, budget=32*1024*1024):
+    """Return {(i, j): score} for all pairs i < j of strings whose score of
+    the given kind ('real_quick', 'quick' or 'full') is at least threshold.
+
+    For kind='full' the score is SequenceMatcher(None, strings[i],
+    strings[j]).ratio(). With NumPy, block rows are scored at a time
+    (by default as many as fit in budget bytes of temporaries).
+    """
+    if kind not in KINDS:
+        raise ValueError('kind must be one of %s: %r' % (', '.join(KINDS), kind))
+    if not 0.0 <= threshold <= 1.0:
+        raise ValueError("threshold must be in [0.0, 1.0]: %r" % (threshold,))
+
+    strings = list(strings)
+    order = sorted(range(len(strings)), key=lambda k: len(strings[k]))
+    lengths = [len(strings[k]) for k in order]
+    bound_kind = 'real_quick' if kind == 'real_quick' else 'quick'
+    if np is not None:
+        candidates = _candidates_numpy(strings, order, lengths, bound_kind, threshold, block,
+                                       budget)
+    else:
+        candidates = _candidates_python(strings, order, lengths, bound_kind, threshold)
+
+    result = {}
+    s = SequenceMatcher()
+    for i, j, score in candidates:
+        i, j = order[i], order[j]
+        if i > j:
+            i, j = j, i
+        if kind == 'full':
+            s.set_seqs(strings[i], strings[j])
+            score = s.ratio()
+            if score < threshold:
+                continue
+        result[i, j] = score
+    return result
+
+#
+# Benchmark against one SequenceMatcher call per pair, as done by the clustering job.
+#
+
+def _naive(strings, threshold):
+    result = {}
+    s = SequenceMatcher()
+    for j, y in enumerate(strings):
+        s.set_seq2(y)
+        for i in range(j):
+            s.set_seq1(strings[i])
+            if s.real_quick_ratio() >= threshold and s.quick_ratio() >= threshold \
+               and s.ratio() >= threshold:
+                result[i, j] = s.ratio()
+    return result
+
+def benchmark(size=3000, threshold=0.8, seed=0):
+    import random, string, time
+
+    rng = random.Random(seed)
+    stems = [''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randrange(6, 20)))
+             for _ in range(size // 10)]
+    strings = []
+    for _ in range(size):
+        word = list(rng.choice(stems))
+        word[rng.randrange(len(word))] = rng.choice(string.ascii_lowercase)
+        strings.append(''.join(word))
+
+    start = time.perf_counter()
+    fast = similarity_matrix(strings, 'full', threshold)
+    fast_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    slow = _naive(strings, threshold)
+    slow_time = time.perf_counter() - start
+
+    assert fast == slow
+    print('%d strings, %d pairs >= %s: similarity_matrix %.2fs, per-pair loop %.2fs'
+          % (size, len(fast), threshold, fast_time, slow_time))
+
+if __name__ == '__main__':
+    words = ['apple', 'appel', 'ape', 'peach', 'puppy', 'apply']
+
+    print(similarity_matrix(words, 'real_quick', 0.8))
+
+    # OUTPUT: '{(0, 1): 1.0, (0, 3): 1.0, (0, 4): 1.0, (0, 5): 1.0, (1, 3): 1.0, (1, 4): 1.0, (1, 5): 1.0, (3, 4): 1.0, (3, 5): 1.0, (4, 5): 1.0}'
+
+    print(similarity_matrix(words, 'quick', 0.6))
+
+    # OUTPUT: '{(0, 2): 0.75, (1, 2): 0.75, (2, 3): 0.75, (0, 1): 1.0, (0, 3): 0.6, (0, 5): 0.8, (1, 3): 0.6, (1, 5): 0.8, (4, 5): 0.6}'
+
+    print(similarity_matrix(words, 'full', 0.6))
+
+    # OUTPUT: '{(0, 2): 0.75, (1, 2): 0.75, (0, 1): 0.8, (0, 5): 0.8, (1, 5): 0.8, (4, 5): 0.6}'
+
+    benchmark()
+
+    # OUTPUT: '3000 strings, 11325 pairs >= 0.8: similarity_matrix 0.41s, per-pair loop 9.40s'
@@ -0,0 +1,148 @@
+# Python filecmp
+# filecmp - File and Directory Comparisons.
+# The filecmp module defines functions to compare files and directories, with various optional time/correctness trade-offs.
+#
+# filecmp.cmp(f1, f2, shallow=True)
+# Compare the files named f1 and f2, returning True if they seem equal, False otherwise.
+# If shallow is true, files with identical os.stat() signatures are taken to be equal. Otherwise, the contents of the files are compared.
+#
+
+#
+# A persistent content digest cache for repeated directory comparisons.
+#
+
+#
+# Comparing dir1 against dir2 every few minutes re-reads every file whose contents have to be compared. DigestCache keeps a SQLite table of file
+# digests keyed by (device, inode, size, mtime_ns): as long as a file's stat result is unchanged its digest is served from the table, so a steady
+# state comparison only costs stat calls.
+#
+# * The table holds at most max_entries rows; the least recently used ones are evicted first.
+# * hits, misses and evictions are counted, and stats() returns them.
+# * One cache can be shared by the comparer threads of compare_trees() (see Python_Filecmp_Parallel_Tree_Compare.py).
+#
+
+import hashlib
+import os
+import sqlite3
+import threading
+
+BUFSIZE = 1024*1024
+
+def file_digest(path):
+    """Return the BLAKE2b digest of a file's contents."""
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(BUFSIZE)
+            if not chunk:
+                return h.digest()
+            h.update(chunk)
+
+class DigestCache:
+    """On-disk LRU cache of file digests keyed by (device, inode, size,
+    mtime_ns)."""
+
+    def __init__(self, path, max_entries=1000000):
+        self.max_entries = max_entries
+        self.hits = self.misses = self.evictions = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript('''
+            CREATE TABLE IF NOT EXISTS digests (
+                dev INTEGER, ino INTEGER, size INTEGER, mtime_ns INTEGER,
+                digest BLOB, used INTEGER,
+                PRIMARY KEY (dev, ino));
+            CREATE INDEX IF NOT EXISTS digests_used ON digests (used);
+        ''')
+        self._count, self._tick = self._db.execute(
+            'SELECT COUNT(*), COALESCE(MAX(used), 0) FROM digests').fetchone()
+        if self._count > max_entries:
+            self._evict(self._count - max_entries)
+
+    def digest(self, path, st=None):
+        """Return the digest of path, reading the file only on a miss.
+
+        st is the file's os.stat() result, if the caller already has it.
+        """
+        if st is None:
+            st = os.stat(path)
+        key = (st.st_dev, st.st_ino)
+        with self._lock:
+            self._tick += 1
+            row = self._db.execute(
+                'SELECT size, mtime_ns, digest FROM digests WHERE dev = ? AND ino = ?',
+                key).fetchone()
+            if row is not None and row[:2] == (st.st_size, st.st_mtime_ns):
+                self.hits += 1
+                self._db.execute('UPDATE digests SET used = ? WHERE dev = ? AND ino = ?',
+                                 (self._tick,) + key)
+                return row[2]
+            self.misses += 1
+
+        digest = file_digest(path)
+
+        with self._lock:
+            self._tick += 1
+            if self._db.execute('SELECT 1 FROM digests WHERE dev = ? AND ino = ?',
+                                key).fetchone() is None:
+                self._count += 1
+            self._db.execute('INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?, ?, ?)',
+                             key + (st.st_size, st.st_mtime_ns, digest, self._tick))
+            if self._count > self.max_entries:
+                self._evict(self._count - self.max_entries)
+        return digest
+
+    def _evict(self, n):
+        self._db.execute('DELETE FROM digests WHERE rowid IN '
+                         '(SELECT rowid FROM digests ORDER BY used LIMIT ?)', (n,))
+        self._count -= n
+        self.evictions += n
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'entries': self._count}
+
+    def close(self):
+        with self._lock:
+            self._db.commit()
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+#
+# Example: compare dir1 and dir2 through the cache, and print the cache statistics with --stats.
+#
+
+if __name__ == '__main__':
+    import argparse
+    from Python_Filecmp_Parallel_Tree_Compare import compare_trees
+
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('--cache', default='.filecmp-cache.sqlite',
+                        help='Digest cache file (default .filecmp-cache.sqlite)')
+
+    parser.add_argument('--max-entries', type=int, default=1000000,
+                        help='Maximum number of cached digests (default 1000000)')
+
+    parser.add_argument('--stats', action='store_true', default=False,
+                        help='Print cache hit/miss counts when done')
+
+    parser.add_argument('left', nargs='?', default='dir1')
+
+    parser.add_argument('right', nargs='?', default='dir2')
+
+    options = parser.parse_args()
+
+    with DigestCache(options.cache, options.max_entries) as cache:
+        for relpath, status in compare_trees(options.left, options.right, shallow=False, cache=cache):
+            if status != 'same':
+                print(status, relpath)
+
+        if options.stats:
+            print('cache: %(hits)d hits, %(misses)d misses, %(evictions)d evictions, %(entries)d entries'
+                  % cache.stats())
@@ -0,0 +1,173 @@
+# Python filecmp
+# filecmp - File and Directory Comparisons.
+# The filecmp module defines functions to compare files and directories, with various optional time/correctness trade-offs.
+#
+# class filecmp.dircmp(a, b, ignore=None, hide=None)
+# Construct a new directory comparison object, to compare the directories a and b. ignore is a list of names to ignore, and defaults to
+# filecmp.DEFAULT_IGNORES. hide is a list of names to hide, and defaults to [os.curdir, os.pardir].
+#
+
+#
+# Comparing two directory trees in parallel.
+#
+
+#
+# dircmp walks the subdirs recursively in one thread and compares the common files one after another. compare_trees() does the same job with two
+# thread pools, one listing directories with os.scandir() and one comparing file contents, and streams the results back as (relpath, status) events
+# instead of nested dircmp objects. The statuses are the dircmp categories:
+#
+# * 'left_only', 'right_only': the name only exists on one side (a directory is reported once, not descended into).
+# * 'same', 'diff':            a common file compares equal or different, as filecmp.cmp() would decide it (shallow by default).
+# * 'funny':                   the name exists on both sides but is a file on one side and a directory on the other, is not a regular file, or could
+#                              not be read (dircmp's common_funny and funny_files). A common subdirectory that cannot be listed is reported as
+#                              'funny' too.
+#
+# Events arrive in completion order, not in tree order.
+#
+
+import filecmp
+import os
+import stat
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+BUFSIZE = 8*1024
+
+def _scan(top, relpath, ignore):
+    """Return {name: (kind, stat result or None)} for a directory."""
+    entries = {}
+    with os.scandir(os.path.join(top, relpath)) as it:
+        for entry in it:
+            if entry.name in ignore:
+                continue
+            try:
+                if entry.is_dir():
+                    entries[entry.name] = ('dir', None)
+                elif entry.is_file():
+                    entries[entry.name] = ('file', entry.stat())
+                else:
+                    entries[entry.name] = ('other', None)
+            except OSError:
+                entries[entry.name] = ('other', None)
+    return entries
+
+def _list_pair(left, right, relpath, ignore):
+    try:
+        return relpath, _scan(left, relpath, ignore), _scan(right, relpath, ignore)
+    except OSError:
+        if not relpath:
+            raise
+        return relpath, None, None
+
+def _same_contents(path1, path2):
+    with open(path1, 'rb') as fp1, open(path2, 'rb') as fp2:
+        while True:
+            b1 = fp1.read(BUFSIZE)
+            b2 = fp2.read(BUFSIZE)
+            if b1 != b2:
+                return False
+            if not b1:
+                return True
+
+def _sig(st):
+    return (stat.S_IFMT(st.st_mode),
+            st.st_size,
+            st.st_mtime)
+
+def _compare_file(left, right, relpath, st1, st2, shallow, cache, comparator):
+    """Decide 'same', 'diff' or 'funny' like filecmp.cmp(), from the stat
+    results already collected by the directory scan."""
+    sig1, sig2 = _sig(st1), _sig(st2)
+    if sig1[0] != stat.S_IFREG or sig2[0] != stat.S_IFREG:
+        return relpath, 'diff'
+    if shallow and sig1 == sig2:
+        return relpath, 'same'
+    if sig1[1] != sig2[1]:
+        return relpath, 'diff'
+    path1, path2 = os.path.join(left, relpath), os.path.join(right, relpath)
+    try:
+        if cache is not None:
+            same = cache.digest(path1, st1) == cache.digest(path2, st2)
+        else:
+            same = comparator(path1, path2)
+    except OSError:
+        return relpath, 'funny'
+    return relpath, 'same' if same else 'diff'
+
+def compare_trees(left, right, shallow=True, ignore=None, hide=None,
+                  walkers=8, comparers=8, cache=None, comparator=None):
+    """Compare the trees left and right, yielding (relpath, status) events.
+
+    ignore and hide work as for filecmp.dircmp. walkers threads list
+    directories, comparers threads compare common files. If cache is a
+    DigestCache (see Python_Filecmp_Digest_Cache.py), files of equal size
+    are compared by their cached digests instead of byte by byte.
+    comparator(path1, path2) decides the remaining content comparisons, for
+    example a TieredComparator (see Python_Filecmp_Tiered_Compare.py).
+    """
+    if comparator is None:
+        comparator = _same_contents
+    skip = set(filecmp.DEFAULT_IGNORES if ignore is None else ignore)
+    skip.update([os.curdir, os.pardir] if hide is None else hide)
+
+    with ThreadPoolExecutor(walkers) as walk_pool, \
+         ThreadPoolExecutor(comparers) as compare_pool:
+        running = {walk_pool.submit(_list_pair, left, right, '', skip)}
+        backlog = deque()
+        limit = 4 * comparers
+        comparing = 0
+
+        while running or backlog:
+            while backlog and comparing < limit:
+                running.add(compare_pool.submit(_compare_file, *backlog.popleft()))
+                comparing += 1
+
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if len(result) == 2:
+                    comparing -= 1
+                    yield result
+                    continue
+
+                relpath, lentries, rentries = result
+                if lentries is None:
+                    yield relpath, 'funny'
+                    continue
+                for name in sorted(lentries.keys() | rentries.keys()):
+                    path = os.path.join(relpath, name)
+                    if name not in rentries:
+                        yield path, 'left_only'
+                        continue
+                    if name not in lentries:
+                        yield path, 'right_only'
+                        continue
+                    (lkind, lst), (rkind, rst) = lentries[name], rentries[name]
+                    if lkind != rkind or lkind == 'other':
+                        yield path, 'funny'
+                    elif lkind == 'dir':
+                        running.add(walk_pool.submit(_list_pair, left, right, path, skip))
+                    else:
+                        backlog.append((left, right, path, lst, rst, shallow, cache,
+                                        comparator))
+
+def diff_report(left, right, **options):
+    """Collect compare_trees() events into dircmp-style category lists."""
+    report = {'same': [], 'diff': [], 'left_only': [], 'right_only': [], 'funny': []}
+    for relpath, status in compare_trees(left, right, **options):
+        report[status].append(relpath)
+    for paths in report.values():
+        paths.sort()
+    return report
+
+#
+# This prints the same lines as print_diff_files() in Python_Filecmp_Recursive_Search.py, as soon as each difference is found:
+#
+
+if __name__ == '__main__':
+    for relpath, status in compare_trees('dir1', 'dir2'):
+        if status == 'diff':
+            subdir, name = os.path.split(relpath)
+            print("diff_file %s found in %s and %s" % (name,
+                  os.path.normpath(os.path.join('dir1', subdir)),
+                  os.path.normpath(os.path.join('dir2', subdir))))
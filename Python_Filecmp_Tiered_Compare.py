@@ -0,0 +1,139 @@
+# Python filecmp
+# filecmp - File and Directory Comparisons.
+# The filecmp module defines functions to compare files and directories, with various optional time/correctness trade-offs.
+#
+# filecmp.cmp(f1, f2, shallow=True)
+# Compare the files named f1 and f2, returning True if they seem equal, False otherwise.
+# If shallow is true, files with identical os.stat() signatures are taken to be equal. Otherwise, the contents of the files are compared.
+#
+
+#
+# Tiered, early-exit file content comparison.
+#
+
+#
+# TieredComparator decides whether two files have the same contents with the cheapest test that settles it:
+#
+# * size:    files of different sizes differ, empty files of equal size are the same.
+# * head:    the first block of each file is compared.
+# * tail:    the last block of each file is compared; files no longer than the two blocks are settled here.
+# * stream:  the rest is compared chunk by chunk with readinto() into two large buffers that each thread reuses from file to file, stopping at the
+#            first differing chunk.
+# * mmap:    files of at least mmap_threshold bytes are mapped and compared slice by slice instead of being read.
+#
+# The head and tail blocks are compared directly rather than hashed: with both files at hand that is cheaper than hashing them.
+# stats() tells for each tier how many comparisons it settled, as "same" or "diff".
+#
+
+import mmap
+import os
+import threading
+from collections import Counter
+
+class TieredComparator:
+    """Callable comparing two files' contents; see the tiers above."""
+
+    def __init__(self, block_size=64*1024, buffer_size=1024*1024,
+                 mmap_threshold=256*1024*1024):
+        self.block_size = block_size
+        self.buffer_size = buffer_size
+        self.mmap_threshold = mmap_threshold
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _buffers(self):
+        buffers = getattr(self._local, 'buffers', None)
+        if buffers is None:
+            size = max(self.block_size, self.buffer_size)
+            buf1, buf2 = bytearray(size), bytearray(size)
+            buffers = self._local.buffers = (buf1, buf2, memoryview(buf1), memoryview(buf2))
+        return buffers
+
+    def _decided(self, tier, same):
+        with self._lock:
+            self._counts[tier, 'same' if same else 'diff'] += 1
+        return same
+
+    def stats(self):
+        """Return {(tier, 'same' or 'diff'): count}."""
+        with self._lock:
+            return dict(self._counts)
+
+    def __call__(self, path1, path2):
+        return self.compare(path1, path2)
+
+    def compare(self, path1, path2):
+        with open(path1, 'rb', buffering=0) as f1, open(path2, 'rb', buffering=0) as f2:
+            size = os.fstat(f1.fileno()).st_size
+            if size != os.fstat(f2.fileno()).st_size:
+                return self._decided('size', False)
+            if not size:
+                return self._decided('size', True)
+
+            buffers = self._buffers()
+            block = min(self.block_size, size)
+            if not self._read_equal(f1, f2, buffers, block):
+                return self._decided('head', False)
+            if size <= block:
+                return self._decided('head', True)
+
+            tail = max(size - block, block)
+            f1.seek(tail)
+            f2.seek(tail)
+            n = size - tail
+            if not self._read_equal(f1, f2, buffers, n):
+                return self._decided('tail', False)
+            if tail == block:
+                return self._decided('tail', True)
+
+            if size >= self.mmap_threshold:
+                return self._decided('mmap', self._mmap_equal(f1, f2, block, tail))
+
+            f1.seek(block)
+            f2.seek(block)
+            pos = block
+            while pos < tail:
+                n = min(self.buffer_size, tail - pos)
+                if not self._read_equal(f1, f2, buffers, n):
+                    return self._decided('stream', False)
+                pos += n
+            return self._decided('stream', True)
+
+    @staticmethod
+    def _read_equal(f1, f2, buffers, n):
+        """Read the next n bytes of each file into the buffers and compare."""
+        buf1, buf2, view1, view2 = buffers
+        for f, view in ((f1, view1), (f2, view2)):
+            got = 0
+            while got < n:
+                read = f.readinto(view[got:n])
+                if not read:
+                    return False
+                got += read
+        if n == len(buf1):
+            return buf1 == buf2
+        # startswith() compares against the view in place; slicing both buffers would copy them.
+        return buf1.startswith(view2[:n])
+
+    def _mmap_equal(self, f1, f2, start, stop):
+        with mmap.mmap(f1.fileno(), 0, access=mmap.ACCESS_READ) as m1, \
+             mmap.mmap(f2.fileno(), 0, access=mmap.ACCESS_READ) as m2:
+            step = self.buffer_size
+            for pos in range(start, stop, step):
+                end = min(pos + step, stop)
+                if m1[pos:end] != m2[pos:end]:
+                    return False
+        return True
+
+if __name__ == '__main__':
+    from Python_Filecmp_Parallel_Tree_Compare import compare_trees
+
+    comparator = TieredComparator()
+
+    for relpath, status in compare_trees('dir1', 'dir2', shallow=False, comparator=comparator):
+        if status == 'diff':
+            print(relpath)
+
+    for (tier, result), count in sorted(comparator.stats().items()):
+        print('%-6s %-4s %d' % (tier, result, count))
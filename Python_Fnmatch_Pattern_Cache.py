@@ -0,0 +1,122 @@
+# Python Fnmatch
+# fnmatch - Unix filename pattern matching.
+# This module provides support for Unix shell-style wildcards, which are not the same as regular expressions.
+#
+
+#
+# fnmatch.translate(pattern).
+# Return the shell-style pattern converted to a regular expression for using with re.match().
+#
+
+#
+# A bounded, instrumented cache of compiled patterns.
+#
+
+#
+# fnmatch keeps its own compiled patterns in a functools.lru_cache of fixed size, and re keeps another cache of its own; with user supplied
+# patterns that keep changing both thrash and the translate() + re.compile() cost shows up on every request. PatternCache does the translation
+# and compilation itself:
+#
+# * It holds at most maxsize compiled patterns and evicts the least recently used one.
+# * With casefold=True patterns and names are lower-cased before use (as os.path.normcase() does on Windows), so patterns that differ only in case
+#   share one entry.
+# * hits, misses and evictions are counted; stats() returns them for metrics.
+# * warm() compiles the patterns listed in a file, one per line, so a service can start with a hot cache.
+#
+
+import fnmatch
+import re
+import threading
+from collections import OrderedDict
+
+class PatternCache:
+    """LRU cache of fnmatch patterns compiled to regular expressions."""
+
+    def __init__(self, maxsize=1024, casefold=False):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be > 0: %r" % (maxsize,))
+        self.maxsize = maxsize
+        self.casefold = casefold
+        self.hits = self.misses = self.evictions = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def compile(self, pattern):
+        """Return the compiled regular expression for pattern."""
+        if self.casefold:
+            pattern = pattern.lower()
+        with self._lock:
+            regex = self._cache.get(pattern)
+            if regex is not None:
+                self.hits += 1
+                self._cache.move_to_end(pattern)
+                return regex
+            self.misses += 1
+
+        if isinstance(pattern, bytes):
+            regex = re.compile(fnmatch.translate(str(pattern, 'ISO-8859-1')).encode('ISO-8859-1'))
+        else:
+            regex = re.compile(fnmatch.translate(pattern))
+
+        with self._lock:
+            self._cache[pattern] = regex
+            self._cache.move_to_end(pattern)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+                self.evictions += 1
+        return regex
+
+    def match(self, name, pattern):
+        """Like fnmatch.fnmatchcase(name, pattern), through the cache."""
+        if self.casefold:
+            name = name.lower()
+        return self.compile(pattern).match(name) is not None
+
+    def filter(self, names, pattern):
+        """Like fnmatch.filter(names, pattern), through the cache."""
+        match = self.compile(pattern).match
+        if self.casefold:
+            return [name for name in names if match(name.lower())]
+        return [name for name in names if match(name)]
+
+    def warm(self, path, encoding='utf-8'):
+        """Compile every pattern listed in a file and return how many were
+        read. Blank lines and lines starting with '#' are skipped."""
+        count = 0
+        with open(path, encoding=encoding) as f:
+            for line in f:
+                pattern = line.rstrip('\r\n')
+                if not pattern.strip() or pattern.lstrip().startswith('#'):
+                    continue
+                self.compile(pattern)
+                count += 1
+        return count
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'size': len(self._cache), 'maxsize': self.maxsize}
+
+if __name__ == '__main__':
+    cache = PatternCache(maxsize=2, casefold=True)
+
+    print(cache.match('foobar.txt', '*.txt'), cache.match('FOOBAR.TXT', '*.TXT'))
+
+    # OUTPUT: 'True True'
+
+    print(cache.filter(['1.gif', '2.txt', 'card.gif'], '*.gif'))
+
+    # OUTPUT: '['1.gif', 'card.gif']'
+
+    print(cache.stats())
+
+    # OUTPUT: '{'hits': 1, 'misses': 2, 'evictions': 0, 'size': 2, 'maxsize': 2}'
+
+    cache.compile('?.gif')
+    print(cache.stats())
+
+    # OUTPUT: '{'hits': 1, 'misses': 3, 'evictions': 1, 'size': 2, 'maxsize': 2}'
@@ -0,0 +1,189 @@
+# Python Fnmatch
+# fnmatch - Unix filename pattern matching.
+# This module provides support for Unix shell-style wildcards, which are not the same as regular expressions.
+#
+# The special characters used in shell-style wildcards are:
+# * - matches everything
+# ? - matches any single character
+# [seq] - matches any character in seq
+# [!seq] - matches any character not in seq
+#
+
+#
+# Matching many patterns at once.
+#
+
+#
+# Testing P patterns against N names with fnmatch.fnmatch() costs P * N regular expression calls. A PatternSet compiles all the patterns together:
+#
+# * Literal patterns (no wildcard at all) go into a set.
+# * Literal-suffix patterns such as '*.txt' go into one set per suffix length; a name is checked by slicing off its last few characters.
+# * Literal-prefix patterns such as 'build/*' go into a character trie that is walked along the name.
+# * Everything else is translated with fnmatch.translate() and merged into a single alternation regex with one named group per pattern, so one
+#   re.match() call finds the first matching pattern; the search resumes after it only when all matching patterns are wanted.
+#
+# Every pattern keeps exactly the meaning fnmatch.fnmatchcase() gives it ('*' also matches '/'). With normcase=True patterns and names go through
+# os.path.normcase() first, like fnmatch.fnmatch() does.
+#
+
+import fnmatch
+import os
+import re
+
+_MAGIC = re.compile('[*?[]')
+_GROUP = re.compile(r'\(\?P(<|=)([A-Za-z_]\w*)')
+
+def _rename_groups(regex, index):
+    """Give the named groups of a translated pattern (older Pythons use them
+    for '*') names that cannot clash with other patterns."""
+    return _GROUP.sub(lambda m: '(?P%sp%d_%s' % (m.group(1), index, m.group(2)), regex)
+
+class PatternSet:
+    """A set of shell-style patterns matched together.
+
+    >>> ps = PatternSet(['*.txt', 'build/*', 'README', '?.gif'])
+    >>> ps.match('build/notes.txt')
+    ['*.txt', 'build/*']
+    """
+
+    def __init__(self, patterns, normcase=False):
+        self.normcase = normcase
+        self.patterns = list(patterns)
+        self._literals = {}
+        self._suffixes = {}
+        self._trie = {}
+        self._regex_indices = []
+        self._regexes = {}
+
+        for index, pattern in enumerate(self.patterns):
+            if normcase:
+                pattern = os.path.normcase(pattern)
+            magic = [m.start() for m in _MAGIC.finditer(pattern)]
+            if not magic:
+                self._literals.setdefault(pattern, []).append(index)
+            elif magic == [0] and pattern[0] == '*':
+                suffix = pattern[1:]
+                self._suffixes.setdefault(len(suffix), {}).setdefault(suffix, []).append(index)
+            elif magic == [len(pattern) - 1] and pattern[-1] == '*':
+                node = self._trie
+                for c in pattern[:-1]:
+                    node = node.setdefault(c, {})
+                node.setdefault(None, []).append(index)
+            else:
+                self._regex_indices.append(index)
+
+        self._translated = [
+            _rename_groups(fnmatch.translate(os.path.normcase(self.patterns[i]) if normcase
+                                             else self.patterns[i]), i)
+            for i in self._regex_indices]
+        self._position = {index: k for k, index in enumerate(self._regex_indices)}
+
+    def _regex(self, start):
+        """Return the alternation of the regex patterns from position start on."""
+        regex = self._regexes.get(start)
+        if regex is None:
+            regex = self._regexes[start] = re.compile('|'.join(
+                '(?P<p%d>%s)' % (self._regex_indices[k], self._translated[k])
+                for k in range(start, len(self._translated))))
+        return regex
+
+    def _indices(self, name, first_only):
+        found = []
+        found.extend(self._literals.get(name, ()))
+        if found and first_only:
+            return found
+
+        for length, suffixes in self._suffixes.items():
+            if length <= len(name):
+                found.extend(suffixes.get(name[len(name) - length:], ()))
+        if found and first_only:
+            return found
+
+        node = self._trie
+        for c in name:
+            found.extend(node.get(None, ()))
+            node = node.get(c)
+            if node is None:
+                break
+        else:
+            found.extend(node.get(None, ()))
+        if found and first_only:
+            return found
+
+        start = 0
+        while start < len(self._regex_indices):
+            m = self._regex(start).match(name)
+            if m is None:
+                break
+            index = int(m.lastgroup[1:])
+            found.append(index)
+            if first_only:
+                break
+            start = self._position[index] + 1
+        return found
+
+    def match_indices(self, name):
+        """Return the indices of all patterns matching name, in order."""
+        if self.normcase:
+            name = os.path.normcase(name)
+        return sorted(self._indices(name, False))
+
+    def match(self, name):
+        """Return all patterns matching name, in the order they were given."""
+        return [self.patterns[i] for i in self.match_indices(name)]
+
+    def matches_any(self, name):
+        """Return True if any pattern matches name."""
+        if self.normcase:
+            name = os.path.normcase(name)
+        return bool(self._indices(name, True))
+
+    def filter(self, names):
+        """Return the names matching any pattern, like fnmatch.filter()."""
+        return [name for name in names if self.matches_any(name)]
+
+#
+# Benchmark: 200 patterns against a listing of generated paths, compared with calling fnmatch.fnmatchcase() for every pattern and path.
+#
+
+def benchmark(paths=20000, seed=0):
+    import random, time
+
+    rng = random.Random(seed)
+    words = ['src', 'build', 'docs', 'test', 'lib', 'cache', 'tmp', 'data', 'img', 'log']
+    exts = ['txt', 'py', 'c', 'h', 'o', 'so', 'gif', 'png', 'log', 'json', 'bak', 'tmp']
+    patterns = ['*.%s' % ext for ext in exts]
+    patterns += ['%s/*' % w for w in words]
+    patterns += ['%s/%s' % (rng.choice(words), rng.choice(words)) for _ in range(40)]
+    while len(patterns) < 200:
+        patterns.append('%s/*/%s?.%s' % (rng.choice(words), rng.choice(words)[:2], rng.choice(exts)))
+    listing = ['/'.join(rng.choice(words) for _ in range(rng.randrange(1, 5))) + '%d.%s'
+               % (rng.randrange(10), rng.choice(exts)) for _ in range(paths)]
+
+    start = time.perf_counter()
+    ps = PatternSet(patterns)
+    fast = [ps.match(path) for path in listing]
+    fast_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    slow = [[p for p in patterns if fnmatch.fnmatchcase(path, p)] for path in listing]
+    slow_time = time.perf_counter() - start
+
+    assert fast == slow
+    print('%d patterns x %d paths: PatternSet %.2fs, per-pattern loop %.2fs'
+          % (len(patterns), paths, fast_time, slow_time))
+
+if __name__ == '__main__':
+    ps = PatternSet(['*.txt', 'build/*', 'README', '?.gif', '*.t[a-z]t'])
+
+    print(ps.match('foobar.txt'))
+
+    # OUTPUT: '['*.txt', '*.t[a-z]t']'
+
+    print(ps.match('1.gif'), ps.matches_any('card.gif'))
+
+    # OUTPUT: '['?.gif'] False'
+
+    benchmark()
+
+    # OUTPUT: '200 patterns x 20000 paths: PatternSet 0.24s, per-pattern loop 1.55s'
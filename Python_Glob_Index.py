@@ -0,0 +1,412 @@
+# Python Glob
+# glob - Unix style pathname pattern expansion.
+# The glob module finds all the pathnames matching a specified pattern according to the rules used by the Unix shell, although results are returned in
+# arbitrary order.
+# No tilde expansion is done, but *, ?, and character ranges expressed with [] will be correctly matched.
+# This is done by using the os.scandir() and fnmatch.fnmatch() functions in concert, and not by actually invoking a subshell.
+#
+# Note that unlike fnmatch.fnmatch(), glob treats filenames beginning with a dot (.) as special cases.
+#
+
+#
+# An in-memory glob index with incremental refresh.
+#
+
+#
+# Evaluating glob.glob('**/*.txt', recursive=True) thousands of times an hour over a tree that rarely changes walks the same directories every time.
+# GlobIndex lists the tree once and keeps, for every directory, its entries and its modification time:
+#
+# * glob() evaluates a pattern against the index instead of the file system, and remembers the result until the index changes, so repeating a
+#   query is a dictionary lookup.
+# * refresh() stats every indexed directory and lists again only those whose st_mtime_ns changed (adding or removing a name changes the mtime of
+#   its directory, changing a file's contents does not), indexing new subdirectories and dropping removed ones.
+# * With watch=True on Linux, an inotify watch is kept on every directory; refresh() then reads the pending events instead of statting the tree,
+#   and glob() refreshes before each query, since that costs a single read() when nothing changed. Where inotify is not available (or runs out of
+#   watches) the index falls back to mtime polling; watching tells which is in use.
+# * With max_age=seconds and no watch, glob() refreshes first when the last refresh is older than that.
+#
+# Patterns are taken relative to the index root, as glob.glob() does with root_dir. Symbolic links to directories are indexed as directories but not
+# followed, so that a link loop cannot make the index infinite.
+#
+
+import ctypes
+import ctypes.util
+import os
+import struct
+import time
+
+from Python_Glob_Scandir_Iterator import _Glob, has_magic, _SEPS_TUPLE
+
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+_WATCH_MASK = (IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+               | IN_ONLYDIR)
+_EVENT = struct.Struct('iIII')
+
+class _Inotify:
+    """Minimal inotify binding through ctypes; raises OSError where inotify
+    is not available."""
+
+    def __init__(self):
+        if not hasattr(os, 'O_CLOEXEC'):
+            raise OSError('inotify is not available on this platform')
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError('inotify is not available on this platform')
+        self._libc = libc
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+
+    def add_watch(self, path):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+        return wd
+
+    def read(self):
+        """Return the pending events as (wd, mask) pairs."""
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return events
+            pos = 0
+            while pos < len(data):
+                wd, mask, cookie, length = _EVENT.unpack_from(data, pos)
+                events.append((wd, mask))
+                pos += _EVENT.size + length
+
+    def close(self):
+        os.close(self.fd)
+
+class GlobIndex:
+    """In-memory index of the directory tree below root, answering glob
+    queries without touching the file system."""
+
+    def __init__(self, root=os.curdir, watch=False, max_age=None):
+        self.root = root
+        self.max_age = max_age
+        self.refreshed = time.monotonic()
+        self._dirs = {}
+        self._results = {}
+        self._inotify = None
+        self._watches = {}
+        if watch:
+            try:
+                self._inotify = _Inotify()
+            except OSError:
+                pass
+        self._index('')
+
+    @property
+    def watching(self):
+        return self._inotify is not None
+
+    def _index(self, rel):
+        """List rel and every directory below it into the index."""
+        stack = [rel]
+        while stack:
+            rel = stack.pop()
+            path = os.path.join(self.root, rel)
+            try:
+                mtime = os.stat(path).st_mtime_ns
+                if self._inotify is not None:
+                    self._watch(rel, path)
+                entries = {}
+                with os.scandir(path) as it:
+                    for entry in it:
+                        try:
+                            entries[entry.name] = entry.is_dir()
+                            if entries[entry.name] and not entry.is_symlink():
+                                stack.append(os.path.join(rel, entry.name))
+                        except OSError:
+                            entries[entry.name] = False
+            except OSError:
+                continue
+            self._dirs[rel] = (mtime, entries)
+
+    def _watch(self, rel, path):
+        try:
+            self._watches[self._inotify.add_watch(path)] = rel
+        except OSError:
+            self._inotify.close()
+            self._inotify = None
+            self._watches.clear()
+
+    def _drop(self, rel):
+        """Remove rel and every directory below it from the index."""
+        stack = [rel]
+        while stack:
+            rel = stack.pop()
+            item = self._dirs.pop(rel, None)
+            if item is not None:
+                stack.extend(os.path.join(rel, name) for name, is_dir in item[1].items() if is_dir)
+
+    def _rescan(self, rel):
+        """List rel again, indexing new subdirectories and dropping removed ones;
+        subdirectories that are still there keep their index."""
+        old = self._dirs[rel][1]
+        path = os.path.join(self.root, rel)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            entries = {}
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        entries[entry.name] = entry.is_dir()
+                        if entries[entry.name] and not entry.is_symlink() and \
+                           os.path.join(rel, entry.name) not in self._dirs:
+                            self._index(os.path.join(rel, entry.name))
+                    except OSError:
+                        entries[entry.name] = False
+        except OSError:
+            self._drop(rel)
+            return
+        for name, is_dir in old.items():
+            if is_dir and not entries.get(name):
+                self._drop(os.path.join(rel, name))
+        self._dirs[rel] = (mtime, entries)
+
+    def refresh(self):
+        """Bring the index up to date; return the number of directories listed
+        again."""
+        self.refreshed = time.monotonic()
+        dirty = set()
+        if self._inotify is not None:
+            gone = set()
+            for wd, mask in self._inotify.read():
+                if mask & IN_Q_OVERFLOW:
+                    dirty = None
+                    break
+                if mask & IN_IGNORED:
+                    self._watches.pop(wd, None)
+                    continue
+                rel = self._watches.get(wd)
+                if rel is None:
+                    continue
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                    gone.add(rel)
+                else:
+                    dirty.add(rel)
+            for rel in gone:
+                # A directory moved or deleted and created again is a new
+                # directory: drop it so that its parent indexes it afresh.
+                if rel and dirty is not None:
+                    self._drop(rel)
+                    dirty.add(os.path.dirname(rel))
+        if dirty is None or self._inotify is None:
+            dirty = set()
+            for rel, (mtime, entries) in self._dirs.items():
+                try:
+                    if os.stat(os.path.join(self.root, rel)).st_mtime_ns != mtime:
+                        dirty.add(rel)
+                except OSError:
+                    dirty.add(rel)
+
+        count = 0
+        for rel in sorted(dirty):
+            if rel in self._dirs:
+                self._rescan(rel)
+                count += 1
+        if count:
+            self._results.clear()
+        return count
+
+    def glob(self, pattern, recursive=False, include_hidden=False):
+        """Return the paths matching pattern, like glob.glob(pattern,
+        root_dir=root), from the index."""
+        if self._inotify is not None:
+            self.refresh()
+        elif self.max_age is not None and time.monotonic() - self.refreshed > self.max_age:
+            self.refresh()
+
+        key = (pattern, recursive, include_hidden)
+        result = self._results.get(key)
+        if result is None:
+            result = self._results[key] = self._query(pattern, recursive, include_hidden)
+        return list(result)
+
+    def _resolve(self, path, rel=''):
+        """Return (index key, is_dir) for path taken from the indexed
+        directory rel, or None if it does not exist or is outside the index."""
+        if os.path.isabs(path):
+            path = os.path.relpath(path, self.root)
+            rel = ''
+        is_dir = True
+        for name in path.replace(os.altsep or os.sep, os.sep).split(os.sep):
+            if not name:
+                continue
+            if not is_dir:
+                return None
+            if name == os.curdir:
+                continue
+            if name == os.pardir:
+                if not rel:
+                    return None
+                rel = os.path.dirname(rel)
+                continue
+            item = self._dirs.get(rel)
+            if item is None or name not in item[1]:
+                return None
+            is_dir = item[1][name]
+            rel = os.path.join(rel, name)
+        return rel, is_dir
+
+    def _query(self, pattern, recursive, include_hidden):
+        if not has_magic(pattern):
+            found = self._resolve(pattern)
+            if found is None or pattern.endswith(_SEPS_TUPLE) and not found[1]:
+                return []
+            return [pattern]
+
+        g = _Glob(pattern, recursive, include_hidden)
+        found = self._resolve(g.root)
+        if found is None or found[0] not in self._dirs:
+            return []
+        rel = found[0]
+        result = []
+        if g.opens[0] and g.root:
+            result.append(os.path.join(g.root, ''))
+        prefix = g.root if not g.root or g.root.endswith(_SEPS_TUPLE) else g.root + os.sep
+        stack = [(rel, prefix, g.closure({0}))]
+        while stack:
+            self._expand(g, result, stack, *stack.pop())
+        return result
+
+    def _expand(self, g, result, stack, rel, prefix, active):
+        """Match the active components of g against the indexed directory
+        rel, whose paths start with prefix."""
+        parts, last, trailing = g.parts, g.last, g.trailing
+        suffix = os.sep if trailing else ''
+        item = self._dirs.get(rel)
+        if item is None:
+            return
+        entries = item[1]
+
+        direct, plan = g.split(active)
+        if direct:
+            children = {}
+            for i in direct:
+                name = parts[i]
+                found = self._resolve(name, rel)
+                if found is None:
+                    continue
+                child, is_dir = found
+                if i == last:
+                    if is_dir or not trailing:
+                        result.append(prefix + name + suffix)
+                elif child in self._dirs:
+                    children.setdefault((child, prefix + name + os.sep), set()).add(i + 1)
+                    if g.opens[i + 1]:
+                        result.append(prefix + name + os.sep)
+            for (child, child_prefix), indices in children.items():
+                stack.append((child, child_prefix, g.closure(indices)))
+
+        for name, is_dir in entries.items() if plan else ():
+            dot = name[0] == '.'
+            found = child = None
+            for match, dots, is_last, j, opens in plan:
+                if dot and not dots or match is not None and not match(name):
+                    continue
+                if is_last and (is_dir or not trailing):
+                    found = (found or ()) + (prefix + name + suffix,)
+                if j is not None and is_dir:
+                    child = (child or set()) | {j}
+                    if opens:
+                        found = (found or ()) + (prefix + name + os.sep,)
+            if found:
+                result.extend(dict.fromkeys(found) if len(found) > 1 else found)
+            if child:
+                stack.append((os.path.join(rel, name), prefix + name + os.sep,
+                              g.closure(child)))
+
+    def close(self):
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+#
+# Benchmark: '**/*.txt' queried 1000 times against the index and with glob.glob(), then the cost of a refresh after one file is added, by mtime
+# polling and with inotify.
+#
+
+def benchmark(dirs=2000, files=20, queries=1000, seed=0):
+    import glob
+    import random, shutil, tempfile
+
+    rng = random.Random(seed)
+    top = tempfile.mkdtemp()
+    try:
+        made = [top]
+        for k in range(dirs):
+            path = os.path.join(rng.choice(made), 'd%d' % k)
+            os.mkdir(path)
+            made.append(path)
+        for path in made:
+            for k in range(files):
+                open(os.path.join(path, 'f%d.%s' % (k, rng.choice(['txt', 'c', 'h']))), 'w').close()
+
+        for watch in (False, True):
+            start = time.perf_counter()
+            index = GlobIndex(top, watch=watch)
+            build = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for _ in range(queries):
+                fast = index.glob('**/*.txt', recursive=True)
+            query = (time.perf_counter() - start) / queries
+
+            open(os.path.join(rng.choice(made), 'new%d.txt' % watch), 'w').close()
+            start = time.perf_counter()
+            listed = index.refresh()
+            refresh = time.perf_counter() - start
+
+            assert sorted(index.glob('**/*.txt', recursive=True)) == \
+                   sorted(glob.glob('**/*.txt', root_dir=top, recursive=True))
+            print('%s: build %.2f s, query %.1f us, refresh %.2f ms (%d directory listed again)'
+                  % ('inotify' if index.watching else 'mtime polling', build, query * 1e6,
+                     refresh * 1000, listed))
+            index.close()
+
+        start = time.perf_counter()
+        for _ in range(queries // 100):
+            slow = glob.glob('**/*.txt', root_dir=top, recursive=True)
+        print('glob.glob: %.1f ms per query' % ((time.perf_counter() - start) / (queries // 100) * 1000))
+    finally:
+        shutil.rmtree(top)
+
+#
+# consider a directory containing the following files: 1.gif, 2.txt, card.gif and a subdirectory sub which contains only the file 3.txt.
+#
+
+if __name__ == '__main__':
+    with GlobIndex(watch=True) as index:
+        print(sorted(index.glob('**/*.txt', recursive=True)))
+
+        # OUTPUT: '['2.txt', 'sub/3.txt']'
+
+        print(sorted(index.glob('./**/', recursive=True)))
+
+        # OUTPUT: '['./', './sub/']'
+
+    benchmark()
+
+    # OUTPUT: 'mtime polling: build 0.06 s, query 87.4 us, refresh 10.60 ms (1 directory listed again)'
+    # OUTPUT: 'inotify: build 0.10 s, query 90.8 us, refresh 0.18 ms (1 directory listed again)'
+    # OUTPUT: 'glob.glob: 179.4 ms per query'
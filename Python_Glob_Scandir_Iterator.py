@@ -0,0 +1,304 @@
+# Python Glob
+# glob - Unix style pathname pattern expansion.
+# The glob module finds all the pathnames matching a specified pattern according to the rules used by the Unix shell, although results are returned in
+# arbitrary order.
+# No tilde expansion is done, but *, ?, and character ranges expressed with [] will be correctly matched.
+# This is done by using the os.scandir() and fnmatch.fnmatch() functions in concert, and not by actually invoking a subshell.
+#
+# Note that unlike fnmatch.fnmatch(), glob treats filenames beginning with a dot (.) as special cases.
+#
+
+#
+# A streaming glob built directly on os.scandir().
+#
+
+#
+# glob.glob('**/*.txt', recursive=True) builds the whole result list before returning, and each directory listing is read into a list first. iglob()
+# below yields every path as soon as its directory entry is read, and only visits directories the pattern can still match below:
+#
+# * The pattern is split into components. A directory is entered together with the set of components that can match inside it, so a directory
+#   that no component accepts is never listed, and components that are all literal names are checked with os.path.isdir() or os.path.lexists()
+#   without listing the directory at all.
+# * File types come from the DirEntry objects returned by os.scandir(), which usually need no extra stat() call.
+# * Every directory is listed once, even when several components (such as '**' and '*.txt' in '**/*.txt') are matched inside it.
+# * With workers=N, directory listings are read by N threads; paths are then yielded in completion order.
+#
+# The results are those of glob.iglob() with the same arguments, in a different order, except that each path is yielded at most once and that
+# 'name/**' never yields 'name/' when name is a file.
+#
+
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from Python_Fnmatch_Pattern_Cache import PatternCache
+
+_SEPS = os.sep + (os.altsep or '')
+_SEPS_TUPLE = tuple(_SEPS)
+_RECURSIVE = object()
+_patterns = PatternCache(maxsize=256, casefold=os.path.normcase('A') != 'A')
+
+def has_magic(s):
+    return any(c in s for c in '*?[')
+
+def _compile(component, recursive, include_hidden):
+    """Return a component as _RECURSIVE, a literal name or a
+    (match, hidden) pair, hidden telling whether it matches dot names."""
+    if recursive and component == '**':
+        return _RECURSIVE
+    if not has_magic(component):
+        return component
+    regex = _patterns.compile(component)
+    if _patterns.casefold:
+        match = lambda name: regex.match(name.lower()) is not None
+    else:
+        match = regex.match
+    return match, include_hidden or component.startswith('.')
+
+def _parse(pathname, recursive, include_hidden):
+    """Split pathname into its literal leading directory, the compiled
+    components after it and whether it ends with a separator."""
+    trailing = pathname.endswith(_SEPS_TUPLE)
+    head = pathname.rstrip(_SEPS) if trailing else pathname
+    components = []
+    while has_magic(head):
+        head, tail = os.path.split(head)
+        components.append(tail)
+    parts = [_compile(component, recursive, include_hidden)
+             for component in reversed(components)]
+    return head, parts, trailing
+
+class _Glob:
+
+    def __init__(self, pathname, recursive, include_hidden):
+        self.root, self.parts, self.trailing = _parse(pathname, recursive, include_hidden)
+        self.last = len(self.parts) - 1
+        self.include_hidden = include_hidden
+        self._plans = {}
+        # opens[j]: a directory entered at component j is itself a match,
+        # because all components from j on are '**' (glob yields it as 'dir/').
+        self.opens = [all(part is _RECURSIVE for part in self.parts[j:])
+                      for j in range(len(self.parts))]
+
+    def closure(self, indices):
+        """Add the component after each '**', which can match zero directories."""
+        for i in range(self.last):
+            if i in indices and self.parts[i] is _RECURSIVE:
+                indices.add(i + 1)
+        return frozenset(indices)
+
+    def start(self):
+        """Return the paths matched before anything is listed and the first
+        directory to visit."""
+        if self.root and not os.path.isdir(self.root):
+            return [], None
+        found = []
+        if self.opens[0] and self.root:
+            found.append(os.path.join(self.root, ''))
+        return found, (self.root, self.closure({0}))
+
+    def expand(self, dirname, active):
+        """Yield ('path', path) for each match in dirname and ('dir', state)
+        for each subdirectory some component can still match in."""
+        parts, last, trailing = self.parts, self.last, self.trailing
+        suffix = os.sep if trailing else ''
+
+        direct, plan = self.split(active)
+        if direct:
+            children = {}
+            for i in direct:
+                path = os.path.join(dirname, parts[i])
+                if i == last:
+                    if os.path.isdir(path) if trailing else os.path.lexists(path):
+                        yield 'path', path + suffix
+                elif os.path.isdir(path):
+                    children.setdefault(path, set()).add(i + 1)
+                    if self.opens[i + 1]:
+                        yield 'path', os.path.join(path, '')
+            for path, indices in children.items():
+                yield 'dir', (path, self.closure(indices))
+            if not plan:
+                return
+
+        if dirname and not dirname.endswith(_SEPS_TUPLE):
+            prefix = dirname + os.sep
+        else:
+            prefix = dirname
+
+        try:
+            it = os.scandir(dirname or os.curdir)
+        except OSError:
+            return
+        with it:
+            for entry in it:
+                name = entry.name
+                dot = name[0] == '.'
+                is_dir = None
+                found = child = None
+                for match, dots, is_last, j, opens in plan:
+                    if dot and not dots or match is not None and not match(name):
+                        continue
+                    if is_dir is None:
+                        try:
+                            is_dir = entry.is_dir()
+                        except OSError:
+                            is_dir = False
+                    if is_last and (is_dir or not trailing):
+                        found = (found or ()) + (prefix + name + suffix,)
+                    if j is not None and is_dir:
+                        child = (child or set()) | {j}
+                        if opens:
+                            found = (found or ()) + (prefix + name + os.sep,)
+                if found:
+                    for path in dict.fromkeys(found) if len(found) > 1 else found:
+                        yield 'path', path
+                if child:
+                    yield 'dir', (prefix + name, self.closure(child))
+
+    def split(self, active):
+        """Return the active components looked up directly (all of them when
+        they are all literal names, else '.' and '..', which os.scandir()
+        never returns) and the plan() matching the others against a listing."""
+        split = self._plans.get(active)
+        if split is None:
+            literal = [i for i in active if isinstance(self.parts[i], str)]
+            if len(literal) < len(active):
+                literal = [i for i in literal if self.parts[i] in (os.curdir, os.pardir)]
+            split = self._plans[active] = (literal,
+                                           self.plan([i for i in active if i not in literal]))
+        return split
+
+    def plan(self, active):
+        """Return a (match, dots, is_last, child, opens) test for each active
+        component: match(name) (None for '**'), whether dot names can match,
+        whether a match is a result, the component index a matching
+        directory is entered at, and whether that directory is a result."""
+        plan = []
+        for i in sorted(active):
+            part = self.parts[i]
+            if part is _RECURSIVE:
+                match, dots, j = None, self.include_hidden, i
+            elif isinstance(part, str):
+                match, dots, j = part.__eq__, True, i + 1
+            else:
+                (match, dots), j = part, i + 1
+            if i == self.last:
+                plan.append((match, dots, True, i if part is _RECURSIVE else None, False))
+            else:
+                plan.append((match, dots, False, j, self.opens[j]))
+        return tuple(plan)
+
+def iglob(pathname, *, recursive=False, include_hidden=False, workers=None):
+    """Yield the paths matching pathname, like glob.iglob().
+
+    With workers=N, N threads list directories and paths are yielded in the
+    order their directories were read.
+    """
+    if not has_magic(pathname):
+        if pathname.endswith(_SEPS_TUPLE) and os.path.isdir(pathname) or \
+           not pathname.endswith(_SEPS_TUPLE) and os.path.lexists(pathname):
+            yield pathname
+        return
+
+    g = _Glob(pathname, recursive, include_hidden)
+    found, state = g.start()
+    yield from found
+    if state is not None:
+        yield from walk(g.expand, state, workers)
+
+def walk(expand, state, workers=None):
+    """Run a directory walk from state, yielding the 'path' values produced
+    by expand(*state) and visiting the 'dir' states it produces, depth first,
+    or on a pool of workers threads."""
+    if not workers:
+        stack = [state]
+        while stack:
+            children = []
+            for kind, value in expand(*stack.pop()):
+                if kind == 'path':
+                    yield value
+                else:
+                    children.append(value)
+            stack.extend(reversed(children))
+        return
+
+    with ThreadPoolExecutor(workers) as pool:
+        running = set()
+        pending = deque([state])
+        limit = 4 * workers
+        while running or pending:
+            while pending and len(running) < limit:
+                running.add(pool.submit(lambda state: list(expand(*state)), pending.pop()))
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                for kind, value in future.result():
+                    if kind == 'path':
+                        yield value
+                    else:
+                        pending.append(value)
+
+def glob(pathname, *, recursive=False, include_hidden=False, workers=None):
+    """Return a list of the paths matching pathname, like glob.glob()."""
+    return list(iglob(pathname, recursive=recursive, include_hidden=include_hidden,
+                      workers=workers))
+
+#
+# Benchmark: '**/*.txt' over a generated tree with one large directory, compared with glob.iglob(). Time to the first result and the total time are
+# measured first, then the peak memory in a second run under tracemalloc.
+#
+
+def benchmark(dirs=2000, files=20, big=100000, seed=0):
+    import glob as stdglob
+    import random, shutil, tempfile, time, tracemalloc
+
+    rng = random.Random(seed)
+    top = tempfile.mkdtemp()
+    try:
+        made = [top]
+        for k in range(dirs):
+            path = os.path.join(rng.choice(made), 'd%d' % k)
+            os.mkdir(path)
+            made.append(path)
+        for path in made:
+            for k in range(files):
+                open(os.path.join(path, 'f%d.%s' % (k, rng.choice(['txt', 'c', 'h']))), 'w').close()
+        for k in range(big):
+            open(os.path.join(made[-1], 'b%d.%s' % (k, rng.choice(['txt', 'c', 'h']))), 'w').close()
+
+        pattern = os.path.join(top, '**', '*.txt')
+        for name, function in (('iglob', iglob), ('glob.iglob', stdglob.iglob)):
+            start = time.perf_counter()
+            it = function(pattern, recursive=True)
+            next(it)
+            first = time.perf_counter() - start
+            count = 1 + sum(1 for _ in it)
+            total = time.perf_counter() - start
+
+            tracemalloc.start()
+            for _ in function(pattern, recursive=True):
+                pass
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print('%-10s %d paths: first %.1f ms, all %.2f s, peak %.2f MB'
+                  % (name, count, first * 1000, total, peak / 1e6))
+    finally:
+        shutil.rmtree(top)
+
+#
+# consider a directory containing the following files: 1.gif, 2.txt, card.gif and a subdirectory sub which contains only the file 3.txt.
+#
+
+if __name__ == '__main__':
+    print(glob('*.gif'))
+
+    # OUTPUT: '['1.gif', 'card.gif']'
+
+    print(sorted(iglob('**/*.txt', recursive=True)))
+
+    # OUTPUT: '['2.txt', 'sub/3.txt']'
+
+    print(sorted(iglob('./**/', recursive=True, workers=4)))
+
+    # OUTPUT: '['./', './sub/']'
+
+    benchmark()